@@ -0,0 +1,441 @@
+# backend/api.py
+# Headless JSON API for the mobile app and kiosks, served with asyncio (no web framework): complaint
+# submission, listing with keyset pagination, status/assignment updates and chatbot questions.
+# The event loop only parses and routes requests; blocking work runs in thread pools: database calls
+# (pooled connections) in one, complaint submission (the insert, plus NLP enrichment when it runs inline)
+# in another, and chatbot answers (FAQ lookup or a Gemini call) in a third, so slow NLP or Gemini calls
+# never hold up listing requests.
+# Usage: python -m backend.api [--host 127.0.0.1] [--port 8000] [--db complaints.db]
+#
+# Requests authenticate with HTTP Basic auth using the portal logins (backend/auth.py).
+#   GET   /health            no login
+#   GET   /complaints        student: own complaints; admin: all, filtered by ?category=&status=&from=&to=
+#                            (YYYY-MM-DD). Both: ?limit= (max 100) and ?cursor= (next_cursor of the last page)
+#   POST  /complaints        student: {"type", "category", "description", "subcategory"?, "anonymous"?}
+#   GET   /complaints/<id>   student (own complaints) or admin
+#   PATCH /complaints/<id>   admin: {"status"?, "assigned_to"?}
+#   POST  /chat              student: {"message"} -> {"reply", "source"}
+#   GET   /metrics           admin: Prometheus text (backend/metrics.py)
+# Errors are JSON too: {"error": "..."} with a 4xx/5xx status.
+
+import argparse
+import asyncio
+import base64
+import binascii
+import functools
+import json
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from backend import chatbot, database, metrics
+from backend.auth import validate_admin_login, validate_student_login
+from backend.config import critical_categories, general_categories
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+DB_THREADS = 8      # concurrent database calls
+NLP_THREADS = 2     # concurrent complaint submissions (enrichment is CPU-bound)
+CHAT_THREADS = 8    # concurrent chatbot answers (mostly waiting on Gemini, which has its own limit)
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 64 * 1024
+KEEP_ALIVE_TIMEOUT = 15  # seconds an idle connection is kept open
+MAX_PAGE_SIZE = 100
+MAX_DESCRIPTION_CHARS = 5000
+MAX_MESSAGE_CHARS = 1000
+STATUSES = ("Pending", "In Progress", "Resolved")
+SQLITE_INT_RANGE = (-2 ** 63, 2 ** 63 - 1)  # larger ids/timestamps overflow in the sqlite3 module
+CATEGORIES = {"General": general_categories, "Critical": critical_categories}
+
+log = logging.getLogger(__name__)
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class Request:
+    __slots__ = ("method", "path", "query", "headers", "body", "user", "role")
+
+    def __init__(self, method, path, query, headers, body):
+        self.method, self.path, self.query, self.headers, self.body = method, path, query, headers, body
+        self.user = self.role = None
+
+    def param(self, name, default=None):
+        values = self.query.get(name)
+        return values[-1] if values else default
+
+    def json(self):
+        # The body as a JSON object; 400 for anything else.
+        try:
+            payload = json.loads(self.body or b"{}")
+        except (ValueError, UnicodeDecodeError):
+            raise HTTPError(400, "request body is not valid JSON")
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "request body must be a JSON object")
+        return payload
+
+
+# ROUTES
+# (method, path regex, handler, who may call it); roles: None (anyone), "student", "admin", "any" (logged in)
+_ROUTES = []
+
+def route(method, pattern, role="any"):
+    def decorate(handler):
+        _ROUTES.append((method, re.compile(f"^{pattern}$"), handler, role))
+        return handler
+    return decorate
+
+
+def _complaint_json(complaint):
+    payload = complaint._asdict()
+    del payload["file_path"]  # a path on the server, not useful to clients
+    payload["is_anonymous"] = bool(payload["is_anonymous"])
+    if payload["is_anonymous"]:
+        payload["email"] = None  # as in notifications.complaint_message
+    payload["keywords"] = database.parse_keywords(payload["keywords"])
+    return payload
+
+
+def _page_json(rows, next_cursor):
+    return {
+        "complaints": [_complaint_json(database.Complaint(*row)) for row in rows],
+        "next_cursor": f"{next_cursor[0]}.{next_cursor[1]}" if next_cursor else None,
+    }
+
+
+def _int_param(request, name, default, low, high):
+    value = request.param(name)
+    if value is None:
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise HTTPError(400, f"{name} must be an integer")
+    if not low <= value <= high:
+        raise HTTPError(400, f"{name} must be between {low} and {high}")
+    return value
+
+
+def _cursor_param(request):
+    value = request.param("cursor")
+    if not value:
+        return None
+    try:
+        created_ts, cid = (int(part) for part in value.split("."))
+    except ValueError:
+        raise HTTPError(400, "cursor is not valid")
+    low, high = SQLITE_INT_RANGE
+    if not (low <= created_ts <= high and low <= cid <= high):
+        raise HTTPError(400, "cursor is not valid")
+    return created_ts, cid
+
+
+def _date_param(request, name):
+    value = request.param(name)
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        raise HTTPError(400, f"{name} must be a date (YYYY-MM-DD)")
+
+
+def _text_field(payload, name, max_chars, required=True):
+    value = payload.get(name)
+    if value is None and not required:
+        return None
+    if not isinstance(value, str) or (required and not value.strip()):
+        raise HTTPError(400, f"{name} is required" if value is None else f"{name} must be a non-empty string")
+    value = value.strip()
+    if len(value) > max_chars:
+        raise HTTPError(400, f"{name} is longer than {max_chars} characters")
+    return value
+
+
+async def _own_complaint(api, request, cid):
+    # cid is all digits; longer than 19 digits it is out of range (and int() refuses over 4300 digits)
+    if len(cid.lstrip("0")) > 19 or int(cid) > SQLITE_INT_RANGE[1]:  # no such row
+        raise HTTPError(404, "complaint not found")
+    complaint = await api.run(database.get_complaint, int(cid))
+    if complaint is None or (request.role == "student" and complaint.email != request.user):
+        raise HTTPError(404, "complaint not found")
+    return complaint
+
+
+@route("GET", "/health", role=None)
+async def health(api, request):
+    return 200, {"status": "ok"}
+
+
+@route("GET", "/complaints")
+async def list_complaints(api, request):
+    limit = _int_param(request, "limit", database.DEFAULT_PAGE_SIZE, 1, MAX_PAGE_SIZE)
+    cursor = _cursor_param(request)
+    if request.role == "student":
+        rows, next_cursor = await api.run(database.get_complaints_page, request.user, limit, cursor)
+    else:
+        rows, next_cursor = await api.run(
+            database.get_complaints_filtered, request.param("category"), request.param("status"),
+            _date_param(request, "from"), _date_param(request, "to"), limit, cursor,
+        )
+    return 200, _page_json(rows, next_cursor)
+
+
+@route("POST", "/complaints", role="student")
+async def submit_complaint(api, request):
+    payload = request.json()
+    ctype = payload.get("type")
+    if ctype not in CATEGORIES:
+        raise HTTPError(400, f"type must be one of {', '.join(CATEGORIES)}")
+    category = payload.get("category")
+    if category not in CATEGORIES[ctype]:
+        raise HTTPError(400, f"category must be one of {', '.join(CATEGORIES[ctype])}")
+    description = _text_field(payload, "description", MAX_DESCRIPTION_CHARS)
+    subcategory = _text_field(payload, "subcategory", 200, required=False)
+    anonymous = payload.get("anonymous", False)
+    if not isinstance(anonymous, bool):
+        raise HTTPError(400, "anonymous must be true or false")
+
+    def submit():
+        cid = database.add_complaint(ctype, category, subcategory, description, anonymous, None, request.user)
+        return database.get_complaint(cid)
+
+    complaint = await api.run(submit, pool="nlp")
+    return 201, _complaint_json(complaint), {"Location": f"/complaints/{complaint.id}"}
+
+
+@route("GET", r"/complaints/(?P<cid>\d+)")
+async def get_complaint(api, request, cid):
+    return 200, _complaint_json(await _own_complaint(api, request, cid))
+
+
+@route("PATCH", r"/complaints/(?P<cid>\d+)", role="admin")
+async def update_complaint(api, request, cid):
+    payload = request.json()
+    if not {"status", "assigned_to"} & payload.keys():
+        raise HTTPError(400, "nothing to change: give status and/or assigned_to")
+    status = payload.get("status")
+    if "status" in payload and status not in STATUSES:
+        raise HTTPError(400, f"status must be one of {', '.join(STATUSES)}")
+    staff = _text_field(payload, "assigned_to", 200) if "assigned_to" in payload else None
+    cid = (await _own_complaint(api, request, cid)).id
+
+    def update():
+        database.apply_complaint_changes(
+            statuses={cid: status} if status else None, assignments={cid: staff} if staff else None,
+        )
+        return database.get_complaint(cid)
+
+    return 200, _complaint_json(await api.run(update))
+
+
+@route("POST", "/chat", role="student")
+async def chat(api, request):
+    message = _text_field(request.json(), "message", MAX_MESSAGE_CHARS)
+    reply, source = await api.run(chatbot.get_chatbot_response, message, pool="chat")
+    return 200, {"reply": reply, "source": source}
+
+
+@route("GET", "/metrics", role="admin")
+async def prometheus_metrics(api, request):
+    return 200, metrics.render_prometheus()
+
+
+# SERVER
+def _authenticate(headers):
+    # (email, role) from a Basic Authorization header, or None.
+    scheme, _, credentials = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "basic":
+        return None
+    try:
+        email, _, password = base64.b64decode(credentials, validate=True).decode("utf-8").partition(":")
+    except (binascii.Error, UnicodeDecodeError):
+        return None
+    if validate_admin_login(email, password):
+        return email, "admin"
+    if validate_student_login(email, password):
+        return email, "student"
+    return None
+
+
+def _response(status, payload, headers, keep_alive):
+    if isinstance(payload, str):
+        body, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+    else:
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        content_type = "application/json; charset=utf-8"
+    lines = [
+        f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+        f"Content-Type: {content_type}",
+        f"Content-Length: {len(body)}",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+
+class APIServer:
+    # The HTTP server and its thread pools. start() binds (port 0 picks a free port, see .port).
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, db_threads=DB_THREADS, nlp_threads=NLP_THREADS,
+                 chat_threads=CHAT_THREADS):
+        self.host, self.port = host, port
+        self._pools = {
+            "db": ThreadPoolExecutor(db_threads, thread_name_prefix="api-db"),
+            "nlp": ThreadPoolExecutor(nlp_threads, thread_name_prefix="api-nlp"),
+            "chat": ThreadPoolExecutor(chat_threads, thread_name_prefix="api-chat"),
+        }
+        self._server = None
+
+    async def run(self, fn, *args, pool="db"):
+        # Run a blocking call in one of the thread pools.
+        return await asyncio.get_running_loop().run_in_executor(self._pools[pool], functools.partial(fn, *args))
+
+    async def start(self):
+        await self.run(database.init_db)
+        self._server = await asyncio.start_server(self._serve_connection, self.host, self.port, limit=MAX_HEADER_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for pool in self._pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _read_request(self, reader):
+        # The next request on the connection, or None when the client is done (or idle for too long).
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEP_ALIVE_TIMEOUT)
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+            return None
+        except asyncio.LimitOverrunError:
+            raise HTTPError(431, "request headers too large")
+        try:
+            request_line, *header_lines = head.decode("latin-1").split("\r\n")
+            method, target, version = request_line.split(" ")
+        except ValueError:
+            raise HTTPError(400, "malformed request line")
+        headers = {}
+        for line in header_lines:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise HTTPError(411, "send a Content-Length instead of a chunked body")
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise HTTPError(400, "invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, f"request body larger than {MAX_BODY_BYTES} bytes")
+        try:
+            body = await reader.readexactly(length) if length else b""
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return None
+        url = urlsplit(target)
+        request = Request(method.upper(), url.path, parse_qs(url.query), headers, body)
+        keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        return request, keep_alive
+
+    async def _dispatch(self, request):
+        allowed = []
+        for method, pattern, handler, role in _ROUTES:
+            match = pattern.match(request.path)
+            if not match:
+                continue
+            if method != request.method:
+                allowed.append(method)
+                continue
+            if role is not None:
+                identity = _authenticate(request.headers)
+                if identity is None:
+                    raise HTTPError(401, "login required", {"WWW-Authenticate": 'Basic realm="Campus Buddy"'})
+                request.user, request.role = identity
+                if role != "any" and request.role != role:
+                    raise HTTPError(403, f"only for {role}s")
+            start = time.perf_counter()
+            error = True
+            try:
+                result = await handler(self, request, **match.groupdict())
+                error = False
+            finally:
+                metrics.observe(f"api.{handler.__name__}", time.perf_counter() - start, error)
+            return result if len(result) == 3 else (*result, None)
+        if allowed:
+            raise HTTPError(405, "method not allowed", {"Allow": ", ".join(allowed)})
+        raise HTTPError(404, "not found")
+
+    async def _serve_connection(self, reader, writer):
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    parsed = await self._read_request(reader)
+                    if parsed is None:
+                        break
+                    request, keep_alive = parsed
+                    status, payload, headers = await self._dispatch(request)
+                except HTTPError as e:
+                    status, payload, headers = e.status, {"error": str(e)}, e.headers
+                    # The rest of a rejected request may still be unread
+                    keep_alive = keep_alive and status not in (411, 413, 431)
+                except Exception:
+                    log.exception("unhandled error in API request")
+                    status, payload, headers = 500, {"error": "internal server error"}, None
+                writer.write(_response(status, payload, headers, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, **pool_sizes):
+    server = await APIServer(host, port, **pool_sizes).start()
+    print(f"Campus Buddy API on http://{server.host}:{server.port}", flush=True)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Campus Buddy JSON API")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--db", help=f"database file (default: {database.DB_PATH})")
+    parser.add_argument("--db-threads", type=int, default=DB_THREADS)
+    parser.add_argument("--nlp-threads", type=int, default=NLP_THREADS)
+    parser.add_argument("--chat-threads", type=int, default=CHAT_THREADS)
+    args = parser.parse_args(argv)
+
+    if args.db:
+        database.DB_PATH = args.db
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    try:
+        asyncio.run(serve(args.host, args.port, db_threads=args.db_threads, nlp_threads=args.nlp_threads,
+                          chat_threads=args.chat_threads))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
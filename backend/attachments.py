@@ -0,0 +1,67 @@
+# backend/attachments.py
+# Content-addressed attachment store. Uploads are streamed to disk in chunks while being hashed
+# (SHA-256) and kept once per distinct content at <ATTACHMENTS_DIR>/<aa>/<bb>/<sha256>; each upload
+# gets a row in the attachments table (original name, type, size) whose id the complaint stores.
+
+import hashlib
+import os
+import tempfile
+
+from backend import database
+
+ATTACHMENTS_DIR = os.environ.get("CAMPUS_BUDDY_UPLOADS", "uploads")
+MAX_ATTACHMENT_BYTES = int(os.environ.get("CAMPUS_BUDDY_MAX_UPLOAD_MB", "10")) * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+
+
+class AttachmentTooLarge(ValueError):
+    pass
+
+
+def blob_path(sha256):
+    # Where the content with this hash is stored (two directory levels keep directories small).
+    return os.path.join(ATTACHMENTS_DIR, sha256[:2], sha256[2:4], sha256)
+
+
+def save_attachment(fileobj, original_name, content_type=None, max_bytes=None):
+    # Store a binary file object (read in CHUNK_SIZE pieces, never as a whole) and return the new
+    # attachment id. Content that is already stored is not written again.
+    # Raises AttachmentTooLarge once more than max_bytes (default MAX_ATTACHMENT_BYTES) have been read.
+    max_bytes = MAX_ATTACHMENT_BYTES if max_bytes is None else max_bytes
+    tmp_dir = os.path.join(ATTACHMENTS_DIR, "tmp")  # same file system, so the final rename is atomic
+    os.makedirs(tmp_dir, exist_ok=True)
+    digest, size = hashlib.sha256(), 0
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for chunk in iter(lambda: fileobj.read(CHUNK_SIZE), b""):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise AttachmentTooLarge(f"attachments are limited to {max_bytes / (1024 * 1024):g} MB")
+                digest.update(chunk)
+                out.write(chunk)
+        sha256 = digest.hexdigest()
+        path = blob_path(sha256)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    name = os.path.basename(original_name or "") or None  # never a path from the client
+    return database.add_attachment(sha256, size, content_type, name)
+
+
+def open_attachment(attachment):
+    # Binary file object for an Attachment row (from database.get_attachments).
+    return open(blob_path(attachment.sha256), "rb")
+
+
+def describe(attachment):
+    # "name (size)" for display.
+    size = attachment.size
+    shown = f"{size} B" if size < 1024 else f"{size / 1024:.1f} KB" if size < 1024 ** 2 else f"{size / 1024 ** 2:.1f} MB"
+    return f"{attachment.original_name or 'attachment'} ({shown})"
@@ -0,0 +1,28 @@
+# backend/backfill.py
+# Backfill stored NLP enrichment for existing complaints.
+# Usage: python -m backend.backfill [--batch-size 500] [--max-rows N]
+# Safe to interrupt: every batch is committed, and the next run picks up the remaining rows.
+
+import argparse
+
+from backend.database import init_db, backfill_enrichment, count_unenriched
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute sentiment, priority, keywords and category for stored complaints.")
+    parser.add_argument("--batch-size", type=int, default=500, help="rows per transaction")
+    parser.add_argument("--max-rows", type=int, default=None, help="stop after this many rows")
+    args = parser.parse_args(argv)
+
+    init_db()
+    print(f"{count_unenriched()} complaints need enrichment.")
+
+    def progress(done, remaining):
+        print(f"  enriched {done} (remaining {remaining})", flush=True)
+
+    done = backfill_enrichment(args.batch_size, args.max_rows, progress)
+    print(f"Done: {done} complaints enriched.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# backend/category_model.py
+# Complaint category classifier: multinomial naive Bayes over hashed word unigrams and bigrams,
+# trained from categorized complaints and persisted as one .npz file.
+# Training: python -m backend.train_category_model
+
+import os
+import re
+import zlib
+
+import numpy as np
+
+N_FEATURES = 2 ** 16  # hash buckets (power of two)
+ALPHA = 0.1           # additive smoothing
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def _grams(text):
+    tokens = _TOKEN.findall((text or "").lower())
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+def hash_features(texts, n_features=N_FEATURES):
+    # Sparse bag of hashed n-grams in coordinate form: (doc index, feature index, count) arrays,
+    # one entry per distinct feature of each document.
+    docs, features = [], []
+    for i, text in enumerate(texts):
+        for gram in _grams(text):
+            docs.append(i)
+            features.append(zlib.crc32(gram.encode()) & (n_features - 1))
+    if not docs:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0)
+    keys, counts = np.unique(np.array(docs, dtype=np.int64) * n_features + features, return_counts=True)
+    return keys // n_features, keys % n_features, counts.astype(np.float64)
+
+
+class CategoryModel:
+    # Class and per-class feature counts are the whole model; partial_fit just adds to them.
+
+    def __init__(self, categories=(), n_features=N_FEATURES, alpha=ALPHA):
+        self.categories = list(categories)
+        self.n_features = n_features
+        self.alpha = alpha
+        self.class_counts = np.zeros(len(self.categories))
+        self.feature_counts = np.zeros((len(self.categories), n_features))
+        self._refresh()
+
+    def _refresh(self):
+        # Smoothed log probabilities used for scoring, recomputed after every (partial) fit.
+        totals = self.feature_counts.sum(axis=1, keepdims=True)
+        self._log_prob = np.log(self.feature_counts + self.alpha) - np.log(totals + self.alpha * self.n_features)
+        self._log_prior = np.log(self.class_counts + 1) - np.log(self.class_counts.sum() + max(len(self.categories), 1))
+
+    def _class_index(self, category):
+        if category not in self.categories:
+            self.categories.append(category)
+            self.class_counts = np.append(self.class_counts, 0.0)
+            self.feature_counts = np.vstack([self.feature_counts, np.zeros(self.n_features)])
+        return self.categories.index(category)
+
+    def partial_fit(self, texts, labels):
+        # Add labelled examples to the counts (new categories are added as they appear).
+        texts, labels = list(texts), list(labels)
+        rows = np.array([self._class_index(label) for label in labels], dtype=np.int64)
+        docs, features, counts = hash_features(texts, self.n_features)
+        np.add.at(self.feature_counts, (rows[docs], features), counts)
+        np.add.at(self.class_counts, rows, 1.0)
+        self._refresh()
+        return self
+
+    def fit(self, texts, labels):
+        # Train from scratch on these examples.
+        labels = list(labels)
+        self.__init__(sorted(set(labels)), self.n_features, self.alpha)
+        return self.partial_fit(texts, labels)
+
+    def predict_log_proba(self, texts):
+        # Unnormalised log posterior, shape (len(texts), len(categories)), scored from the sparse
+        # features: one gather of the log probabilities and one bincount per category.
+        texts = list(texts)
+        docs, features, counts = hash_features(texts, self.n_features)
+        contrib = self._log_prob[:, features] * counts
+        scores = np.empty((len(texts), len(self.categories)))
+        for c in range(len(self.categories)):
+            scores[:, c] = np.bincount(docs, weights=contrib[c], minlength=len(texts)) + self._log_prior[c]
+        return scores
+
+    def predict(self, texts):
+        # Most likely category per text; None for texts without any words (or an untrained model).
+        texts = list(texts)
+        if not self.categories:
+            return [None] * len(texts)
+        best = self.predict_log_proba(texts).argmax(axis=1)
+        return [self.categories[b] if _grams(t) else None for b, t in zip(best, texts)]
+
+    def save(self, path):
+        # Written to a temporary file first, so readers never see a partial model.
+        tmp = f"{path}.tmp.npz"
+        np.savez_compressed(
+            tmp, categories=np.array(self.categories, dtype=str), class_counts=self.class_counts,
+            feature_counts=self.feature_counts, alpha=self.alpha,
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            model = cls(data["categories"].tolist(), data["feature_counts"].shape[1], float(data["alpha"]))
+            model.class_counts = data["class_counts"]
+            model.feature_counts = data["feature_counts"]
+        model._refresh()
+        return model
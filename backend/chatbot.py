@@ -1,9 +1,19 @@
 # backend/chatbot.py
-import difflib
-import google.generativeai as genai
+import hashlib
+import os
+import threading
 
-# Configure Gemini API directly (replace with your actual API key)
-genai.configure(api_key="YOUR_GEMINI_API_KEY")
+from backend import metrics
+from backend.faq_index import FAQIndex, load_faqs
+from backend.gemini_client import GeminiClient, GeminiError, RestTransport, SDKTransport
+from backend.keyword_matcher import KeywordMatcher
+from backend.response_cache import ResponseCache
+
+# Gemini API key (replace with your actual API key)
+GEMINI_API_KEY = "YOUR_GEMINI_API_KEY"
+GEMINI_MODEL = "gemini-2.5-flash"
+# Optional Gemini-compatible REST endpoint (e.g. a local fake server); the SDK is used otherwise
+GEMINI_API_BASE = os.getenv("GEMINI_API_BASE")
 
 # Category-specific FAQs
 category_faqs = {
@@ -53,45 +63,166 @@ general_faqs = [
 ]
 
 
+# FAQ INDEX
+# Optional external FAQ file (JSON, JSONL or CSV; see faq_index.load_faqs), merged with the FAQs above.
+FAQ_FILE = os.getenv("CAMPUS_BUDDY_FAQ_FILE")
+# Minimum cosine similarity for a rule-based answer
+FAQ_MIN_CONFIDENCE = 0.45
+
+_faq_index = None
+_faq_lock = threading.Lock()
+
+def _all_faqs(path=None):
+    entries = [(q, a, cat) for cat, pairs in category_faqs.items() for q, a in pairs]
+    entries += [(q, a, None) for q, a in general_faqs]
+    path = path or FAQ_FILE
+    if path:
+        entries += load_faqs(path)
+    return entries
+
+def get_faq_index() -> FAQIndex:
+    # Build the FAQ index on first use and reuse it for every message.
+    global _faq_index
+    if _faq_index is None:
+        with _faq_lock:
+            if _faq_index is None:
+                _faq_index = FAQIndex(_all_faqs())
+    return _faq_index
+
+def reload_faqs(path: str | None = None) -> FAQIndex:
+    # Rebuild the index after the FAQ content changed (optionally from another FAQ file).
+    # Cached Gemini answers from the previous FAQ version are dropped.
+    global _faq_index
+    index = FAQIndex(_all_faqs(path))
+    with _faq_lock:
+        _faq_index = index
+    get_response_cache().invalidate(faq_fingerprint(index))
+    return index
+
+def faq_fingerprint(index: FAQIndex | None = None) -> str:
+    # Short hash of the FAQ content; cached answers are keyed by it.
+    entries = (index or get_faq_index()).entries
+    return hashlib.sha256(repr(entries).encode()).hexdigest()[:16]
+
+def search_faqs(query: str, k: int = 3) -> list:
+    # Top-k FAQ matches (question, answer, score, category), best first.
+    return get_faq_index().search(query, k)
+
+
 # RULE-BASED CHATBOT
+_GREETINGS = KeywordMatcher(["hi", "hello", "hey", "good morning", "good afternoon", "good evening"])
+
 def get_rule_based_response(user_input: str) -> str | None:
     # Try to answer from rule-based FAQs.
     msg = (user_input or "").strip().lower()
 
-    # Greetings
-    if any(greet in msg for greet in ["hi", "hello", "hey", "good morning", "good afternoon", "good evening"]):
+    # Greetings (whole words only, so "this" or "which" is not taken for "hi")
+    if _GREETINGS.find_all(msg, whole_words=True):
         return "Hello! I’m Campus Buddy. How can I help you today?"
 
-    # Flatten FAQs
-    all_questions = [q for cat in category_faqs.values() for q, _ in cat] + [q for q, _ in general_faqs]
-    all_answers = [a for cat in category_faqs.values() for _, a in cat] + [a for _, a in general_faqs]
-
-    # Fuzzy match (find closest question)
-    match = difflib.get_close_matches(msg, all_questions, n=1, cutoff=0.6)
-    if match:
-        idx = all_questions.index(match[0])
-        return all_answers[idx]
+    # Closest FAQ question, if it is similar enough
+    matches = search_faqs(msg, k=1)
+    if matches and matches[0].score >= FAQ_MIN_CONFIDENCE:
+        return matches[0].answer
 
     return None
 
 
+# RESPONSE CACHE
+# Gemini answers are cached per normalised question; see backend/response_cache.py.
+CACHE_ENABLED = os.getenv("CAMPUS_BUDDY_CHAT_CACHE", "1") != "0"
+_response_cache = None
+_cache_lock = threading.Lock()
+
+def get_response_cache() -> ResponseCache:
+    # Shared cache, namespaced by the current FAQ fingerprint (stale namespaces are purged on start).
+    global _response_cache
+    if _response_cache is None:
+        namespace = faq_fingerprint()
+        with _cache_lock:
+            if _response_cache is None:
+                cache = ResponseCache(namespace=namespace)
+                cache.invalidate(namespace)
+                _response_cache = cache
+    return _response_cache
+
+
 # GEMINI FALLBACK
-def get_gemini_response(prompt: str) -> str:
-    # Fallback to Gemini API if no rule-based match.
+_gemini_client = None
+_client_lock = threading.Lock()
+
+def get_gemini_client() -> GeminiClient:
+    # One client (and model object) per process; the SDK is imported on first use.
+    global _gemini_client
+    if _gemini_client is None:
+        with _client_lock:
+            if _gemini_client is None:
+                if GEMINI_API_BASE:
+                    transport = RestTransport(GEMINI_API_BASE, GEMINI_API_KEY, GEMINI_MODEL)
+                else:
+                    # Corrected model name for the current API
+                    transport = SDKTransport(GEMINI_MODEL, GEMINI_API_KEY)
+                _gemini_client = GeminiClient(transport)
+    return _gemini_client
+
+def _build_prompt(prompt: str) -> str:
+    return (
+        f"You are Campus Buddy, a formal and concise virtual assistant for a college. "
+        f"Respond politely and professionally to the following student question:\n\n{prompt}"
+    )
+
+def _ask_gemini(prompt: str) -> str:
+    # One Gemini call; raises if the API fails or returns no text.
+    text = get_gemini_client().generate(_build_prompt(prompt))
+    if not text:
+        raise ValueError("empty response")
+    return text.strip()
+
+def _error_message(error: Exception) -> str:
+    if isinstance(error, ValueError):
+        return "I'm sorry, I couldn’t process that right now."
+    if isinstance(error, GeminiError):
+        return f"Sorry, Campus Buddy is busy right now. Please try again in a moment. ({error})"
+    return f"Sorry, I couldn’t connect to the Gemini API. ({error})"
+
+def get_gemini_response(prompt: str, generate=None) -> str:
+    # Fallback to Gemini API if no rule-based match; successful answers are cached.
+    # generate(prompt) -> str replaces the Gemini call (e.g. a local stub in tests).
+    cache = get_response_cache() if CACHE_ENABLED else None
+    if cache is not None:
+        cached = cache.get(prompt)
+        if cached is not None:
+            return cached
     try:
-        # Corrected model name for the current API
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(
-            f"You are Campus Buddy, a formal and concise virtual assistant for a college. "
-            f"Respond politely and professionally to the following student question:\n\n{prompt}"
-        )
-
-        if hasattr(response, "text") and response.text:
-            return response.text.strip()
-        else:
-            return "I'm sorry, I couldn’t process that right now."
+        answer = (generate or _ask_gemini)(prompt)
     except Exception as e:
-        return f"Sorry, I couldn’t connect to the Gemini API. ({e})"
+        return _error_message(e)
+    if cache is not None and answer:
+        cache.put(prompt, answer)
+    return answer
+
+def stream_gemini_response(prompt: str, stream=None):
+    # Like get_gemini_response, but yields the answer in chunks as Gemini produces them.
+    # stream(prompt) -> iterator of str replaces the Gemini call.
+    cache = get_response_cache() if CACHE_ENABLED else None
+    if cache is not None:
+        cached = cache.get(prompt)
+        if cached is not None:
+            yield cached
+            return
+    chunks = []
+    try:
+        for chunk in (stream or (lambda p: get_gemini_client().stream(_build_prompt(p))))(prompt):
+            chunks.append(chunk)
+            yield chunk
+    except Exception as e:
+        yield ("\n\n" if chunks else "") + _error_message(e)
+        return
+    answer = "".join(chunks).strip()
+    if not answer:
+        yield _error_message(ValueError("empty response"))
+    elif cache is not None:
+        cache.put(prompt, answer)
 
 # MAIN FUNCTION
 def get_chatbot_response(user_input: str):
@@ -108,3 +239,16 @@ def get_chatbot_response(user_input: str):
 
     # Fallback (shouldn’t happen)
     return "I'm not sure how to answer that right now.", "unknown"
+
+def stream_chatbot_response(user_input: str):
+    # Streaming variant of get_chatbot_response: returns (chunk iterator, response source type).
+    rule_response = get_rule_based_response(user_input)
+    if rule_response:
+        return iter([rule_response]), "rule"
+    return stream_gemini_response(user_input), "gemini"
+
+
+# INSTRUMENTATION
+# Every public function above is timed (see backend/metrics.py); the streaming ones from the first
+# chunk to the last.
+metrics.instrument(globals(), "chatbot")
@@ -1,15 +1,165 @@
 # backend/database.py
+import json
+import os
+import re
 import sqlite3
-from datetime import datetime
+import itertools
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from backend import metrics, nlp_utils, notifications
 
 DB_PATH = "complaints.db"
 
-# DATABASE INITIALIZATION
-def init_db():
-    # Create complaints table if it does not exist.
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('''
+# CONNECTION MANAGER
+# Connections are pooled per database file and reused across calls and Streamlit reruns
+# (each rerun runs on a fresh thread, so the pool is shared rather than thread-local).
+BUSY_TIMEOUT_MS = 5000
+POOL_MAX_IDLE = 8
+STATEMENT_CACHE_SIZE = 256
+
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",          # readers never block the writer and vice versa
+    "PRAGMA synchronous=NORMAL",        # safe with WAL, one fsync per checkpoint instead of per commit
+    f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}",
+    "PRAGMA cache_size=-8000",          # 8 MB page cache per connection
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA foreign_keys=ON",
+)
+
+
+def _open_connection(path):
+    # Open a tuned connection; prepared statements are reused through the sqlite3 statement cache.
+    conn = sqlite3.connect(
+        path,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+        check_same_thread=False,
+        cached_statements=STATEMENT_CACHE_SIZE,
+    )
+    for pragma in _PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+_watcher_ids = itertools.count(1)
+
+
+class _ConnectionPool:
+    # LIFO pool of idle connections for one database file, plus one read-only "watcher" connection
+    # whose PRAGMA data_version changes whenever any other connection (in any process) commits.
+
+    def __init__(self, path, max_idle=POOL_MAX_IDLE):
+        self.path = path
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._watcher_id = None
+        self._watcher_lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return _open_connection(self.path)
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def data_version(self):
+        # data_version values are only comparable on the same connection, so the watcher's id is part of the token.
+        with self._watcher_lock:
+            if self._watcher is None:
+                self._watcher = _open_connection(self.path)
+                self._watcher_id = next(_watcher_ids)
+            return self._watcher_id, self._watcher.execute("PRAGMA data_version").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        with self._watcher_lock:
+            watcher, self._watcher = self._watcher, None
+        for conn in idle + ([watcher] if watcher else []):
+            conn.close()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _get_pool(path=None):
+    path = path or DB_PATH
+    pool = _pools.get(path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.setdefault(path, _ConnectionPool(path))
+    return pool
+
+
+@contextmanager
+def connection(path=None):
+    # Borrow a pooled connection for reads.
+    pool = _get_pool(path)
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+
+@contextmanager
+def transaction(path=None):
+    # Borrow a pooled connection and commit on success, roll back on error.
+    with connection(path) as conn:
+        with conn:
+            yield conn
+
+
+def data_version(path=None):
+    # Opaque token that changes after every committed write to the database (from this process or
+    # another one). Equal tokens mean nothing was written in between, so cached reads are still valid.
+    return _get_pool(path).data_version()
+
+
+def close_connections():
+    # Close every idle pooled connection (e.g. before deleting or swapping DB_PATH).
+    _migrated_paths.clear()
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+# SCHEMA
+# Column order of every complaint row returned by the fetch functions below.
+COMPLAINT_COLUMNS = (
+    "id", "type", "category", "subcategory", "description", "is_anonymous",
+    "file_path", "email", "status", "assigned_to", "created_at", "created_ts",
+    "sentiment", "priority", "keywords", "suggested_category", "updated_ts", "attachment_id",
+    "resolved_ts",
+)
+ENRICHMENT_COLUMNS = ("sentiment", "priority", "keywords", "suggested_category")  # contiguous in COMPLAINT_COLUMNS
+_DESCRIPTION_IDX = COMPLAINT_COLUMNS.index("description")
+_SENTIMENT_IDX = COMPLAINT_COLUMNS.index("sentiment")
+# Attribute access to a row (r.status, r.description, ...) without building a DataFrame.
+Complaint = namedtuple("Complaint", COMPLAINT_COLUMNS)
+_SELECT_COMPLAINTS = f"SELECT {', '.join(COMPLAINT_COLUMNS)} FROM complaints"
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _migration_create_complaints(conn):
+    # v1: original complaints table.
+    conn.execute('''
         CREATE TABLE IF NOT EXISTS complaints (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             type TEXT,
@@ -24,62 +174,1482 @@ def init_db():
             created_at TEXT
         )
     ''')
+
+
+def _migration_epoch_timestamps(conn):
+    # v2: numeric created_ts (unix epoch, seconds) backfilled from the local-time created_at text,
+    # plus composite indexes for the per-student, per-status and per-category listings.
+    conn.execute("ALTER TABLE complaints ADD COLUMN created_ts INTEGER")
+    conn.execute("UPDATE complaints SET created_ts = CAST(strftime('%s', created_at, 'utc') AS INTEGER)")
+    # Rows written by older app versions still only carry created_at.
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS complaints_fill_created_ts
+        AFTER INSERT ON complaints WHEN NEW.created_ts IS NULL
+        BEGIN
+            UPDATE complaints SET created_ts = CAST(strftime('%s', NEW.created_at, 'utc') AS INTEGER)
+            WHERE id = NEW.id;
+        END
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_complaints_created ON complaints(created_ts)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_complaints_email_created ON complaints(email, created_ts)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_complaints_status_created ON complaints(status, created_ts)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_complaints_category_created ON complaints(category, created_ts)")
+
+
+def _migration_nlp_enrichment(conn):
+    # v3: NLP results computed once per complaint. nlp_version records which enrichment logic
+    # produced them; NULL means "not enriched yet" (legacy rows, or the description changed).
+    for column in ("sentiment TEXT", "priority TEXT", "keywords TEXT", "suggested_category TEXT", "nlp_version INTEGER"):
+        conn.execute(f"ALTER TABLE complaints ADD COLUMN {column}")
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS complaints_description_changed
+        AFTER UPDATE OF description ON complaints WHEN NEW.description IS NOT OLD.description
+        BEGIN
+            UPDATE complaints
+            SET sentiment = NULL, priority = NULL, keywords = NULL, suggested_category = NULL, nlp_version = NULL
+            WHERE id = NEW.id;
+        END
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_complaints_nlp_version ON complaints(nlp_version)")
+
+
+def _migration_full_text_search(conn):
+    # v4: FTS5 index over descriptions (external content: the text lives only in complaints),
+    # kept in sync by triggers and filled from the existing rows.
+    conn.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS complaints_fts USING fts5(
+            description, content='complaints', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2'
+        )
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS complaints_fts_insert AFTER INSERT ON complaints
+        BEGIN
+            INSERT INTO complaints_fts (rowid, description) VALUES (NEW.id, NEW.description);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS complaints_fts_delete AFTER DELETE ON complaints
+        BEGIN
+            INSERT INTO complaints_fts (complaints_fts, rowid, description) VALUES ('delete', OLD.id, OLD.description);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS complaints_fts_update AFTER UPDATE OF description ON complaints
+        BEGIN
+            INSERT INTO complaints_fts (complaints_fts, rowid, description) VALUES ('delete', OLD.id, OLD.description);
+            INSERT INTO complaints_fts (rowid, description) VALUES (NEW.id, NEW.description);
+        END
+    ''')
+    conn.execute("INSERT INTO complaints_fts (complaints_fts) VALUES ('rebuild')")
+
+
+def _migration_change_tracking(conn):
+    # v5: updated_ts (unix epoch of the last change) and change_seq, a table-wide counter bumped on
+    # every insert/update, so "everything changed since X" is an index range scan with no ties.
+    # Export watermarks remember the last change_seq each named export has seen.
+    conn.execute("ALTER TABLE complaints ADD COLUMN updated_ts INTEGER")
+    conn.execute("ALTER TABLE complaints ADD COLUMN change_seq INTEGER")
+    conn.execute("UPDATE complaints SET updated_ts = created_ts, change_seq = id")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_complaints_change_seq ON complaints(change_seq)")
+    bump = '''
+            UPDATE complaints
+            SET updated_ts = CAST(strftime('%s', 'now') AS INTEGER),
+                change_seq = (SELECT COALESCE(MAX(change_seq), 0) + 1 FROM complaints)
+            WHERE id = NEW.id;
+    '''
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS complaints_track_insert AFTER INSERT ON complaints BEGIN {bump} END")
+    # The WHEN clause skips the trigger's own update (and any update that sets change_seq itself)
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS complaints_track_update AFTER UPDATE ON complaints
+        WHEN NEW.change_seq IS OLD.change_seq
+        BEGIN {bump} END
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS export_watermarks (
+            name TEXT PRIMARY KEY,
+            change_seq INTEGER NOT NULL,
+            exported_at INTEGER NOT NULL
+        )
+    ''')
+
+
+# Dashboard counters: complaints per value of each dimension, so the summary never scans complaints.
+# Missing values are counted under ''. Each expression is evaluated on a row alias ({row}).
+COUNTER_DIMENSIONS = {
+    "status": "COALESCE({row}.status, '')",
+    "category": "COALESCE({row}.category, '')",
+    "type": "COALESCE({row}.type, '')",
+    "sentiment": "COALESCE({row}.sentiment, '')",
+    "day": "COALESCE(date({row}.created_ts, 'unixepoch', 'localtime'), '')",
+}
+_COUNTER_COLUMNS = ("status", "category", "type", "sentiment", "created_ts")  # what the dimensions read
+
+
+def _counter_source(where=""):
+    # Actual counts computed from complaints (optionally only rows matching `where`), in
+    # complaint_counts form; a `where` with parameters needs them once per dimension plus once.
+    return " UNION ALL ".join(
+        [f"SELECT 'total', '', COUNT(*) FROM complaints {where}"] + [
+            f"SELECT '{dimension}', {expr.format(row='c')}, COUNT(*) FROM complaints c {where} GROUP BY 2"
+            for dimension, expr in COUNTER_DIMENSIONS.items()
+        ]
+    )
+
+
+_COUNTER_SOURCE = _counter_source()  # used to fill and check complaint_counts
+
+
+def _counter_upsert(row, delta, with_total):
+    # One statement adding delta to every counter the row alias falls under.
+    values = [("total", "''")] if with_total else []
+    values += [(dimension, expr.format(row=row)) for dimension, expr in COUNTER_DIMENSIONS.items()]
+    rows = ", ".join(f"('{dimension}', {value}, {delta})" for dimension, value in values)
+    return (f"INSERT INTO complaint_counts (dimension, value, count) VALUES {rows} "
+            "ON CONFLICT (dimension, value) DO UPDATE SET count = count + excluded.count;")
+
+
+def _migration_dashboard_counters(conn):
+    # v6: complaint_counts, kept current by triggers, so the dashboard summary reads a few dozen
+    # rows however many complaints there are. Counters that drop to 0 are kept (and ignored).
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS complaint_counts (
+            dimension TEXT NOT NULL,
+            value TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (dimension, value)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS complaints_count_insert AFTER INSERT ON complaints
+        BEGIN {_counter_upsert("NEW", 1, with_total=True)} END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS complaints_count_delete AFTER DELETE ON complaints
+        BEGIN {_counter_upsert("OLD", -1, with_total=True)} END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS complaints_count_update AFTER UPDATE OF {", ".join(_COUNTER_COLUMNS)} ON complaints
+        WHEN {" OR ".join(f"NEW.{c} IS NOT OLD.{c}" for c in _COUNTER_COLUMNS)}
+        BEGIN
+            {_counter_upsert("OLD", -1, with_total=False)}
+            {_counter_upsert("NEW", 1, with_total=False)}
+        END
+    ''')
+    conn.execute(f"INSERT INTO complaint_counts (dimension, value, count) {_COUNTER_SOURCE}")
+
+
+def _migration_bulk_ingest(conn):
+    # v7: indexes and triggers dropped by a running bulk ingest, with their SQL, so
+    # finish_bulk_ingest() can recreate them even after an interrupted ingest.
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS deferred_objects (
+            name TEXT PRIMARY KEY,
+            sql TEXT NOT NULL
+        )
+    ''')
+
+
+def _migration_attachments(conn):
+    # v8: uploaded files, one row per upload (name, type, size) pointing at the stored content by its
+    # SHA-256, so identical uploads share one file. Complaints reference the row instead of a path;
+    # file_path stays for rows written before this.
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS attachments (
+            id INTEGER PRIMARY KEY,
+            sha256 TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            content_type TEXT,
+            original_name TEXT,
+            created_ts INTEGER NOT NULL
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_attachments_sha256 ON attachments(sha256)")
+    conn.execute("ALTER TABLE complaints ADD COLUMN attachment_id INTEGER REFERENCES attachments(id)")
+
+
+# Trend aggregates: complaints opened and resolved per local day and category, so volume and
+# resolution trends over any range read at most one row per day and category. Weeks and months are
+# summed from the days when queried. Missing categories (and timestamps) are kept under ''.
+_TREND_COLUMNS = ("category", "created_ts", "resolved_ts")  # what the aggregates read
+
+
+def _trend_day(column):
+    return f"COALESCE(date({column}, 'unixepoch', 'localtime'), '')"
+
+
+def _trend_source(where=""):
+    # complaint_trends rows computed from complaints (optionally only rows matching `where`, whose
+    # parameters are then needed twice).
+    also = f"{where} AND" if where else "WHERE"
+    return f'''
+        SELECT day, category, SUM(opened), SUM(resolved), SUM(resolution_s) FROM (
+            SELECT {_trend_day("created_ts")} AS day, COALESCE(category, '') AS category,
+                   1 AS opened, 0 AS resolved, 0 AS resolution_s
+            FROM complaints {where}
+            UNION ALL
+            SELECT {_trend_day("resolved_ts")}, COALESCE(category, ''), 0, 1, resolved_ts - created_ts
+            FROM complaints {also} resolved_ts IS NOT NULL
+        ) GROUP BY day, category
+    '''
+
+
+_TREND_SOURCE = _trend_source()  # used to fill and check complaint_trends
+
+
+def _trend_upsert(row, delta):
+    # Statements adding delta to the aggregates the row alias falls under: opened on its creation day,
+    # resolved (and its resolution time) on its resolution day.
+    return f'''
+        INSERT INTO complaint_trends (day, category, opened)
+        VALUES ({_trend_day(f"{row}.created_ts")}, COALESCE({row}.category, ''), {delta})
+        ON CONFLICT (day, category) DO UPDATE SET opened = opened + excluded.opened;
+        INSERT INTO complaint_trends (day, category, resolved, resolution_s)
+        SELECT {_trend_day(f"{row}.resolved_ts")}, COALESCE({row}.category, ''), {delta},
+               {delta} * ({row}.resolved_ts - {row}.created_ts)
+        WHERE {row}.resolved_ts IS NOT NULL
+        ON CONFLICT (day, category) DO UPDATE SET
+            resolved = resolved + excluded.resolved, resolution_s = resolution_s + excluded.resolution_s;
+    '''
+
+
+def _migration_trends(conn):
+    # v9: resolved_ts (unix epoch at which a complaint was last marked Resolved; NULL while it is not
+    # resolved), stamped by a trigger on status changes, and complaint_trends, kept current by triggers.
+    # Complaints resolved before this get their last-change time as the best available estimate.
+    conn.execute("ALTER TABLE complaints ADD COLUMN resolved_ts INTEGER")
+    # The estimate is not a change, so the change-tracking trigger is kept out of it
+    track_sql = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'complaints_track_update'"
+    ).fetchone()[0]
+    conn.execute("DROP TRIGGER complaints_track_update")
+    conn.execute("UPDATE complaints SET resolved_ts = COALESCE(updated_ts, created_ts) WHERE status = 'Resolved'")
+    conn.execute(track_sql)
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS complaints_stamp_resolved AFTER UPDATE OF status ON complaints
+        WHEN (NEW.status = 'Resolved') IS NOT (OLD.status = 'Resolved')
+        BEGIN
+            UPDATE complaints
+            SET resolved_ts = CASE WHEN NEW.status = 'Resolved' THEN CAST(strftime('%s', 'now') AS INTEGER) END
+            WHERE id = NEW.id;
+        END
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS complaint_trends (
+            day TEXT NOT NULL,
+            category TEXT NOT NULL,
+            opened INTEGER NOT NULL DEFAULT 0,
+            resolved INTEGER NOT NULL DEFAULT 0,
+            resolution_s INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, category)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS complaints_trends_insert AFTER INSERT ON complaints
+        BEGIN {_trend_upsert("NEW", 1)} END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS complaints_trends_delete AFTER DELETE ON complaints
+        BEGIN {_trend_upsert("OLD", -1)} END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS complaints_trends_update AFTER UPDATE OF {", ".join(_TREND_COLUMNS)} ON complaints
+        WHEN {" OR ".join(f"NEW.{c} IS NOT OLD.{c}" for c in _TREND_COLUMNS)}
+        BEGIN
+            {_trend_upsert("OLD", -1)}
+            {_trend_upsert("NEW", 1)}
+        END
+    ''')
+    conn.execute(f"INSERT INTO complaint_trends (day, category, opened, resolved, resolution_s) {_TREND_SOURCE}")
+
+
+def _migration_job_queue(conn):
+    # v10: durable background jobs for backend/worker.py (see JOB QUEUE below). run_after is when a
+    # queued job becomes due, or when the lease of a running one expires, so one partial index finds both.
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY,
+            kind TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            state TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL,
+            run_after INTEGER NOT NULL,
+            lease_owner TEXT,
+            last_error TEXT,
+            created_ts INTEGER NOT NULL,
+            finished_ts INTEGER
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_due ON jobs(run_after) WHERE state IN ('queued', 'running')")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_done ON jobs(finished_ts) WHERE state='done'")
+
+
+def _migration_near_duplicates(conn):
+    # v11: near-duplicate index (see NEAR DUPLICATES below). One row per indexed complaint with its
+    # cluster and MinHash signature (cleared once the complaint is too old to match), and one LSH
+    # bucket row per band, keyed so a lookup reads only the recent entries of one bucket.
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS near_duplicates (
+            complaint_id INTEGER PRIMARY KEY,
+            cluster_id INTEGER NOT NULL,
+            created_ts INTEGER NOT NULL,
+            signature BLOB
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_near_duplicates_cluster ON near_duplicates(cluster_id)")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_near_duplicates_signed ON near_duplicates(created_ts) "
+        "WHERE signature IS NOT NULL"
+    )
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS lsh_buckets (
+            band INTEGER NOT NULL,
+            bucket INTEGER NOT NULL,
+            created_ts INTEGER NOT NULL,
+            complaint_id INTEGER NOT NULL,
+            PRIMARY KEY (band, bucket, created_ts, complaint_id)
+        ) WITHOUT ROWID
+    ''')
+    # Bucket rows of a deleted complaint are left to prune_near_duplicate_index(); lookups join
+    # near_duplicates, so they never match
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS complaints_near_duplicates_delete AFTER DELETE ON complaints BEGIN
+            DELETE FROM near_duplicates WHERE complaint_id = old.id;
+        END
+    ''')
+
+
+def _migration_deferred_ingest(conn):
+    # v12: the running (or interrupted) deferred bulk ingest: the rows after after_id still need the
+    # insert triggers' work, and heartbeat_ts (last committed batch) tells whether the importer is alive.
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS deferred_ingest (
+            after_id INTEGER NOT NULL,
+            heartbeat_ts INTEGER NOT NULL
+        )
+    ''')
+
+
+# Ordered list of schema migrations; the schema version is the number applied so far.
+# Append new migrations at the end and never edit one that has shipped.
+MIGRATIONS = [
+    _migration_create_complaints,
+    _migration_epoch_timestamps,
+    _migration_nlp_enrichment,
+    _migration_full_text_search,
+    _migration_change_tracking,
+    _migration_dashboard_counters,
+    _migration_bulk_ingest,
+    _migration_attachments,
+    _migration_trends,
+    _migration_job_queue,
+    _migration_near_duplicates,
+    _migration_deferred_ingest,
+]
+
+_migrated_paths = set()
+
+
+def _schema_version(conn):
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+
+def migrate(conn):
+    # Upgrade the database in place to the latest schema version and return it.
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            applied_at INTEGER NOT NULL
+        )
+    ''')
     conn.commit()
-    conn.close()
+    for version, migration in enumerate(MIGRATIONS, start=1):
+        if _schema_version(conn) >= version:
+            continue
+        # IMMEDIATE takes the write lock up front, so two processes starting together
+        # cannot both apply the same migration.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if _schema_version(conn) < version:
+                migration(conn)
+                conn.execute(
+                    "INSERT INTO schema_version (version, applied_at) VALUES (?, strftime('%s', 'now'))",
+                    (version,),
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return len(MIGRATIONS)
+
+
+# DATABASE INITIALIZATION
+def init_db():
+    # Create or upgrade the schema and finish a bulk ingest whose importer died (only checked once
+    # per database file per process).
+    path = DB_PATH
+    if path in _migrated_paths:
+        return
+    with connection(path) as conn:
+        migrate(conn)
+    _migrated_paths.add(path)
+    finish_stale_bulk_ingest()
 
 # ADD COMPLAINT
-def add_complaint(ctype, category, subcategory, description, anon, file_path, email):
-    # Insert a new complaint into the database.
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('''
-        INSERT INTO complaints 
-        (type, category, subcategory, description, is_anonymous, file_path, email, status, assigned_to, created_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, 'Pending', NULL, ?)
-    ''', (ctype, category, subcategory, description, int(anon), file_path, email, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
-    conn.commit()
-    conn.close()
+def _enrichment_values(descriptions):
+    # Stored form of nlp_utils.enrich_complaints (keywords as a JSON list), one tuple per description.
+    return [
+        (result["sentiment"], result["priority"], json.dumps(result["keywords"]),
+         result["suggested_category"], nlp_utils.NLP_VERSION)
+        for result in nlp_utils.enrich_complaints(descriptions)
+    ]
+
+# With async enrichment (the default) add_complaint only stores the complaint and queues a NEW_COMPLAINT_JOB;
+# the worker (python -m backend.worker) computes the enrichment and sends the notification. Until then
+# ensure_enriched() fills it in for rows an admin looks at. CAMPUS_BUDDY_ASYNC_ENRICHMENT=0 enriches inline.
+ASYNC_ENRICHMENT = os.getenv("CAMPUS_BUDDY_ASYNC_ENRICHMENT", "1") != "0"
+NEW_COMPLAINT_JOB = "new_complaint"
+
+def add_complaint(ctype, category, subcategory, description, anon, file_path, email, attachment_id=None):
+    # Insert a new complaint into the database (enrichment: see ASYNC_ENRICHMENT above).
+    # attachment_id: from backend.attachments.save_attachment (file_path is only kept for old rows).
+    # Returns the new complaint's id.
+    now = datetime.now()
+    signature = _near_duplicate_signature(description)
+    enrichment = (None, None, None, None, None)  # left for the worker, or backfill_enrichment()
+    if not ASYNC_ENRICHMENT:
+        try:
+            enrichment = _enrichment_values([description])[0]
+        except Exception:
+            pass
+    with transaction() as conn:
+        cid = conn.execute('''
+            INSERT INTO complaints
+            (type, category, subcategory, description, is_anonymous, file_path, email, status, assigned_to,
+             created_at, created_ts, sentiment, priority, keywords, suggested_category, nlp_version, attachment_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, 'Pending', NULL, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (ctype, category, subcategory, description, int(anon), file_path, email,
+              now.strftime(TIMESTAMP_FORMAT), int(now.timestamp()), *enrichment, attachment_id)).lastrowid
+        # Queued in the same transaction: a stored complaint always has its job
+        if ASYNC_ENRICHMENT or notifications.ENABLED:
+            _enqueue(conn, NEW_COMPLAINT_JOB, {"id": cid})
+        if signature is not None:
+            _index_near_duplicate(conn, cid, int(now.timestamp()), signature)
+    return cid
+
+# BULK INGEST
+BULK_BATCH_SIZE = 5000
+# Per-row index and trigger upkeep dominates large inserts, so a deferred bulk ingest drops these.
+# The triggers' work (FTS entries, dashboard counters, trend aggregates) is done set-based, once, when the
+# ingest finishes, and the indexes are rebuilt then. deferred_ingest remembers where the ingest started.
+_DEFERRED_INDEXES = (
+    "idx_complaints_created", "idx_complaints_email_created", "idx_complaints_status_created",
+    "idx_complaints_category_created", "idx_complaints_nlp_version", "idx_complaints_change_seq",
+)
+# (complaints_fill_created_ts has nothing to catch up: bulk rows always carry created_ts)
+_DEFERRED_TRIGGERS = (
+    "complaints_fts_insert", "complaints_track_insert", "complaints_count_insert", "complaints_trends_insert",
+    "complaints_fill_created_ts",
+)
+# Missing values are bound as '' and turned into NULL here (binding None is several times slower
+# per parameter), and created_at is formatted by SQLite from created_ts (?10) instead of strftime per row.
+_BULK_INSERT = '''
+    INSERT INTO complaints
+    (type, category, subcategory, description, is_anonymous, file_path, email, status, assigned_to, created_ts,
+     resolved_ts, created_at, sentiment, priority, keywords, suggested_category, nlp_version, updated_ts, change_seq)
+    VALUES (NULLIF(?1, ''), NULLIF(?2, ''), NULLIF(?3, ''), ?4, ?5, NULLIF(?6, ''), NULLIF(?7, ''), ?8,
+            NULLIF(?9, ''), ?10, NULLIF(?11, ''), datetime(?10, 'unixepoch', 'localtime'), NULLIF(?12, ''),
+            NULLIF(?13, ''), NULLIF(?14, ''), NULLIF(?15, ''), NULLIF(?16, ''), ?17, ?18)
+'''
+BULK_INGEST_STALE_S = 300  # a deferred ingest that committed no batch for this long is presumed dead
+_NO_ENRICHMENT = ("",) * 5
+_FLAG_VALUES = {"1": 1, "true": 1, "yes": 1, "y": 1, "0": 0, "false": 0, "no": 0, "n": 0, "": 0}
+
+def _epoch(value):
+    return value if isinstance(value, int) else int(float(value))
+
+def _bulk_row(record, now):
+    # Column values (type ... assigned_to, created_ts, resolved_ts; '' where missing) for one imported record,
+    # a dict keyed by complaint column names. created_ts (epoch seconds) or created_at (local ISO date/time)
+    # may be given; neither means now. resolved_ts (epoch seconds) is kept for Resolved complaints only.
+    # Raises ValueError (or TypeError) for records that cannot be stored.
+    description = (record.get("description") or "").strip()
+    if not description:
+        raise ValueError("description is empty")
+    anonymous = record.get("is_anonymous") or 0
+    if isinstance(anonymous, str):
+        flag = _FLAG_VALUES.get(anonymous.strip().lower())
+        if flag is None:
+            raise ValueError(f"is_anonymous is not a yes/no value: {anonymous!r}")
+        anonymous = flag
+    created_ts = record.get("created_ts")
+    if created_ts not in (None, ""):
+        created_ts = _epoch(created_ts)
+    elif record.get("created_at"):
+        created_ts = int(datetime.fromisoformat(str(record["created_at"]).strip()).timestamp())
+    else:
+        created_ts = now
+    status = record.get("status") or "Pending"
+    resolved_ts = record.get("resolved_ts")
+    resolved_ts = _epoch(resolved_ts) if status == "Resolved" and resolved_ts not in (None, "") else ""
+    return (
+        record.get("type") or "", record.get("category") or "", record.get("subcategory") or "",
+        description, int(bool(anonymous)), record.get("file_path") or "", record.get("email") or "",
+        status, record.get("assigned_to") or "", created_ts, resolved_ts,
+    )
+
+def _bulk_enrichment(descriptions):
+    # _enrichment_values, or empty values (left for backfill_enrichment()) if enrichment fails.
+    try:
+        return _enrichment_values(descriptions)
+    except Exception:
+        return [_NO_ENRICHMENT] * len(descriptions)
+
+def _enriched_batches(batches, enrich, workers):
+    # (rows, enrichment values) per batch; with workers > 1 batches are enriched in a process pool,
+    # up to `workers` batches ahead of the inserts.
+    if not enrich:
+        for batch in batches:
+            yield batch, [_NO_ENRICHMENT] * len(batch)
+    elif workers <= 1:
+        for batch in batches:
+            yield batch, _bulk_enrichment([row[3] for row in batch])
+    else:
+        from collections import deque
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for batch in batches:
+                pending.append((batch, pool.submit(_bulk_enrichment, [row[3] for row in batch])))
+                if len(pending) > workers:
+                    batch, future = pending.popleft()
+                    yield batch, future.result()
+            while pending:
+                batch, future = pending.popleft()
+                yield batch, future.result()
+
+def _defer_maintenance(conn):
+    # Drop the deferred indexes and triggers, keeping their SQL in deferred_objects, and record
+    # where the ingest starts.
+    conn.execute("DELETE FROM deferred_ingest")
+    conn.execute(
+        "INSERT INTO deferred_ingest (after_id, heartbeat_ts) "
+        "SELECT COALESCE(MAX(id), 0), CAST(strftime('%s', 'now') AS INTEGER) FROM complaints"
+    )
+    names = _DEFERRED_INDEXES + _DEFERRED_TRIGGERS
+    objects = conn.execute(
+        f"SELECT type, name, sql FROM sqlite_master WHERE name IN ({','.join('?' * len(names))})", names,
+    ).fetchall()
+    conn.executemany("INSERT INTO deferred_objects (name, sql) VALUES (?, ?)", [(name, sql) for _, name, sql in objects])
+    for kind, name, _ in objects:
+        conn.execute(f"DROP {kind.upper()} {name}")
+
+def _catch_up_inserted(conn, after_id):
+    # What the insert triggers would have done for the rows with id > after_id, as set-based statements.
+    conn.execute(
+        "INSERT INTO complaints_fts (rowid, description) SELECT id, description FROM complaints WHERE id > ?",
+        (after_id,),
+    )
+    conn.execute(
+        f"INSERT INTO complaint_counts (dimension, value, count) "
+        f"SELECT * FROM ({_counter_source('WHERE id > ?')}) WHERE true "
+        "ON CONFLICT (dimension, value) DO UPDATE SET count = count + excluded.count",
+        (after_id,) * (len(COUNTER_DIMENSIONS) + 1),
+    )
+    conn.execute(
+        f"INSERT INTO complaint_trends (day, category, opened, resolved, resolution_s) "
+        f"SELECT * FROM ({_trend_source('WHERE id > ?')}) WHERE true "
+        "ON CONFLICT (day, category) DO UPDATE SET opened = opened + excluded.opened, "
+        "resolved = resolved + excluded.resolved, resolution_s = resolution_s + excluded.resolution_s",
+        (after_id, after_id),
+    )
+
+def _assign_missing_change_seq(conn, after_id):
+    # Rows other processes added while complaints_track_insert was dropped have no change_seq (so no
+    # export would ever pick them up); number them after every existing one.
+    conn.execute('''
+        UPDATE complaints
+        SET updated_ts = COALESCE(updated_ts, CAST(strftime('%s', 'now') AS INTEGER)), change_seq = m.base + r.n
+        FROM (SELECT id, ROW_NUMBER() OVER (ORDER BY id) AS n FROM complaints WHERE id > ? AND change_seq IS NULL) r,
+             (SELECT COALESCE(MAX(change_seq), 0) AS base FROM complaints) m
+        WHERE complaints.id = r.id
+    ''', (after_id,))
+
+def finish_bulk_ingest(repair=True):
+    # Finish a deferred bulk ingest (also an interrupted one): do the insert triggers' work for the rows
+    # added since it started, give rows written meanwhile by other processes a change_seq, and recreate
+    # the dropped indexes and triggers. repair (for an interrupted ingest, during which other processes
+    # may also have updated rows the triggers never saw): rebuild the search index and recompute the
+    # counters and trends instead of adding the new rows to them. Returns False if there was nothing to finish.
+    with transaction() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        deferred = conn.execute("SELECT sql FROM deferred_objects").fetchall()
+        state = conn.execute("SELECT after_id FROM deferred_ingest").fetchone()
+        if not deferred and state is None:
+            return False
+        after_id = state[0] if state else 0
+        _assign_missing_change_seq(conn, after_id)
+        if repair or state is None:  # (no start recorded: an ingest from before deferred_ingest existed)
+            conn.execute("INSERT INTO complaints_fts (complaints_fts) VALUES ('rebuild')")
+            conn.execute("DELETE FROM complaint_counts")
+            conn.execute(f"INSERT INTO complaint_counts (dimension, value, count) {_COUNTER_SOURCE}")
+            conn.execute("DELETE FROM complaint_trends")
+            conn.execute(f"INSERT INTO complaint_trends (day, category, opened, resolved, resolution_s) {_TREND_SOURCE}")
+        else:
+            _catch_up_inserted(conn, after_id)
+        for sql, in deferred:
+            conn.execute(sql)
+        conn.execute("DELETE FROM deferred_objects")
+        conn.execute("DELETE FROM deferred_ingest")
+    return True
+
+def finish_stale_bulk_ingest(stale_s=BULK_INGEST_STALE_S):
+    # Finish a deferred bulk ingest whose importer was killed (no batch committed for stale_s seconds),
+    # so complaints submitted meanwhile do not stay unsearchable and unexported until someone runs
+    # import_complaints --finish. Called by init_db() and the worker's maintenance(). Returns True if
+    # one was finished.
+    with connection() as conn:
+        heartbeat = conn.execute("SELECT MAX(heartbeat_ts) FROM deferred_ingest").fetchone()[0]
+        pending = heartbeat is not None or conn.execute("SELECT 1 FROM deferred_objects LIMIT 1").fetchone()
+    if not pending or (heartbeat is not None and heartbeat > time.time() - stale_s):
+        return False
+    return finish_bulk_ingest()
+
+def add_complaints_bulk(records, batch_size=BULK_BATCH_SIZE, enrich=True, workers=1, defer_maintenance=True,
+                        progress=None, on_error=None):
+    # Insert many complaints (e.g. a legacy archive) from an iterable of dicts keyed by complaint
+    # column names (see _bulk_row), one transaction per batch. Records are consumed as a stream.
+    # enrich: compute the NLP enrichment now (workers > 1: in a process pool); otherwise it is left
+    # for backfill_enrichment(). defer_maintenance: replace per-row index/trigger upkeep with one
+    # set-based pass and index rebuild at the end (see _DEFERRED_INDEXES), so imported rows become
+    # searchable and counted when the import finishes; other writers should be idle meanwhile.
+    # progress(inserted, rejected) is called after every batch; on_error(position, record, exc) for
+    # every rejected record (position = index in `records`). Returns (inserted, rejected).
+    finish_bulk_ingest()  # an earlier ingest that was interrupted
+    now = int(datetime.now().timestamp())
+    inserted = rejected = 0
+
+    def batches():
+        nonlocal rejected
+        batch = []
+        for position, record in enumerate(records):
+            try:
+                batch.append(_bulk_row(record, now))
+            except (ValueError, TypeError, OverflowError) as exc:
+                rejected += 1
+                if on_error:
+                    on_error(position, record, exc)
+                continue
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    with transaction() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        # change_seq is assigned here (the tracking trigger may be dropped); with the trigger in place it is
+        # overwritten with the same kind of value.
+        seq = conn.execute("SELECT COALESCE(MAX(change_seq), 0) FROM complaints").fetchone()[0]
+        if defer_maintenance:
+            _defer_maintenance(conn)
+    try:
+        for batch, enrichment in _enriched_batches(batches(), enrich, workers):
+            updated_ts = int(datetime.now().timestamp())
+            rows = [(*row, *values, updated_ts, seq + i) for i, (row, values) in enumerate(zip(batch, enrichment), 1)]
+            with transaction() as conn:
+                conn.executemany(_BULK_INSERT, rows)
+                if defer_maintenance:
+                    conn.execute("UPDATE deferred_ingest SET heartbeat_ts = ?", (updated_ts,))
+            seq += len(rows)
+            inserted += len(rows)
+            if progress:
+                progress(inserted, rejected)
+    finally:
+        if defer_maintenance:
+            finish_bulk_ingest(repair=False)
+    return inserted, rejected
 
 # FETCH COMPLAINTS
 def get_all_complaints():
     # Fetch all complaints from the database
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT * FROM complaints ORDER BY created_at DESC")
-    rows = c.fetchall()
-    conn.close()
-    return rows
+    with connection() as conn:
+        return conn.execute(f"{_SELECT_COMPLAINTS} ORDER BY created_ts DESC, id DESC").fetchall()
+
+def get_complaint(cid):
+    # One complaint by id, or None.
+    with connection() as conn:
+        row = conn.execute(f"{_SELECT_COMPLAINTS} WHERE id=?", (cid,)).fetchone()
+    return Complaint(*row) if row else None
 
 def get_complaints_by_email(email):
     # Fetch all complaints submitted by a specific student.
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT * FROM complaints WHERE email=? ORDER BY created_at DESC", (email,))
-    rows = c.fetchall()
-    conn.close()
-    return rows
+    with connection() as conn:
+        return conn.execute(
+            f"{_SELECT_COMPLAINTS} WHERE email=? ORDER BY created_ts DESC, id DESC", (email,)
+        ).fetchall()
+
+# PAGINATION
+DEFAULT_PAGE_SIZE = 20
+
+def _fetch_page(conn, where, params, page_size, cursor):
+    # Keyset pagination, newest first: rows strictly after the cursor (created_ts, id) of the
+    # previous page's last row. Cost depends on page size, not on how deep the page is.
+    clauses = list(where)
+    params = list(params)
+    if cursor is not None:
+        clauses.append("(created_ts, id) < (?, ?)")
+        params.extend(cursor)
+    sql = _SELECT_COMPLAINTS
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY created_ts DESC, id DESC LIMIT ?"
+    params.append(page_size + 1)
+    rows = conn.execute(sql, params).fetchall()
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        return rows, (last[COMPLAINT_COLUMNS.index("created_ts")], last[0])
+    return rows, None
+
+def get_complaints_page(email=None, page_size=DEFAULT_PAGE_SIZE, cursor=None):
+    # Fetch one page of complaints (optionally for one student).
+    # Returns (rows, next_cursor); pass next_cursor back in for the following page, None means last page.
+    where, params = [], []
+    if email is not None:
+        where.append("email=?")
+        params.append(email)
+    with connection() as conn:
+        return _fetch_page(conn, where, params, page_size, cursor)
+
+# FILTERING
+def _day_start_ts(day):
+    # Epoch seconds of local midnight at the start of a date (datetimes are used as-is).
+    if isinstance(day, datetime):
+        return int(day.timestamp())
+    return int(datetime.combine(day, datetime.min.time()).timestamp())
+
+def _filter_clauses(category=None, status=None, date_from=None, date_to=None):
+    # Build a parameterized WHERE clause list; every clause matches one of the created_ts indexes.
+    # date_from/date_to are inclusive dates (or exact datetimes).
+    where, params = [], []
+    if category:
+        where.append("category=?")
+        params.append(category)
+    if status:
+        where.append("status=?")
+        params.append(status)
+    if date_from:
+        where.append("created_ts >= ?")
+        params.append(_day_start_ts(date_from))
+    if date_to:
+        if isinstance(date_to, datetime):
+            where.append("created_ts <= ?")
+            params.append(int(date_to.timestamp()))
+        else:
+            where.append("created_ts < ?")
+            params.append(_day_start_ts(date_to + timedelta(days=1)))
+    return where, params
+
+def get_complaints_filtered(category=None, status=None, date_from=None, date_to=None,
+                            limit=DEFAULT_PAGE_SIZE, cursor=None):
+    # Fetch one page of complaints matching the filters, newest first. None/empty means "any".
+    # Returns (rows, next_cursor) like get_complaints_page.
+    where, params = _filter_clauses(category, status, date_from, date_to)
+    with connection() as conn:
+        return _fetch_page(conn, where, params, limit, cursor)
+
+def count_complaints_by_status(category=None, status=None, date_from=None, date_to=None):
+    # Count complaints matching the filters, grouped by status.
+    where, params = _filter_clauses(category, status, date_from, date_to)
+    sql = "SELECT status, COUNT(*) FROM complaints"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " GROUP BY status"
+    with connection() as conn:
+        return dict(conn.execute(sql, params).fetchall())
+
+def get_filter_options():
+    # Distinct categories and statuses present in the table (read from the indexes).
+    with connection() as conn:
+        categories = [r[0] for r in conn.execute(
+            "SELECT DISTINCT category FROM complaints WHERE category IS NOT NULL ORDER BY category")]
+        statuses = [r[0] for r in conn.execute(
+            "SELECT DISTINCT status FROM complaints WHERE status IS NOT NULL ORDER BY status")]
+    return categories, statuses
+
+# DASHBOARD STATS
+def get_dashboard_stats():
+    # Complaint counts for the dashboard, read from complaint_counts (constant time in the table size):
+    # {"total": n, "status": {...}, "category": {...}, "type": {...}, "sentiment": {...}, "day": {...}}.
+    # Missing values are counted under None; "day" keys are local dates (YYYY-MM-DD), oldest first.
+    stats = {"total": 0, **{dimension: {} for dimension in COUNTER_DIMENSIONS}}
+    with connection() as conn:
+        rows = conn.execute(
+            "SELECT dimension, value, count FROM complaint_counts WHERE count != 0 ORDER BY dimension, value"
+        ).fetchall()
+    for dimension, value, count in rows:
+        if dimension == "total":
+            stats["total"] = count
+        elif dimension in stats:
+            stats[dimension][value or None] = count
+    return stats
+
+def check_dashboard_counters(repair=False):
+    # Compare complaint_counts with counts computed from complaints.
+    # Returns the mismatches as (dimension, value, stored, actual); with repair=True the counters are
+    # rebuilt from complaints inside the same write transaction, so no insert can slip in between.
+    with transaction() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        stored = {(d, v): n for d, v, n in conn.execute("SELECT dimension, value, count FROM complaint_counts")}
+        actual = {(d, v): n for d, v, n in conn.execute(_COUNTER_SOURCE)}
+        mismatches = sorted(
+            (d, v, stored.get((d, v), 0), actual.get((d, v), 0))
+            for d, v in stored.keys() | actual.keys()
+            if stored.get((d, v), 0) != actual.get((d, v), 0)
+        )
+        if repair and mismatches:
+            conn.execute("DELETE FROM complaint_counts")
+            conn.execute(f"INSERT INTO complaint_counts (dimension, value, count) {_COUNTER_SOURCE}")
+    return mismatches
+
+# TRENDS
+TREND_BUCKETS = ("day", "week", "month")
+# Bucket label per day: the day itself, the Monday starting its week, the first of its month
+_TREND_BUCKET_SQL = {
+    "day": "day",
+    "week": "date(day, 'weekday 0', '-6 days')",
+    "month": "strftime('%Y-%m-01', day)",
+}
+# resolution_s: total seconds from submission to resolution of the complaints resolved in the bucket
+TrendPoint = namedtuple("TrendPoint", ["bucket", "category", "opened", "resolved", "resolution_s"])
+
+def get_complaint_trends(bucket="day", date_from=None, date_to=None, categories=None):
+    # Complaints opened and resolved per bucket ("day", "week" or "month") and category, read from
+    # complaint_trends (cost depends on the range, not on the table size). date_from/date_to: inclusive
+    # dates; categories: only these (None means all). Returns TrendPoints ordered by bucket and category;
+    # bucket labels are ISO dates (a week is labelled by its Monday, a month by its first day).
+    if bucket not in _TREND_BUCKET_SQL:
+        raise ValueError(f"unknown bucket {bucket!r}; expected one of {', '.join(TREND_BUCKETS)}")
+    where, params = ["day != ''"], []
+    if date_from:
+        where.append("day >= ?")
+        params.append(date_from.isoformat())
+    if date_to:
+        where.append("day <= ?")
+        params.append(date_to.isoformat())
+    if categories is not None:
+        categories = list(categories)
+        where.append(f"category IN ({','.join('?' * len(categories))})")
+        params.extend(c or "" for c in categories)
+    sql = f'''
+        SELECT {_TREND_BUCKET_SQL[bucket]} AS bucket, category, SUM(opened), SUM(resolved), SUM(resolution_s)
+        FROM complaint_trends WHERE {" AND ".join(where)}
+        GROUP BY bucket, category
+        HAVING SUM(opened) != 0 OR SUM(resolved) != 0
+        ORDER BY bucket, category
+    '''
+    with connection() as conn:
+        return [TrendPoint(b, c or None, o, r, s) for b, c, o, r, s in conn.execute(sql, params)]
+
+def check_complaint_trends(repair=False):
+    # Compare complaint_trends with aggregates computed from complaints, like check_dashboard_counters.
+    # Returns the mismatches as (day, category, stored, actual) with (opened, resolved, resolution_s) tuples.
+    with transaction() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        zero = (0, 0, 0)
+        stored = {(d, c): tuple(v) for d, c, *v in conn.execute(
+            "SELECT day, category, opened, resolved, resolution_s FROM complaint_trends")}
+        actual = {(d, c): tuple(v) for d, c, *v in conn.execute(_TREND_SOURCE)}
+        mismatches = sorted(
+            (d, c, stored.get((d, c), zero), actual.get((d, c), zero))
+            for d, c in stored.keys() | actual.keys()
+            if stored.get((d, c), zero) != actual.get((d, c), zero)
+        )
+        if repair and mismatches:
+            conn.execute("DELETE FROM complaint_trends")
+            conn.execute(f"INSERT INTO complaint_trends (day, category, opened, resolved, resolution_s) {_TREND_SOURCE}")
+    return mismatches
+
+# FULL-TEXT SEARCH
+# Search results carry the complaint columns plus the BM25 rank (lower is better) and a snippet.
+SEARCH_COLUMNS = COMPLAINT_COLUMNS + ("rank", "snippet")
+SearchResult = namedtuple("SearchResult", SEARCH_COLUMNS)
+# A query matching at most SEARCH_RANK_LIMIT rows has every match ranked; a more common one only its
+# newest SEARCH_RANK_LIMIT matches (then filtered), so its cost stays bounded at any table size.
+SEARCH_RANK_LIMIT = 5000
+# Dropped from queries (unless nothing else is left): they match almost every row and only slow ranking down.
+_SEARCH_STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have i in is it its my of on or our so that the their "
+    "there this to was we were with".split()
+)
+
+def _fts_query(text):
+    # Turn free text into an FTS5 query: every word must match (quoted, so no query syntax errors).
+    words = re.findall(r"\w+", (text or "").lower())
+    kept = [w for w in words if w not in _SEARCH_STOPWORDS] or words
+    return " ".join(f'"{w}"' for w in dict.fromkeys(kept))
+
+def _search_bound(conn, match):
+    # Lowest rowid ranked for the FTS query: 0 (all of them) unless it matches more than SEARCH_RANK_LIMIT
+    # rows, then the rowid after its (SEARCH_RANK_LIMIT + 1)-th newest match. Walking rowids ranks nothing.
+    row = conn.execute(
+        "SELECT rowid FROM complaints_fts WHERE complaints_fts MATCH ? ORDER BY rowid DESC LIMIT 1 OFFSET ?",
+        (match, SEARCH_RANK_LIMIT),
+    ).fetchone()
+    return row[0] + 1 if row else 0
+
+def search_is_capped(query):
+    # Whether search_complaints(query) ranks only the newest SEARCH_RANK_LIMIT matches.
+    match = _fts_query(query)
+    if not match:
+        return False
+    with connection() as conn:
+        return _search_bound(conn, match) > 0
+
+def search_complaints(query, filters=None, limit=DEFAULT_PAGE_SIZE, cursor=None, highlight=("[", "]")):
+    # Full-text search over descriptions, best BM25 match first (see SEARCH_RANK_LIMIT).
+    # filters: optional dict with category, status, date_from, date_to (as for get_complaints_filtered).
+    # Returns (rows, next_cursor) like get_complaints_page; rows follow SEARCH_COLUMNS and the snippet
+    # marks matched words with the highlight pair.
+    match = _fts_query(query)
+    if not match:
+        return [], None
+    where, params = _filter_clauses(**(filters or {}))
+
+    with connection() as conn:
+        # The cursor keeps the first page's bound, so later pages rank the same candidates
+        bound = cursor[2] if cursor is not None else _search_bound(conn, match)
+
+        # The candidate matches passing the filters (joined before ranking; bm25 is evaluated for those only) ...
+        ranked = "SELECT f.rowid AS id, bm25(complaints_fts) AS rank FROM complaints_fts f"
+        if where:
+            ranked += " JOIN complaints c ON c.id = f.rowid"
+        ranked += " WHERE " + " AND ".join(["complaints_fts MATCH ?", "f.rowid >= ?", *where])
+        # ... best first, after the cursor; the sort keeps only the best limit + 1 rows in memory
+        page = f"SELECT id, rank FROM ({ranked})"
+        page_params = [match, bound, *params]
+        if cursor is not None:
+            page += " WHERE (rank, id) > (?, ?)"
+            page_params += [cursor[0], cursor[1]]
+        page += " ORDER BY rank, id LIMIT ?"
+        columns = ", ".join(f"c.{column}" for column in COMPLAINT_COLUMNS)
+        sql = f"SELECT {columns}, p.rank FROM ({page}) p JOIN complaints c ON c.id = p.id ORDER BY p.rank, p.id"
+
+        rows = conn.execute(sql, [*page_params, limit + 1]).fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = (rows[-1][-1], rows[-1][0], bound)
+
+        # Snippets only for the rows on this page
+        snippets = {}
+        if rows:
+            placeholders = ",".join("?" * len(rows))
+            snippets = dict(conn.execute(
+                "SELECT rowid, snippet(complaints_fts, 0, ?, ?, '…', 16) FROM complaints_fts "
+                f"WHERE complaints_fts MATCH ? AND rowid IN ({placeholders})",
+                [highlight[0], highlight[1], match, *(r[0] for r in rows)],
+            ).fetchall())
+    return [SearchResult(*r, snippets.get(r[0], r[_DESCRIPTION_IDX])) for r in rows], next_cursor
+
+# EXPORT
+def iter_complaint_chunks(columns=None, filters=None, since_seq=0, chunk_size=5000):
+    # Stream complaints in chunks of at most chunk_size rows, in change order (change_seq), so memory
+    # stays bounded. columns: subset of COMPLAINT_COLUMNS (default all); filters as for
+    # get_complaints_filtered; since_seq: only rows changed after this change_seq.
+    # Yields (rows, last_change_seq) per chunk.
+    columns = list(columns or COMPLAINT_COLUMNS)
+    unknown = set(columns) - set(COMPLAINT_COLUMNS)
+    if unknown:
+        raise ValueError(f"unknown columns: {', '.join(sorted(unknown))}")
+    where, params = _filter_clauses(**(filters or {}))
+    sql = f"SELECT {', '.join(columns)}, change_seq FROM complaints WHERE " + " AND ".join(["change_seq > ?", *where])
+    sql += " ORDER BY change_seq LIMIT ?"
+    last_seq = since_seq or 0
+    while True:
+        with connection() as conn:
+            rows = conn.execute(sql, [last_seq, *params, chunk_size]).fetchall()
+        if not rows:
+            return
+        last_seq = rows[-1][-1]
+        yield [r[:-1] for r in rows], last_seq
+        if len(rows) < chunk_size:
+            return
+
+def get_export_watermark(name):
+    # (change_seq, exported_at) recorded by the last export under this name, or (0, None).
+    with connection() as conn:
+        row = conn.execute("SELECT change_seq, exported_at FROM export_watermarks WHERE name=?", (name,)).fetchone()
+    return tuple(row) if row else (0, None)
+
+def set_export_watermark(name, change_seq):
+    # Remember that everything up to change_seq has been exported under this name.
+    with transaction() as conn:
+        conn.execute('''
+            INSERT INTO export_watermarks (name, change_seq, exported_at) VALUES (?, ?, strftime('%s', 'now'))
+            ON CONFLICT(name) DO UPDATE SET change_seq = excluded.change_seq, exported_at = excluded.exported_at
+        ''', (name, change_seq))
+
+# NLP ENRICHMENT
+def parse_keywords(value):
+    # Decode the stored keywords column into a list.
+    return json.loads(value) if value else []
+
+def backfill_enrichment(batch_size=500, max_rows=None, progress=None):
+    # Enrich complaints that have no (or outdated) stored NLP results, oldest first.
+    # Each batch is committed separately, so an interrupted run resumes where it stopped.
+    # progress(done, remaining) is called after every batch. Returns the number of rows enriched.
+    done = 0
+    while max_rows is None or done < max_rows:
+        limit = batch_size if max_rows is None else min(batch_size, max_rows - done)
+        with connection() as conn:
+            pending = conn.execute(
+                "SELECT id, description FROM complaints WHERE nlp_version IS NULL OR nlp_version < ? "
+                "ORDER BY id LIMIT ?", (nlp_utils.NLP_VERSION, limit),
+            ).fetchall()
+        if not pending:
+            break
+        values = _enrichment_values([description for _, description in pending])
+        updates = [(*v, cid) for v, (cid, _) in zip(values, pending)]
+        with transaction() as conn:
+            conn.executemany(
+                "UPDATE complaints SET sentiment=?, priority=?, keywords=?, suggested_category=?, nlp_version=? "
+                "WHERE id=?", updates,
+            )
+        done += len(pending)
+        if progress:
+            progress(done, count_unenriched())
+    return done
+
+def enrich_complaints_by_id(ids):
+    # Store the enrichment of these complaints where it is missing or outdated (already enriched
+    # rows are skipped, so a retried job does no extra work). Returns the number of rows enriched.
+    ids, pending = list(ids), []
+    with connection() as conn:
+        for i in range(0, len(ids), _ID_CHUNK):
+            chunk = ids[i:i + _ID_CHUNK]
+            pending += conn.execute(
+                f"SELECT id, description FROM complaints WHERE id IN ({','.join('?' * len(chunk))}) "
+                "AND (nlp_version IS NULL OR nlp_version < ?)", (*chunk, nlp_utils.NLP_VERSION),
+            ).fetchall()
+    if not pending:
+        return 0
+    values = _enrichment_values([description for _, description in pending])
+    with transaction() as conn:
+        conn.executemany(
+            "UPDATE complaints SET sentiment=?, priority=?, keywords=?, suggested_category=?, nlp_version=? "
+            "WHERE id=?", [(*v, cid) for v, (cid, _) in zip(values, pending)],
+        )
+    return len(pending)
+
+def count_unenriched():
+    # Number of complaints still waiting for (re-)enrichment.
+    with connection() as conn:
+        return conn.execute(
+            "SELECT COUNT(*) FROM complaints WHERE nlp_version IS NULL OR nlp_version < ?", (nlp_utils.NLP_VERSION,)
+        ).fetchone()[0]
+
+def ensure_enriched(rows):
+    # Compute and store enrichment for any of these rows that have none (e.g. the description
+    # changed since it was enriched). Returns the rows with the enrichment columns filled in.
+    missing = [r for r in rows if r[_SENTIMENT_IDX] is None]
+    if not missing:
+        return rows
+    values = _enrichment_values([r[_DESCRIPTION_IDX] for r in missing])
+    fresh = {r[0]: v for r, v in zip(missing, values)}
+    with transaction() as conn:
+        conn.executemany(
+            "UPDATE complaints SET sentiment=?, priority=?, keywords=?, suggested_category=?, nlp_version=? "
+            "WHERE id=?", [(*values, cid) for cid, values in fresh.items()],
+        )
+    end = _SENTIMENT_IDX + len(ENRICHMENT_COLUMNS)
+    return [
+        r[:_SENTIMENT_IDX] + fresh[r[0]][:len(ENRICHMENT_COLUMNS)] + r[end:] if r[0] in fresh else r
+        for r in rows
+    ]
+
+# CATEGORY MODEL
+def get_training_examples(resolved_only=False):
+    # (description, category) pairs for training the category classifier.
+    sql = "SELECT description, category FROM complaints WHERE category IS NOT NULL AND description IS NOT NULL"
+    if resolved_only:
+        sql += " AND status='Resolved'"
+    with connection() as conn:
+        return conn.execute(sql + " ORDER BY id").fetchall()
+
+def refresh_suggested_categories(batch_size=500, progress=None):
+    # Recompute the stored suggested_category of every complaint (e.g. after training a new model).
+    # progress(done) is called after every committed batch. Returns the number of rows updated.
+    done, last_id = 0, 0
+    while True:
+        with connection() as conn:
+            batch = conn.execute(
+                "SELECT id, description FROM complaints WHERE id > ? ORDER BY id LIMIT ?", (last_id, batch_size)
+            ).fetchall()
+        if not batch:
+            break
+        suggested = nlp_utils.suggest_categories([description for _, description in batch])
+        with transaction() as conn:
+            conn.executemany(
+                "UPDATE complaints SET suggested_category=? WHERE id=?",
+                [(category, cid) for category, (cid, _) in zip(suggested, batch)],
+            )
+        done += len(batch)
+        last_id = batch[-1][0]
+        if progress:
+            progress(done)
+    return done
+
+_ID_CHUNK = 500  # ids per IN (...) list, well under SQLite's parameter limit
+
+# Newly resolved complaints are queued as a LEARN_CATEGORIES_JOB and fed to the category model by
+# backend.worker, in batches: updating the model file takes tens of milliseconds and must not run
+# in every status change, nor in several processes at once.
+LEARN_CATEGORIES_JOB = "learn_categories"
+
+def learn_from_resolved(ids):
+    # Feed resolved complaints to the category model (a no-op until one has been trained).
+    # Returns the number of examples learned.
+    ids, examples = list(ids), []
+    with connection() as conn:
+        for i in range(0, len(ids), _ID_CHUNK):
+            chunk = ids[i:i + _ID_CHUNK]
+            examples += conn.execute(
+                f"SELECT description, category FROM complaints WHERE id IN ({','.join('?' * len(chunk))}) "
+                "AND category IS NOT NULL AND description IS NOT NULL", chunk,
+            ).fetchall()
+    if examples and nlp_utils.learn_categories(*zip(*examples)):
+        return len(examples)
+    return 0
+
+# ATTACHMENTS
+# Metadata only; the files themselves are handled by backend.attachments.
+ATTACHMENT_COLUMNS = ("id", "sha256", "size", "content_type", "original_name", "created_ts")
+Attachment = namedtuple("Attachment", ATTACHMENT_COLUMNS)
+
+def add_attachment(sha256, size, content_type, original_name):
+    # Record one upload of already stored content; returns its attachment id.
+    with transaction() as conn:
+        return conn.execute(
+            "INSERT INTO attachments (sha256, size, content_type, original_name, created_ts) "
+            "VALUES (?, ?, ?, ?, CAST(strftime('%s', 'now') AS INTEGER))",
+            (sha256, size, content_type, original_name),
+        ).lastrowid
+
+def get_attachments(ids):
+    # {attachment id: Attachment} for the given ids (None and unknown ids are skipped).
+    ids = list({i for i in ids if i is not None})
+    found = {}
+    with connection() as conn:
+        for i in range(0, len(ids), _ID_CHUNK):
+            chunk = ids[i:i + _ID_CHUNK]
+            for row in conn.execute(
+                f"SELECT {', '.join(ATTACHMENT_COLUMNS)} FROM attachments WHERE id IN ({','.join('?' * len(chunk))})",
+                chunk,
+            ):
+                found[row[0]] = Attachment._make(row)
+    return found
 
 # UPDATE COMPLAINT
+def apply_complaint_changes(statuses=None, assignments=None):
+    # Apply many status changes ({id: new_status}) and assignments ({id: staff}) in one transaction,
+    # one executemany per kind. Returns (status_changes, assignments) actually applied; setting a
+    # value a complaint already has does not count (and does not touch the row).
+    statuses, assignments = dict(statuses or {}), dict(assignments or {})
+    newly_resolved = []
+    with transaction() as conn:
+        conn.execute("BEGIN IMMEDIATE")  # the Resolved check below and the update see the same rows
+        resolving = [cid for cid, status in statuses.items() if status == "Resolved"]
+        for i in range(0, len(resolving), _ID_CHUNK):
+            chunk = resolving[i:i + _ID_CHUNK]
+            newly_resolved += [r[0] for r in conn.execute(
+                f"SELECT id FROM complaints WHERE id IN ({','.join('?' * len(chunk))}) AND status IS NOT 'Resolved'",
+                chunk,
+            )]
+        status_changes = conn.executemany(
+            "UPDATE complaints SET status=? WHERE id=? AND status IS NOT ?",
+            [(status, cid, status) for cid, status in statuses.items()],
+        ).rowcount if statuses else 0
+        assigned = conn.executemany(
+            "UPDATE complaints SET assigned_to=? WHERE id=? AND assigned_to IS NOT ?",
+            [(staff, cid, staff) for cid, staff in assignments.items()],
+        ).rowcount if assignments else 0
+        # Nothing to learn into until a model has been trained
+        if newly_resolved and os.path.exists(nlp_utils.CATEGORY_MODEL_PATH):
+            _enqueue(conn, LEARN_CATEGORIES_JOB, {"ids": newly_resolved})
+    return status_changes, assigned
+
+def update_complaint_statuses(changes):
+    # Set the status of many complaints ({id: new_status}) in one transaction; returns how many changed.
+    return apply_complaint_changes(statuses=changes)[0]
+
+def assign_complaints(assignments):
+    # Assign many complaints ({id: staff}) in one transaction; returns how many changed.
+    return apply_complaint_changes(assignments=assignments)[1]
+
 def update_complaint_status(cid, new_status):
-    # Update status of a complaint by ID.
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("UPDATE complaints SET status=? WHERE id=?", (new_status, cid))
-    conn.commit()
-    conn.close()
+    # Update status of a complaint by ID; returns 1 if it changed, else 0.
+    return update_complaint_statuses({cid: new_status})
 
 def assign_complaint(cid, staff_name):
-    # Assign complaint to staff/department.
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("UPDATE complaints SET assigned_to=? WHERE id=?", (staff_name, cid))
-    conn.commit()
-    conn.close()
+    # Assign complaint to staff/department; returns 1 if it changed, else 0.
+    return assign_complaints({cid: staff_name})
 
 def delete_complaint(cid):
     # Delete complaint by ID.
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("DELETE FROM complaints WHERE id=?", (cid,))
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute("DELETE FROM complaints WHERE id=?", (cid,))
+
+# NEAR DUPLICATES
+# Complaints about the same incident (300 reports of one Wi-Fi outage) are grouped into clusters as
+# they arrive. A new complaint's MinHash signature (backend/near_duplicates.py) is looked up in the
+# LSH buckets of open complaints from the last DUPLICATE_WINDOW_DAYS. Candidates whose estimated
+# similarity reaches the threshold put it in their cluster, and a complaint matching several clusters
+# merges them. A cluster's id is its oldest complaint's id. Each lookup reads at most
+# DUPLICATE_MAX_CANDIDATES entries per band, so its cost does not grow with the complaint history.
+DUPLICATE_WINDOW_DAYS = 14
+DUPLICATE_MAX_CANDIDATES = 200
+OPEN_STATUSES = ("Pending", "In Progress")
+DuplicateCluster = namedtuple(
+    "DuplicateCluster", ["cluster_id", "open_count", "first_ts", "last_ts", "first_id", "category", "description"]
+)
+
+def _near_duplicate_signature(description):
+    # MinHash signature of a description, or None (the complaint is then indexed by index_near_duplicates()).
+    try:
+        from backend import near_duplicates
+        return near_duplicates.signatures([description])[0]
+    except Exception:
+        return None
+
+def _near_duplicate_matches(conn, cid, created_ts, signature):
+    # (complaint id, cluster id) of the open complaints in the window similar enough to this signature.
+    from backend import near_duplicates
+    since = created_ts - DUPLICATE_WINDOW_DAYS * 86400
+    candidates = set()
+    for band, key in enumerate(near_duplicates.band_keys(signature[None])[0].tolist()):
+        candidates.update(r[0] for r in conn.execute(
+            "SELECT complaint_id FROM lsh_buckets WHERE band=? AND bucket=? AND created_ts >= ? "
+            "ORDER BY created_ts DESC LIMIT ?", (band, key, since, DUPLICATE_MAX_CANDIDATES),
+        ))
+    candidates.discard(cid)
+    candidates, rows = list(candidates), []
+    for i in range(0, len(candidates), _ID_CHUNK):
+        chunk = candidates[i:i + _ID_CHUNK]
+        rows += conn.execute(f'''
+            SELECT n.complaint_id, n.cluster_id, n.signature FROM near_duplicates AS n
+            JOIN complaints AS c ON c.id = n.complaint_id
+            WHERE n.complaint_id IN ({','.join('?' * len(chunk))}) AND n.signature IS NOT NULL
+              AND c.status IN ({','.join('?' * len(OPEN_STATUSES))})
+        ''', (*chunk, *OPEN_STATUSES)).fetchall()
+    if not rows:
+        return []
+    similar = near_duplicates.similarity(signature, near_duplicates.from_blobs([r[2] for r in rows]))
+    return [(r[0], r[1]) for r, s in zip(rows, similar) if s >= near_duplicates.SIMILARITY_THRESHOLD]
+
+def _index_near_duplicate(conn, cid, created_ts, signature):
+    # Add a complaint to the index inside the caller's transaction; returns its cluster id.
+    from backend import near_duplicates
+    clusters = {cluster for _, cluster in _near_duplicate_matches(conn, cid, created_ts, signature)}
+    cluster_id = min(clusters | {cid})
+    merged = list(clusters - {cluster_id})
+    if merged:
+        conn.execute(
+            f"UPDATE near_duplicates SET cluster_id=? WHERE cluster_id IN ({','.join('?' * len(merged))})",
+            (cluster_id, *merged),
+        )
+    conn.execute(
+        "INSERT OR REPLACE INTO near_duplicates (complaint_id, cluster_id, created_ts, signature) VALUES (?, ?, ?, ?)",
+        (cid, cluster_id, created_ts, near_duplicates.to_blob(signature)),
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO lsh_buckets (band, bucket, created_ts, complaint_id) VALUES (?, ?, ?, ?)",
+        [(band, key, created_ts, cid)
+         for band, key in enumerate(near_duplicates.band_keys(signature[None])[0].tolist())],
+    )
+    return cluster_id
+
+def index_near_duplicates(days=DUPLICATE_WINDOW_DAYS, batch_size=500, progress=None):
+    # Index the complaints of the last `days` days that are not indexed yet (bulk imports, or
+    # submissions whose signature failed), oldest first, one transaction per batch.
+    # progress(done) is called after every batch. Returns the number of complaints indexed.
+    from backend import near_duplicates
+    done, cursor = 0, (int(time.time()) - days * 86400, 0)
+    while True:
+        with connection() as conn:
+            batch = conn.execute('''
+                SELECT id, created_ts, description FROM complaints AS c
+                WHERE (created_ts, id) > (?, ?)
+                  AND NOT EXISTS (SELECT 1 FROM near_duplicates AS n WHERE n.complaint_id = c.id)
+                ORDER BY created_ts, id LIMIT ?
+            ''', (*cursor, batch_size)).fetchall()
+        if not batch:
+            break
+        sigs = near_duplicates.signatures([description for _, _, description in batch])
+        with transaction() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for (cid, created_ts, _), signature in zip(batch, sigs):
+                _index_near_duplicate(conn, cid, created_ts, signature)
+        done += len(batch)
+        cursor = batch[-1][1], batch[-1][0]
+        if progress:
+            progress(done)
+    return done
+
+def prune_near_duplicate_index(days=DUPLICATE_WINDOW_DAYS):
+    # Drop the bucket rows and signatures of complaints too old to match (their clusters are kept).
+    since = int(time.time()) - days * 86400
+    with transaction() as conn:
+        conn.execute("DELETE FROM lsh_buckets WHERE created_ts < ?", (since,))
+        conn.execute("UPDATE near_duplicates SET signature=NULL WHERE signature IS NOT NULL AND created_ts < ?", (since,))
+
+def get_duplicate_clusters(min_open=2, limit=50):
+    # Clusters with at least min_open open complaints, largest first, with their oldest open complaint's
+    # category and description.
+    placeholders = ",".join("?" * len(OPEN_STATUSES))
+    with connection() as conn:
+        clusters = conn.execute(f'''
+            SELECT n.cluster_id, COUNT(*), MIN(c.created_ts), MAX(c.created_ts), MIN(c.id)
+            FROM complaints AS c JOIN near_duplicates AS n ON n.complaint_id = c.id
+            WHERE c.status IN ({placeholders})
+            GROUP BY n.cluster_id HAVING COUNT(*) >= ?
+            ORDER BY COUNT(*) DESC, MAX(c.created_ts) DESC LIMIT ?
+        ''', (*OPEN_STATUSES, min_open, limit)).fetchall()
+        first_ids = [row[4] for row in clusters]
+        firsts = {r[0]: r[1:] for r in conn.execute(
+            f"SELECT id, category, description FROM complaints WHERE id IN ({','.join('?' * len(first_ids))})",
+            first_ids,
+        )}
+    return [DuplicateCluster(*row, *firsts.get(row[4], (None, None))) for row in clusters]
+
+def get_cluster_complaints(cluster_id, open_only=True):
+    # The complaints of a cluster (only the open ones by default), oldest first.
+    sql = f"{_SELECT_COMPLAINTS} WHERE id IN (SELECT complaint_id FROM near_duplicates WHERE cluster_id=?)"
+    params = [cluster_id]
+    if open_only:
+        sql += f" AND status IN ({','.join('?' * len(OPEN_STATUSES))})"
+        params += OPEN_STATUSES
+    with connection() as conn:
+        return conn.execute(sql + " ORDER BY created_ts, id", params).fetchall()
+
+def apply_cluster_changes(cluster_id, status=None, staff=None):
+    # Set the status and/or assignee of every open complaint of a cluster in one transaction.
+    # Returns (status_changes, assignments) like apply_complaint_changes.
+    ids = [row[0] for row in get_cluster_complaints(cluster_id)]
+    return apply_complaint_changes(
+        statuses=dict.fromkeys(ids, status) if status else None,
+        assignments=dict.fromkeys(ids, staff) if staff else None,
+    )
+
+# JOB QUEUE
+# Background jobs for backend/worker.py. A worker leases due jobs (state 'running', run_after moved to
+# the lease expiry) and completes or fails them. A job whose worker died is due again once its lease
+# expires. Failures are retried with exponential backoff; after max_attempts the job is dead-lettered
+# (state 'dead') until retry_dead_jobs(). Finished jobs are deleted by purge_finished_jobs().
+JOB_STATES = ("queued", "running", "done", "dead")
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_BASE_S = 10    # delay before the first retry, doubled for every further attempt
+JOB_RETRY_MAX_S = 3600
+Job = namedtuple("Job", ["id", "kind", "payload", "attempts", "max_attempts"])
+DEAD_JOB_COLUMNS = ("id", "kind", "payload", "attempts", "last_error", "created_ts", "finished_ts")
+
+def _enqueue(conn, kind, payload, delay_s=0, max_attempts=JOB_MAX_ATTEMPTS):
+    now = int(time.time())
+    return conn.execute(
+        "INSERT INTO jobs (kind, payload, max_attempts, run_after, created_ts) VALUES (?, ?, ?, ?, ?)",
+        (kind, json.dumps(payload), max_attempts, now + delay_s, now),
+    ).lastrowid
+
+def enqueue_job(kind, payload, delay_s=0, max_attempts=JOB_MAX_ATTEMPTS):
+    # Queue a job (payload: JSON-serialisable), due in delay_s seconds. Returns its id.
+    with transaction() as conn:
+        return _enqueue(conn, kind, payload, delay_s, max_attempts)
+
+def lease_jobs(owner, kinds=None, limit=1, lease_s=60):
+    # Lease up to `limit` due jobs (oldest first, optionally only these kinds) to `owner` for lease_s
+    # seconds, counting an attempt for each. Returns a list of Job.
+    now = int(time.time())
+    kind_clause, kind_params = "", []
+    if kinds:
+        kind_clause = f" AND kind IN ({','.join('?' * len(kinds))})"
+        kind_params = list(kinds)
+    with transaction() as conn:
+        conn.execute("BEGIN IMMEDIATE")  # concurrent workers never lease the same job
+        # An expired lease on the last attempt means the job keeps killing or hanging its worker
+        conn.execute(
+            "UPDATE jobs SET state='dead', lease_owner=NULL, finished_ts=?, last_error='lease expired' "
+            "WHERE state='running' AND run_after <= ? AND attempts >= max_attempts", (now, now),
+        )
+        rows = conn.execute(f'''
+            UPDATE jobs SET state='running', attempts=attempts + 1, lease_owner=?, run_after=?
+            WHERE id IN (
+                SELECT id FROM jobs WHERE state IN ('queued', 'running') AND run_after <= ?{kind_clause}
+                ORDER BY run_after, id LIMIT ?
+            )
+            RETURNING id, kind, payload, attempts, max_attempts
+        ''', (owner, now + lease_s, now, *kind_params, limit)).fetchall()
+    return sorted(Job(cid, kind, json.loads(payload), attempts, max_attempts)
+                  for cid, kind, payload, attempts, max_attempts in rows)
+
+def complete_jobs(ids, owner):
+    # Mark jobs leased by `owner` as done. Returns how many were (a job whose lease expired and was
+    # leased again by another worker is left to that worker).
+    now = int(time.time())
+    with transaction() as conn:
+        return conn.executemany(
+            "UPDATE jobs SET state='done', lease_owner=NULL, finished_ts=? WHERE id=? AND lease_owner=? "
+            "AND state='running'", [(now, job_id, owner) for job_id in ids],
+        ).rowcount
+
+def fail_job(job_id, owner, error, retry=True):
+    # Record a failed attempt of a job leased by `owner`: queued again after a backoff while attempts
+    # remain (and retry is true), otherwise dead. Returns the new state, or None if the lease was lost.
+    now = int(time.time())
+    with transaction() as conn:
+        row = conn.execute('''
+            UPDATE jobs SET
+                state = CASE WHEN ? AND attempts < max_attempts THEN 'queued' ELSE 'dead' END,
+                run_after = ? + MIN(? << (attempts - 1), ?),
+                finished_ts = CASE WHEN ? AND attempts < max_attempts THEN NULL ELSE ? END,
+                lease_owner = NULL, last_error = ?
+            WHERE id=? AND lease_owner=? AND state='running'
+            RETURNING state
+        ''', (int(retry), now, JOB_RETRY_BASE_S, JOB_RETRY_MAX_S, int(retry), now, str(error)[:2000],
+              job_id, owner)).fetchone()
+    return row[0] if row else None
+
+def retry_dead_jobs(ids=None):
+    # Put dead jobs (all of them, or these ids) back in the queue with fresh attempts. Returns how many.
+    now = int(time.time())
+    sql = "UPDATE jobs SET state='queued', attempts=0, run_after=?, finished_ts=NULL WHERE state='dead'"
+    with transaction() as conn:
+        if ids is None:
+            return conn.execute(sql, (now,)).rowcount
+        return conn.executemany(sql + " AND id=?", [(now, job_id) for job_id in ids]).rowcount
+
+def get_job_counts():
+    # {state: number of jobs} for every state in JOB_STATES.
+    with connection() as conn:
+        counts = dict(conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
+    return {state: counts.get(state, 0) for state in JOB_STATES}
+
+def get_dead_jobs(limit=100):
+    # The most recently dead-lettered jobs (rows in DEAD_JOB_COLUMNS order).
+    with connection() as conn:
+        return conn.execute(
+            f"SELECT {', '.join(DEAD_JOB_COLUMNS)} FROM jobs WHERE state='dead' ORDER BY finished_ts DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+
+def purge_finished_jobs(older_than_s=7 * 86400):
+    # Delete done jobs finished more than older_than_s seconds ago. Returns how many.
+    with transaction() as conn:
+        return conn.execute(
+            "DELETE FROM jobs WHERE state='done' AND finished_ts < ?", (int(time.time()) - older_than_s,)
+        ).rowcount
+
+# INSTRUMENTATION
+# Every public function above is timed (see backend/metrics.py); connection() and transaction()
+# return context managers, so timing the call itself would say nothing.
+metrics.instrument(globals(), "database", exclude=("connection", "transaction"))
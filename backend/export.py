@@ -0,0 +1,119 @@
+# backend/export.py
+# Streaming complaint export to CSV or Parquet: rows are read from SQLite in chunks and written out
+# as they arrive, so memory use depends on the chunk size, not on the table size.
+# Usage: python -m backend.export OUT [--format csv|parquet] [--columns id,status,...]
+#        [--category C] [--status S] [--from YYYY-MM-DD] [--to YYYY-MM-DD] [--since NAME]
+# --since NAME exports only complaints added or changed since the last export under that name; only an
+# unfiltered export moves that watermark forward (a filtered one leaves the other rows' changes unexported).
+
+import argparse
+import csv
+import io
+from datetime import date
+
+from backend.database import (
+    COMPLAINT_COLUMNS, init_db, iter_complaint_chunks, get_export_watermark, set_export_watermark,
+)
+
+FORMATS = ("csv", "parquet")
+DEFAULT_CHUNK_SIZE = 5000
+# Parquet column types; every other column is stored as a string
+_INTEGER_COLUMNS = {"id", "is_anonymous", "created_ts", "updated_ts", "attachment_id", "resolved_ts"}
+
+
+def _write_csv(out, columns, chunks):
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True)
+    try:
+        writer = csv.writer(text)
+        writer.writerow(columns)
+        for rows, _ in chunks:
+            writer.writerows(rows)
+            yield len(rows)
+    finally:
+        text.detach()  # leave `out` open for the caller
+
+
+def _write_parquet(out, columns, chunks):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(c, pa.int64() if c in _INTEGER_COLUMNS else pa.string()) for c in columns])
+    with pq.ParquetWriter(out, schema, compression="zstd") as writer:
+        for rows, _ in chunks:
+            # One row group per chunk
+            arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            yield len(rows)
+
+
+def is_filtered(filters):
+    # True if any filter is set; the last change_seq of a filtered export is not a watermark for all rows.
+    return any(value not in (None, "") for value in (filters or {}).values())
+
+
+def export_complaints(out, fmt="csv", columns=None, filters=None, since=None,
+                      chunk_size=DEFAULT_CHUNK_SIZE, update_watermark=True, progress=None):
+    # Write complaints to `out` (a path or a binary file object) in the given format.
+    # columns/filters: as for database.iter_complaint_chunks. since: watermark name; only rows
+    # changed after that export are written, and the watermark moves forward afterwards unless
+    # update_watermark is False or filters are set. progress(rows_written) is called after every chunk.
+    # Returns (rows_written, last_change_seq); pass last_change_seq to set_export_watermark to
+    # record a deferred watermark.
+    if fmt not in FORMATS:
+        raise ValueError(f"unsupported format {fmt!r}; expected one of {', '.join(FORMATS)}")
+    columns = list(columns or COMPLAINT_COLUMNS)
+    since_seq = get_export_watermark(since)[0] if since else 0
+    last_seq = since_seq
+
+    def chunks():
+        nonlocal last_seq
+        for rows, seq in iter_complaint_chunks(columns, filters, since_seq, chunk_size):
+            last_seq = seq
+            yield rows, seq
+
+    written = 0
+    target = open(out, "wb") if isinstance(out, str) else out
+    try:
+        writer = _write_csv if fmt == "csv" else _write_parquet
+        for n in writer(target, columns, chunks()):
+            written += n
+            if progress:
+                progress(written)
+    finally:
+        if target is not out:
+            target.close()
+    if since and update_watermark and not is_filtered(filters) and last_seq > since_seq:
+        set_export_watermark(since, last_seq)
+    return written, last_seq
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export complaints to CSV or Parquet.")
+    parser.add_argument("out", help="output file")
+    parser.add_argument("--format", choices=FORMATS, default=None, help="default: from the file extension")
+    parser.add_argument("--columns", help="comma-separated columns (default: all)")
+    parser.add_argument("--category")
+    parser.add_argument("--status")
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat, help="YYYY-MM-DD, inclusive")
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat, help="YYYY-MM-DD, inclusive")
+    parser.add_argument("--since", metavar="NAME", help="only changes since the last export with this name")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("parquet" if args.out.endswith((".parquet", ".pq")) else "csv")
+    columns = [c.strip() for c in args.columns.split(",")] if args.columns else None
+    filters = {"category": args.category, "status": args.status, "date_from": args.date_from, "date_to": args.date_to}
+
+    init_db()
+
+    def progress(done):
+        print(f"  exported {done} complaints", flush=True)
+
+    written, _ = export_complaints(args.out, fmt, columns, filters, args.since, args.chunk_size, progress=progress)
+    print(f"Done: {written} complaints written to {args.out}.")
+    if args.since and is_filtered(filters):
+        print(f"Filtered export: the '{args.since}' watermark was not moved.")
+
+
+if __name__ == "__main__":
+    main()
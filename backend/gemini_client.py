@@ -0,0 +1,189 @@
+# backend/gemini_client.py
+# Reusable Gemini client: one model object per process, per-request timeout, a concurrency
+# limit shared by every Streamlit session, retries with jittered backoff, and streaming.
+
+import asyncio
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+
+DEFAULT_MODEL = "gemini-2.5-flash"
+DEFAULT_TIMEOUT = 30.0        # seconds per request
+DEFAULT_MAX_CONCURRENCY = 8   # Gemini calls in flight across all sessions
+DEFAULT_QUEUE_TIMEOUT = 10.0  # seconds to wait for a free slot
+DEFAULT_MAX_RETRIES = 2
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+
+# Error class names (SDK or HTTP) worth retrying: rate limits, timeouts, transient server errors
+_RETRYABLE_ERRORS = {
+    "ResourceExhausted", "ServiceUnavailable", "DeadlineExceeded", "InternalServerError",
+    "TooManyRequests", "GatewayTimeout", "TimeoutError", "ConnectionError", "GeminiTimeout",
+}
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class GeminiError(Exception):
+    pass
+
+
+class GeminiTimeout(GeminiError):
+    pass
+
+
+class GeminiBusy(GeminiError):
+    # No concurrency slot became free within the queue timeout.
+    pass
+
+
+def _is_retryable(error):
+    if isinstance(error, urllib.error.HTTPError):
+        return error.code in _RETRYABLE_STATUS
+    if isinstance(error, (TimeoutError, ConnectionError, urllib.error.URLError)):
+        return True
+    return any(cls.__name__ in _RETRYABLE_ERRORS for cls in type(error).__mro__)
+
+
+# TRANSPORTS
+class SDKTransport:
+    # google-generativeai SDK; the GenerativeModel is created once and reused.
+
+    def __init__(self, model=DEFAULT_MODEL, api_key=None):
+        import google.generativeai as genai  # slow import, only paid when Gemini is first needed
+        if api_key:
+            genai.configure(api_key=api_key)
+        self._model = genai.GenerativeModel(model)
+
+    def generate(self, prompt, timeout):
+        response = self._model.generate_content(prompt, request_options={"timeout": timeout})
+        return getattr(response, "text", "") or ""
+
+    def stream(self, prompt, timeout):
+        for chunk in self._model.generate_content(prompt, stream=True, request_options={"timeout": timeout}):
+            text = getattr(chunk, "text", "")
+            if text:
+                yield text
+
+
+class RestTransport:
+    # Gemini REST API (generateContent / streamGenerateContent?alt=sse) over urllib.
+    # base_url can point at a local fake server for load and latency measurements.
+
+    def __init__(self, base_url="https://generativelanguage.googleapis.com", api_key="", model=DEFAULT_MODEL):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.model = model
+
+    def _request(self, method, prompt, timeout):
+        body = json.dumps({"contents": [{"role": "user", "parts": [{"text": prompt}]}]}).encode()
+        url = f"{self.base_url}/v1beta/models/{self.model}:{method}"
+        request = urllib.request.Request(url, data=body, method="POST", headers={
+            "Content-Type": "application/json", "x-goog-api-key": self.api_key,
+        })
+        return urllib.request.urlopen(request, timeout=timeout)
+
+    @staticmethod
+    def _text(payload):
+        parts = payload.get("candidates", [{}])[0].get("content", {}).get("parts", [])
+        return "".join(part.get("text", "") for part in parts)
+
+    def generate(self, prompt, timeout):
+        with self._request("generateContent", prompt, timeout) as response:
+            return self._text(json.load(response))
+
+    def stream(self, prompt, timeout):
+        with self._request("streamGenerateContent?alt=sse", prompt, timeout) as response:
+            for raw in response:
+                line = raw.decode("utf-8").strip()
+                if line.startswith("data:"):
+                    text = self._text(json.loads(line[5:]))
+                    if text:
+                        yield text
+
+
+# CLIENT
+class GeminiClient:
+    # Thread-safe. All clients created with the same `slots` semaphore share one concurrency limit.
+
+    def __init__(self, transport, timeout=DEFAULT_TIMEOUT, max_retries=DEFAULT_MAX_RETRIES,
+                 queue_timeout=DEFAULT_QUEUE_TIMEOUT, slots=None, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        self.transport = transport
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.queue_timeout = queue_timeout
+        self.slots = slots or threading.BoundedSemaphore(max_concurrency)
+
+    def _acquire(self):
+        if not self.slots.acquire(timeout=self.queue_timeout):
+            raise GeminiBusy("too many concurrent Gemini requests")
+
+    @staticmethod
+    def _backoff(attempt):
+        # Full jitter: uniform in [0, min(max, base * 2^attempt)]
+        time.sleep(random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)))
+
+    def generate(self, prompt):
+        # Full answer text. Raises GeminiError subclasses or the transport's error after retries.
+        for attempt in range(self.max_retries + 1):
+            self._acquire()
+            try:
+                return self.transport.generate(prompt, self.timeout)
+            except Exception as error:
+                if attempt == self.max_retries or not _is_retryable(error):
+                    raise
+            finally:
+                self.slots.release()
+            self._backoff(attempt)
+
+    def stream(self, prompt):
+        # Yield answer chunks as they arrive. Failures before the first chunk are retried;
+        # once text has been yielded, errors propagate to the caller.
+        deadline_error = GeminiTimeout(f"no complete answer within {self.timeout:.0f}s")
+        for attempt in range(self.max_retries + 1):
+            self._acquire()
+            started = False
+            try:
+                deadline = time.monotonic() + self.timeout
+                for chunk in self.transport.stream(prompt, self.timeout):
+                    started = True
+                    yield chunk
+                    if time.monotonic() > deadline:
+                        raise deadline_error
+                return
+            except Exception as error:
+                if started or attempt == self.max_retries or not _is_retryable(error):
+                    raise
+            finally:
+                self.slots.release()
+            self._backoff(attempt)
+
+    async def agenerate(self, prompt):
+        # generate() without blocking the event loop.
+        return await asyncio.to_thread(self.generate, prompt)
+
+    async def astream(self, prompt):
+        # stream() as an async generator (the blocking transport runs in a worker thread).
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        done = object()
+
+        def _pump():
+            try:
+                for chunk in self.stream(prompt):
+                    loop.call_soon_threadsafe(queue.put_nowait, chunk)
+            except Exception as error:
+                loop.call_soon_threadsafe(queue.put_nowait, error)
+            loop.call_soon_threadsafe(queue.put_nowait, done)
+
+        worker = loop.run_in_executor(None, _pump)
+        while True:
+            item = await queue.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+        await worker
@@ -0,0 +1,123 @@
+# backend/import_complaints.py
+# Bulk import of complaints from a legacy archive: CSV (with a header row) or JSON Lines, read as a
+# stream and inserted in large batches, or a JSON array of objects (read into memory first).
+# Fields are complaint column names; only description is required (type, category, subcategory,
+# is_anonymous, file_path, email, status, assigned_to, created_at or created_ts are optional).
+# Usage: python -m backend.import_complaints ARCHIVE [--format csv|jsonl|json] [--batch-size 5000]
+#        [--no-enrich] [--workers N] [--no-defer] [--errors FILE]
+# Run it while the portals are idle: by default index and search upkeep is deferred to the end
+# of the import. If an import is interrupted, the next one (or --finish) completes that upkeep; if the
+# importer was killed, a portal or the worker does once it has been idle for BULK_INGEST_STALE_S.
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+from backend.database import BULK_BATCH_SIZE, init_db, add_complaints_bulk, finish_bulk_ingest, count_unenriched
+
+MAX_ERRORS_SHOWN = 10
+FORMATS = ("csv", "jsonl", "json")
+# File extension -> format; anything else is read as CSV
+_EXTENSIONS = {".jsonl": "jsonl", ".ndjson": "jsonl", ".json": "json"}
+
+
+def read_records(path, fmt, on_error):
+    # Yield one dict per record; unreadable JSON lines (or array items) go to on_error(where, text, exc),
+    # where is e.g. "line 12". A JSON file that is not an array of objects is rejected whole.
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+            return
+        if fmt == "json":
+            yield from _read_json_array(f, on_error)
+            return
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                on_error(f"line {line_number}", line.strip(), exc)
+                continue
+            if isinstance(record, dict):
+                yield record
+            else:
+                on_error(f"line {line_number}", line.strip(), TypeError("not a JSON object"))
+
+
+def _read_json_array(f, on_error):
+    try:
+        records = json.load(f)
+    except ValueError as exc:
+        on_error(f"line {getattr(exc, 'lineno', 1)}", "",
+                 ValueError(f"not valid JSON ({exc}); use --format jsonl for JSON Lines"))
+        return
+    if not isinstance(records, list):
+        on_error("line 1", "", TypeError("not a JSON array of complaint objects"))
+        return
+    for i, record in enumerate(records):
+        if isinstance(record, dict):
+            yield record
+        else:
+            on_error(f"item {i + 1}", json.dumps(record), TypeError("not a JSON object"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import complaints from a CSV, JSON Lines or JSON archive.")
+    parser.add_argument("archive", nargs="?", help="CSV, JSONL or JSON (array of objects) file")
+    parser.add_argument("--format", choices=FORMATS, default=None, help="default: from the file extension")
+    parser.add_argument("--batch-size", type=int, default=BULK_BATCH_SIZE, help="rows per transaction")
+    parser.add_argument("--no-enrich", action="store_true", help="skip NLP enrichment (run backend.backfill later)")
+    parser.add_argument("--workers", type=int, default=1, help="processes for NLP enrichment")
+    parser.add_argument("--no-defer", action="store_true", help="keep indexes and search up to date during the import")
+    parser.add_argument("--errors", metavar="FILE", help="write rejected records to this JSONL file")
+    parser.add_argument("--finish", action="store_true", help="only complete an interrupted import")
+    args = parser.parse_args(argv)
+    if not args.archive and not args.finish:
+        parser.error("an archive is required (or --finish)")
+
+    init_db()
+    if args.finish:
+        print("Interrupted import completed." if finish_bulk_ingest() else "Nothing to finish.")
+        return
+
+    fmt = args.format or _EXTENSIONS.get(os.path.splitext(args.archive)[1].lower(), "csv")
+    errors_file = open(args.errors, "w", encoding="utf-8") if args.errors else None
+    rejected = 0  # unreadable lines and records add_complaints_bulk refused
+
+    def report_error(where, record, exc):
+        nonlocal rejected
+        if rejected < MAX_ERRORS_SHOWN:
+            print(f"  rejected {where}: {exc}", file=sys.stderr)
+        rejected += 1
+        if errors_file:
+            errors_file.write(json.dumps({"at": where, "error": str(exc), "record": record}, default=str) + "\n")
+
+    start = time.perf_counter()
+
+    def progress(inserted, _):
+        rate = inserted / (time.perf_counter() - start)
+        print(f"  imported {inserted} (rejected {rejected}), {rate:,.0f} rows/s", flush=True)
+
+    records = read_records(args.archive, fmt, report_error)
+    try:
+        inserted, _ = add_complaints_bulk(
+            records, args.batch_size, enrich=not args.no_enrich, workers=args.workers,
+            defer_maintenance=not args.no_defer, progress=progress,
+            on_error=lambda position, record, exc: report_error(f"record {position + 1}", record, exc),
+        )
+    finally:
+        if errors_file:
+            errors_file.close()
+    elapsed = time.perf_counter() - start
+    print(f"Done: {inserted} complaints imported in {elapsed:.1f}s ({inserted / max(elapsed, 1e-9):,.0f} rows/s), "
+          f"{rejected} rejected.")
+    if args.no_enrich:
+        print(f"{count_unenriched()} complaints need enrichment: python -m backend.backfill")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# backend/keyword_matcher.py
+# Multi-keyword matcher: a keyword list is compiled once into a trie, and one scan over the text
+# reports every keyword occurrence (overlapping, with positions), however many keywords there are.
+
+import re
+from collections import Counter, namedtuple
+
+KeywordHit = namedtuple("KeywordHit", ["start", "end", "keyword"])
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordMatcher:
+    # Keywords and text are compared lower-cased; hit positions refer to text.lower().
+    #
+    # The trie is emitted as a single regular expression inside a lookahead, so the scan runs in the
+    # regex engine (C) and tries every start position once, walking the trie as far as the text
+    # allows. That yields the longest keyword starting at each position; shorter keywords that are
+    # prefixes of it are added from a table built with the trie.
+
+    def __init__(self, keywords):
+        self.keywords = tuple(dict.fromkeys(k.strip().lower() for k in keywords if k and k.strip()))
+        trie = {}
+        for keyword in self.keywords:
+            node = trie
+            for ch in keyword:
+                node = node.setdefault(ch, {})
+            node[""] = keyword
+        self._prefixes = {keyword: self._shorter_keywords(trie, keyword) for keyword in self.keywords}
+        self._pattern = re.compile("(?=(" + self._emit(trie) + "))") if self.keywords else None
+
+    @staticmethod
+    def _shorter_keywords(trie, keyword):
+        # Keywords that are proper prefixes of `keyword`, shortest first.
+        found, node = [], trie
+        for ch in keyword[:-1]:
+            node = node[ch]
+            if "" in node:
+                found.append(node[""])
+        return found
+
+    @classmethod
+    def _emit(cls, node):
+        # Regex for a trie node; greedy, so the longest keyword along the path wins.
+        alternatives = [re.escape(ch) + cls._emit(child) for ch, child in node.items() if ch]
+        if not alternatives:
+            return ""
+        body = alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    def find_all(self, text: str, whole_words: bool = False) -> list:
+        # Every keyword occurrence as KeywordHit(start, end, keyword), ordered by position.
+        # whole_words=True keeps only hits not preceded or followed by a letter, digit or underscore.
+        if self._pattern is None or not text:
+            return []
+        text = text.lower()
+        hits = []
+        for match in self._pattern.finditer(text):
+            start, longest = match.start(), match.group(1)
+            for keyword in self._prefixes[longest]:
+                hits.append(KeywordHit(start, start + len(keyword), keyword))
+            hits.append(KeywordHit(start, start + len(longest), longest))
+        if whole_words:
+            n = len(text)
+            hits = [
+                hit for hit in hits
+                if (hit.start == 0 or not _is_word_char(text[hit.start - 1]))
+                and (hit.end == n or not _is_word_char(text[hit.end]))
+            ]
+        return hits
+
+    def matches(self, text: str, whole_words: bool = False) -> set:
+        # Distinct keywords present in the text.
+        return {hit.keyword for hit in self.find_all(text, whole_words)}
+
+    def counts(self, text: str, whole_words: bool = False) -> Counter:
+        # Occurrences per keyword, non-overlapping like str.count.
+        return count_hits(self.find_all(text, whole_words))
+
+
+def count_hits(hits) -> Counter:
+    # Non-overlapping occurrences per keyword from find_all() hits (same numbers as str.count).
+    counts, last_end = Counter(), {}
+    for hit in hits:
+        if hit.start >= last_end.get(hit.keyword, 0):
+            counts[hit.keyword] += 1
+            last_end[hit.keyword] = hit.end
+    return counts
@@ -0,0 +1,273 @@
+# backend/metrics.py
+# In-process timing instrumentation: call counts, error counts and latency histograms for the public
+# functions of the backend modules (see instrument()), and per-rerun traces of the Streamlit pages
+# (begin_trace/end_trace) that record every instrumented call made during the rerun as a span.
+# Metrics live in memory, per process; render_prometheus() returns them in the Prometheus text format.
+# CAMPUS_BUDDY_METRICS=0 turns everything off: functions are left unwrapped, so there is no overhead at all.
+# CAMPUS_BUDDY_METRICS_FILE=path also writes the Prometheus text to that file after page reruns (at most
+# every METRICS_FILE_INTERVAL seconds), for node_exporter's textfile collector.
+
+import bisect
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import deque, namedtuple
+from contextvars import ContextVar
+
+ENABLED = os.getenv("CAMPUS_BUDDY_METRICS", "1") != "0"
+METRICS_FILE = os.getenv("CAMPUS_BUDDY_METRICS_FILE") or None
+METRICS_FILE_INTERVAL = 15  # seconds
+
+# Histogram bucket upper bounds in seconds (the last bucket, +Inf, is implicit)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MAX_TRACES = 50   # most recent page reruns kept
+MAX_SPANS = 500   # spans kept per trace; the rest are only counted
+
+# start: seconds from the beginning of the trace; depth: 0 for calls made directly by the page
+Span = namedtuple("Span", ["name", "start", "duration", "depth", "error"])
+Stat = namedtuple("Stat", ["name", "calls", "errors", "total_s", "mean_ms", "p50_ms", "p95_ms", "max_ms"])
+
+
+class Histogram:
+    __slots__ = ("buckets", "count", "sum", "errors", "max")
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = self.errors = 0
+        self.sum = self.max = 0.0
+
+    def observe(self, seconds, error=False):
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.errors += error
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-quantile (the largest observation for the last bucket).
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for bound, n in zip(BUCKETS, self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class Trace:
+    # One page rerun. Only the thread running the page touches it until end_trace() publishes it.
+
+    def __init__(self, name):
+        self.name = name
+        self.started_at = time.time()
+        self.duration = None
+        self.spans = []
+        self.dropped = 0
+        self._start = time.perf_counter()
+        self._depth = 0
+
+    def _exit(self, name, start, elapsed, error):
+        self._depth -= 1
+        if len(self.spans) < MAX_SPANS:
+            self.spans.append(Span(name, start - self._start, elapsed, self._depth, error))
+        else:
+            self.dropped += 1
+
+
+_histograms = {}
+_traces = deque(maxlen=MAX_TRACES)
+_lock = threading.Lock()
+_current_trace = ContextVar("campus_buddy_trace", default=None)
+_file_written = 0.0
+
+
+def observe(name, seconds, error=False):
+    # Record one call of `name` that took `seconds`.
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.observe(seconds, error)
+
+
+def _call(name, fn, args, kwargs):
+    trace = _current_trace.get()
+    if trace is not None:
+        trace._depth += 1
+    error = True
+    start = time.perf_counter()
+    try:
+        result = fn(*args, **kwargs)
+        error = False
+        return result
+    finally:
+        elapsed = time.perf_counter() - start
+        observe(name, elapsed, error)
+        if trace is not None:
+            trace._exit(name, start, elapsed, error)
+
+
+def timed(name):
+    # Decorator recording the latency of every call under `name`; with metrics off it returns the
+    # function unchanged. Generator functions are timed from the first item to the last (including
+    # the time the caller spends between items).
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def generator_wrapper(*args, **kwargs):
+                with span(name):
+                    return (yield from fn(*args, **kwargs))
+            return generator_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return _call(name, fn, args, kwargs)
+        return wrapper
+    return decorate
+
+
+class span:
+    # Context manager timing a block under `name`, e.g. `with metrics.span("charts.render"): ...`.
+    __slots__ = ("name", "_trace", "_start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        if ENABLED:
+            self._trace = _current_trace.get()
+            if self._trace is not None:
+                self._trace._depth += 1
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if ENABLED:
+            elapsed = time.perf_counter() - self._start
+            # A generator closed before its end is not an error
+            error = exc_type is not None and not issubclass(exc_type, GeneratorExit)
+            observe(self.name, elapsed, error)
+            if self._trace is not None:
+                self._trace._exit(self.name, self._start, elapsed, error)
+        return False
+
+
+def instrument(namespace, prefix, exclude=()):
+    # Wrap every public function defined in a module with timed("<prefix>.<name>"), in place.
+    # Call it at the end of the module with globals(), so `from module import f` gets the wrapper.
+    if not ENABLED:
+        return
+    module = namespace["__name__"]
+    for name, value in list(namespace.items()):
+        if (name.startswith("_") or name in exclude or not inspect.isfunction(value)
+                or value.__module__ != module):
+            continue
+        namespace[name] = timed(f"{prefix}.{name}")(value)
+
+
+# PAGE TRACES
+def begin_trace(name):
+    # Start recording the spans of one page rerun (replacing any trace a previous rerun left open,
+    # e.g. after st.rerun()). Returns the trace for end_trace(), or None with metrics off.
+    if not ENABLED:
+        return None
+    trace = Trace(name)
+    _current_trace.set(trace)
+    return trace
+
+
+def end_trace(trace):
+    # Finish a trace from begin_trace(): its duration is recorded as "page.<name>" and it joins the
+    # recent traces.
+    if trace is None:
+        return
+    trace.duration = time.perf_counter() - trace._start
+    trace.spans.sort(key=lambda s: s.start)
+    _current_trace.set(None)
+    observe(f"page.{trace.name}", trace.duration)
+    with _lock:
+        _traces.append(trace)
+    if METRICS_FILE:
+        _write_metrics_file()
+
+
+def recent_traces():
+    # Finished page traces, newest first.
+    with _lock:
+        return list(reversed(_traces))
+
+
+# REPORTING
+def stats():
+    # One Stat per instrumented name (times in milliseconds except total_s), slowest in total first.
+    with _lock:
+        items = [(name, h, h.quantile(0.5), h.quantile(0.95)) for name, h in _histograms.items()]
+        result = [
+            Stat(name, h.count, h.errors, h.sum, h.sum / h.count * 1000 if h.count else 0.0,
+                 p50 * 1000, p95 * 1000, h.max * 1000)
+            for name, h, p50, p95 in items
+        ]
+    return sorted(result, key=lambda s: s.total_s, reverse=True)
+
+
+def reset():
+    # Forget all histograms and traces.
+    with _lock:
+        _histograms.clear()
+        _traces.clear()
+
+
+def _label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus():
+    # All histograms in the Prometheus text exposition format.
+    with _lock:
+        snapshot = [(name, list(h.buckets), h.count, h.sum, h.errors) for name, h in sorted(_histograms.items())]
+    lines = [
+        "# HELP campus_buddy_call_duration_seconds Latency of instrumented calls and page reruns.",
+        "# TYPE campus_buddy_call_duration_seconds histogram",
+    ]
+    for name, buckets, count, total, _ in snapshot:
+        label = _label(name)
+        cumulative = 0
+        for bound, n in zip(BUCKETS, buckets):
+            cumulative += n
+            lines.append(f'campus_buddy_call_duration_seconds_bucket{{name="{label}",le="{bound}"}} {cumulative}')
+        lines.append(f'campus_buddy_call_duration_seconds_bucket{{name="{label}",le="+Inf"}} {count}')
+        lines.append(f'campus_buddy_call_duration_seconds_sum{{name="{label}"}} {total:.6f}')
+        lines.append(f'campus_buddy_call_duration_seconds_count{{name="{label}"}} {count}')
+    lines += [
+        "# HELP campus_buddy_call_errors_total Instrumented calls that raised an exception.",
+        "# TYPE campus_buddy_call_errors_total counter",
+    ]
+    lines += [f'campus_buddy_call_errors_total{{name="{_label(name)}"}} {errors}' for name, *_, errors in snapshot]
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path):
+    # Write render_prometheus() to `path` atomically (readers never see a partial file).
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(render_prometheus())
+    os.replace(tmp, path)
+
+
+def _write_metrics_file():
+    global _file_written
+    now = time.monotonic()
+    with _lock:
+        if now - _file_written < METRICS_FILE_INTERVAL:
+            return
+        _file_written = now
+    try:
+        write_prometheus(METRICS_FILE)
+    except OSError:
+        pass  # metrics must never break a page
@@ -0,0 +1,92 @@
+# backend/near_duplicates.py
+# MinHash signatures and LSH band keys for near-duplicate complaint detection (the index and the
+# clusters live in backend/database.py, NEAR DUPLICATES).
+# A description is reduced to its set of character 4-grams (lower-cased, punctuation folded into
+# spaces); the share of equal MinHash values between two signatures estimates the Jaccard similarity
+# of those sets. Signatures are split into BANDS bands of ROWS values; two complaints become
+# candidates when any band is identical, with probability 1 - (1 - s**ROWS) ** BANDS for similarity s
+# (about 0.89 at the 0.6 threshold, 0.99 at 0.7), and only candidates are compared.
+# Changing NUM_PERM, BANDS, SEED or the shingling invalidates stored signatures.
+
+import re
+
+import numpy as np
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SEED = 20240601
+SIMILARITY_THRESHOLD = 0.6   # estimated Jaccard similarity for a near duplicate
+_CHUNK_WINDOWS = 2_000_000   # 4-grams hashed at a time (memory: 8 bytes each)
+
+_SEPARATORS = re.compile(r"[\W_]+")
+
+# Multiply-shift hashing of 32-bit codes: (a * x + b) mod 2**64, top 32 bits; a is odd.
+_rng = np.random.default_rng(SEED)
+_A = _rng.integers(1, 2 ** 63, NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_B = _rng.integers(0, 2 ** 63, NUM_PERM, dtype=np.uint64)
+# Odd multipliers combining the values of a band into one 64-bit bucket key
+_K = _rng.integers(1, 2 ** 63, NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+
+
+def normalize(text):
+    return " " + _SEPARATORS.sub(" ", (text or "").lower()).strip() + " "
+
+
+def shingle_codes(texts):
+    # Every 4-byte window of each normalised (UTF-8) text as a uint32 code, all texts concatenated,
+    # plus the offset of each text's first code. Texts shorter than 4 bytes are padded.
+    encoded = [normalize(t).encode("utf-8").ljust(4) for t in texts]
+    lengths = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded))
+    counts = lengths - 3
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1])) if len(encoded) else np.zeros(0, dtype=np.int64)
+    buf = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint32)
+    # Position of every window in buf: text start + index within the text
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1])) if len(encoded) else offsets
+    positions = np.arange(counts.sum()) + np.repeat(starts - offsets, counts)
+    codes = (buf[positions] << 24) | (buf[positions + 1] << 16) | (buf[positions + 2] << 8) | buf[positions + 3]
+    return codes, offsets
+
+
+def signatures(texts):
+    # MinHash signatures, shape (len(texts), NUM_PERM), dtype uint32.
+    texts = list(texts)
+    result = np.empty((len(texts), NUM_PERM), dtype=np.uint32)
+    start = 0
+    while start < len(texts):
+        # Enough texts to fill a chunk of about _CHUNK_WINDOWS 4-grams
+        end, windows = start, 0
+        while end < len(texts) and (windows < _CHUNK_WINDOWS or end == start):
+            windows += max(len(texts[end] or ""), 1) + 2
+            end += 1
+        codes, offsets = shingle_codes(texts[start:end])
+        x = codes.astype(np.uint64)
+        for j in range(NUM_PERM):
+            hashed = (x * _A[j] + _B[j]) >> np.uint64(32)
+            result[start:end, j] = np.minimum.reduceat(hashed, offsets)
+        start = end
+    return result
+
+
+def band_keys(sigs, bands=BANDS):
+    # LSH bucket key of every band, shape (len(sigs), bands), dtype int64 (SQLite INTEGER).
+    # Other band counts (dividing NUM_PERM) are for tuning; the stored index uses BANDS.
+    rows = NUM_PERM // bands
+    values = np.asarray(sigs, dtype=np.uint32).reshape(len(sigs), bands, rows)
+    keys = np.zeros((len(sigs), bands), dtype=np.uint64)
+    for r in range(rows):  # a row at a time, so memory stays at two keys-sized arrays
+        keys += values[:, :, r] * _K[r]
+    return keys.view(np.int64)
+
+
+def similarity(sig, sigs):
+    # Estimated Jaccard similarity of one signature to each of sigs.
+    return (np.asarray(sigs) == sig).mean(axis=1)
+
+
+def to_blob(sig):
+    return np.asarray(sig, dtype="<u4").tobytes()
+
+
+def from_blobs(blobs):
+    return np.frombuffer(b"".join(blobs), dtype="<u4").reshape(-1, NUM_PERM)
@@ -1,35 +1,173 @@
 # backend/nlp_utils.py
 # NLP utilities for Campus Buddy — sentiment, priority, keyword extraction, auto-category suggestion
 
+import os
 import re
+import threading
+from contextlib import contextmanager
 
-# Try importing TextBlob for sentiment analysis
-try:
-    from textblob import TextBlob
-    _HAS_TEXTBLOB = True
-except Exception:
-    _HAS_TEXTBLOB = False
-
-# Try importing spaCy for keyword extraction
-try:
-    import spacy
-    nlp = spacy.load("en_core_web_sm")
-    _HAS_SPACY = True
-except Exception:
-    _HAS_SPACY = False
+from backend import metrics
+from backend.config import general_categories, critical_categories
+from backend.keyword_matcher import KeywordMatcher, count_hits
+
+# Bump when the enrichment logic changes so stored results get recomputed by the backfill.
+NLP_VERSION = 1
+
+# Lazy model loading
+# TextBlob, spaCy (and its model) and NumPy are imported on first use, so importing this module
+# is cheap and the login pages never pay for them. warm_up() loads them ahead of time.
+_UNLOADED = object()
+_textblob = _UNLOADED
+_spacy_nlp = _UNLOADED
+_load_lock = threading.Lock()
+_warm_up_thread = None
+
+def _get_textblob():
+    # TextBlob class, or None if TextBlob is not installed.
+    global _textblob
+    if _textblob is _UNLOADED:
+        with _load_lock:
+            if _textblob is _UNLOADED:
+                try:
+                    from textblob import TextBlob
+                    _textblob = TextBlob
+                except Exception:
+                    _textblob = None
+    return _textblob
+
+def _get_spacy():
+    # spaCy English pipeline for keyword extraction, or None if spaCy or the model is missing.
+    global _spacy_nlp
+    if _spacy_nlp is _UNLOADED:
+        with _load_lock:
+            if _spacy_nlp is _UNLOADED:
+                try:
+                    import spacy
+                    _spacy_nlp = spacy.load("en_core_web_sm")
+                except Exception:
+                    _spacy_nlp = None
+    return _spacy_nlp
+
+# Trained category classifier (backend/category_model.py), reloaded whenever the file changes,
+# e.g. after python -m backend.train_category_model. Without a model the keyword scorer is used.
+CATEGORY_MODEL_PATH = os.getenv("CAMPUS_BUDDY_CATEGORY_MODEL", "category_model.npz")
+_category_model = None
+_category_model_mtime = None
+_category_model_lock = threading.Lock()
+
+def _get_category_model():
+    # CategoryModel, or None if there is no (readable) model file.
+    global _category_model, _category_model_mtime
+    try:
+        mtime = os.stat(CATEGORY_MODEL_PATH).st_mtime_ns
+    except OSError:
+        return None
+    if mtime != _category_model_mtime:
+        with _category_model_lock:
+            if mtime != _category_model_mtime:
+                try:
+                    from backend.category_model import CategoryModel
+                    _category_model = CategoryModel.load(CATEGORY_MODEL_PATH)
+                except Exception:
+                    _category_model = None
+                _category_model_mtime = mtime
+    return _category_model
+
+@contextmanager
+def model_file_lock(path=None):
+    # Exclusive lock on <model>.lock, held while a process loads, updates and saves the model file, so
+    # the admin portal, the API, the worker and the training script never overwrite each other's updates.
+    with open(f"{path or CATEGORY_MODEL_PATH}.lock", "a+b") as lock_file:
+        try:
+            import fcntl
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        except ImportError:  # Windows: msvcrt.locking retries for about 10 s, then raises
+            import msvcrt
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        yield  # closing the file releases the lock
+
+def learn_categories(descriptions, categories) -> bool:
+    # Add confirmed (description, category) examples to the trained model and save it.
+    # Returns False (and does nothing) while no model has been trained. Called by backend.worker
+    # (database.learn_from_resolved), in batches, never from a page or API request.
+    global _category_model, _category_model_mtime
+    if _get_category_model() is None:
+        return False
+    from backend.category_model import CategoryModel
+    with _category_model_lock, model_file_lock():
+        # Update a fresh copy so concurrent predictions keep using a consistent model
+        model = CategoryModel.load(CATEGORY_MODEL_PATH).partial_fit(descriptions, categories)
+        model.save(CATEGORY_MODEL_PATH)
+        _category_model, _category_model_mtime = model, os.stat(CATEGORY_MODEL_PATH).st_mtime_ns
+    return True
+
+def warm_up(background: bool = True):
+    # Load the NLP models before the first complaint needs them (optional).
+    # Runs at most once per process; with background=True it returns the loader thread.
+    global _warm_up_thread
+
+    def _load():
+        import numpy  # noqa: F401
+        if _get_textblob() is not None:
+            try:
+                _pattern_analyzer()
+            except Exception:
+                pass
+        _get_spacy()
+        _get_category_model()
+
+    with _load_lock:
+        if _warm_up_thread is not None:
+            return _warm_up_thread
+        _warm_up_thread = threading.Thread(target=_load, name="nlp-warm-up", daemon=True)
+    if background:
+        _warm_up_thread.start()
+    else:
+        _warm_up_thread.run()
+    return _warm_up_thread
+
+# Keyword Matching
+# Every keyword list below (and the category keywords in backend/config.py) is compiled into one
+# matcher, so priority, the sentiment fallback and category suggestion share a single scan of the text.
+# All keywords are matched as substrings ("frustrat" covers frustrated/frustrating).
+URGENT_WORDS = [
+    "urgent", "immediately", "asap", "emergency",
+    "help", "critical", "unsafe", "danger", "important", "right away"
+]
+POSITIVE_WORDS = ["good", "great", "satisfied", "happy", "excellent", "resolved"]
+NEGATIVE_WORDS = ["bad", "poor", "angry", "upset", "problem", "not", "never", "complaint", "frustrat", "issue", "hate"]
+
+def _category_keywords(categories_dict):
+    # keyword -> categories listing it (once per listing, as the scores count them)
+    keywords = {}
+    for cat, listed in categories_dict.items():
+        for word in listed.split(","):
+            word = word.strip().lower()
+            if word:
+                keywords.setdefault(word, []).append(cat)
+    return keywords
+
+_CATEGORIES = {**general_categories, **critical_categories}
+_CATEGORY_KEYWORDS = _category_keywords(_CATEGORIES)
+_URGENT_SET = frozenset(URGENT_WORDS)
+_KEYWORD_MATCHER = KeywordMatcher(URGENT_WORDS + POSITIVE_WORDS + NEGATIVE_WORDS + list(_CATEGORY_KEYWORDS))
+_category_matchers = {}
+
+def _keyword_hits(text):
+    return _KEYWORD_MATCHER.find_all(text or "")
 
 # Priority Detection
+def _priority_from_hits(hits) -> str:
+    return "Urgent" if any(hit.keyword in _URGENT_SET for hit in hits) else "Standard"
+
 def detect_priority(text: str) -> str:
     # Detect if a complaint is urgent based on keywords.
     # Returns 'Urgent' or 'Standard'.
-    urgent_words = [
-        "urgent", "immediately", "asap", "emergency",
-        "help", "critical", "unsafe", "danger", "important", "right away"
-    ]
-    t = (text or "").lower()
-    return "Urgent" if any(kw in t for kw in urgent_words) else "Standard"
+    return _priority_from_hits(_keyword_hits(text))
 
 # Sentiment Analysis
+
 def get_sentiment_label(text: str) -> str:
     # Returns sentiment label: 'Positive', 'Neutral', 'Negative'.
     # Uses TextBlob if available, else a fallback heuristic.
@@ -37,7 +175,8 @@ def get_sentiment_label(text: str) -> str:
     if t == "":
         return "Neutral"
 
-    if _HAS_TEXTBLOB:
+    TextBlob = _get_textblob()
+    if TextBlob is not None:
         try:
             polarity = TextBlob(t).sentiment.polarity
             if polarity > 0.1:
@@ -49,25 +188,107 @@ def get_sentiment_label(text: str) -> str:
             pass
 
     # Fallback simple keyword heuristic
-    pos = ["good", "great", "satisfied", "happy", "excellent", "resolved"]
-    neg = ["bad", "poor", "angry", "upset", "problem", "not", "never", "complaint", "frustrat", "issue", "hate"]
     score = 0
-    tl = t.lower()
-    for w in pos: 
-        if w in tl: score += 1
-    for w in neg: 
-        if w in tl: score -= 1
+    found = {hit.keyword for hit in _keyword_hits(t)}
+    for w in POSITIVE_WORDS:
+        if w in found: score += 1
+    for w in NEGATIVE_WORDS:
+        if w in found: score -= 1
     if score > 0: return "Positive"
     if score < 0: return "Negative"
     return "Neutral"
 
+# Batch Sentiment Analysis
+# Texts at or above this count are scored in a process pool when workers > 1.
+PARALLEL_MIN_TEXTS = 2000
+
+# Fallback lexicon: one weight per keyword, looked up from the shared keyword matcher's hits.
+_LEXICON = list(dict.fromkeys(POSITIVE_WORDS + NEGATIVE_WORDS))
+_LEXICON_INDEX = {w: i for i, w in enumerate(_LEXICON)}
+_LEXICON_WEIGHTS = [1.0 if w in POSITIVE_WORDS else -1.0 for w in _LEXICON]
+_LABELS = ("Negative", "Neutral", "Positive")
+
+# TextBlob screen: a text made only of these characters has no emoticons, contractions or "(!)",
+# so TextBlob can only score it through lexicon words; without any, its polarity is exactly 0.
+_PLAIN_TEXT = re.compile(r"[a-z0-9\s.,!?\-]*")
+_PLAIN_TOKEN = re.compile(r"[a-z0-9\-]+")
+_textblob_lexicon = None
+
+def _pattern_analyzer():
+    # TextBlob's default analyzer (what TextBlob(text).sentiment calls) and its word lexicon.
+    global _textblob_lexicon
+    from textblob.en import sentiment
+    if _textblob_lexicon is None:
+        _textblob_lexicon = frozenset(sentiment.keys())
+    return sentiment, _textblob_lexicon
+
+def _may_have_polarity(text, lexicon):
+    tl = text.lower()
+    if not _PLAIN_TEXT.fullmatch(tl):
+        return True
+    for token in _PLAIN_TOKEN.findall(tl):
+        if token in lexicon or ("-" in token and any(part in lexicon for part in token.split("-"))):
+            return True
+    return False
+
+def _textblob_polarity(text):
+    # Polarity of one text (same value as TextBlob(text).sentiment.polarity), or NaN on failure.
+    try:
+        analyzer, lexicon = _pattern_analyzer()
+        if not _may_have_polarity(text, lexicon):
+            return 0.0
+        return analyzer(text)[0]
+    except Exception:
+        return float("nan")
+
+def _heuristic_scores(texts):
+    # Keyword heuristic for many texts: each distinct keyword present counts once.
+    docs, words = [], []
+    for i, t in enumerate(texts):
+        for w in {hit.keyword for hit in _keyword_hits(t)}:
+            if w in _LEXICON_INDEX:
+                docs.append(i)
+                words.append(_LEXICON_INDEX[w])
+    import numpy as np
+    weights = np.array(_LEXICON_WEIGHTS)[np.array(words, dtype=np.intp)]
+    return np.bincount(np.array(docs, dtype=np.intp), weights=weights, minlength=len(texts))
+
+def get_sentiment_labels(texts, workers: int = 1) -> list:
+    # Batch version of get_sentiment_label: same labels, one pass over the batch.
+    # Duplicate texts are scored once; with workers > 1, large batches use a process pool.
+    stripped = [(t or "").strip() for t in texts]
+    unique = list(dict.fromkeys(t for t in stripped if t))
+    if not unique:
+        return ["Neutral"] * len(stripped)
+
+    import numpy as np
+    if _get_textblob() is not None:
+        if workers > 1 and len(unique) >= PARALLEL_MIN_TEXTS:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                polarity = np.fromiter(pool.map(_textblob_polarity, unique, chunksize=256), float, len(unique))
+        else:
+            polarity = np.fromiter(map(_textblob_polarity, unique), float, len(unique))
+        # Map polarity onto -1 / 0 / +1 with the same thresholds as get_sentiment_label
+        scores = np.where(polarity > 0.1, 1.0, np.where(polarity < -0.1, -1.0, 0.0))
+        failed = np.flatnonzero(np.isnan(polarity))
+        if failed.size:
+            scores[failed] = _heuristic_scores([unique[i] for i in failed])
+    else:
+        scores = _heuristic_scores(unique)
+
+    labels = np.array(_LABELS, dtype=object)[(np.sign(scores) + 1).astype(np.intp)]
+    by_text = dict(zip(unique, labels))
+    return [by_text[t] if t else "Neutral" for t in stripped]
+
 # Keyword / Tag Extraction
 def extract_keywords(text: str, top_n: int = 5) -> list:
     # Extract top N keywords or noun phrases from complaint text.
     
     if not text:
         return []
-    if _HAS_SPACY:
+    nlp = _get_spacy()
+    if nlp is not None:
         doc = nlp(text)
         keywords = [token.text for token in doc if token.pos_ in ["NOUN", "PROPN"]]
         chunks = [chunk.text for chunk in doc.noun_chunks]
@@ -78,15 +299,77 @@ def extract_keywords(text: str, top_n: int = 5) -> list:
     return all_keywords[:top_n]
 
 # Auto-Category Suggestion
-def suggest_category(description: str, categories_dict: dict) -> str:
-    # Suggest the most relevant category based on description keywords.
-    # Returns best match or 'Other'.
-    description = (description or "").lower()
+def _category_from_hits(hits, categories_dict, category_keywords) -> str:
+    # A category scores one point per occurrence of each of its keywords (non-overlapping, like str.count).
+    scores = dict.fromkeys(categories_dict, 0)
+    for word, n in count_hits(hits).items():
+        for cat in category_keywords.get(word, ()):
+            scores[cat] += n
     max_score = 0
     suggested = None
-    for cat, keywords in categories_dict.items():
-        score = sum(description.count(word.strip().lower()) for word in keywords.split(","))
+    for cat, score in scores.items():
         if score > max_score:
             max_score = score
             suggested = cat
     return suggested or "Other"
+
+def suggest_category(description: str, categories_dict: dict) -> str:
+    # Suggest the most relevant category: the trained model's prediction when there is a model
+    # and it predicts one of these categories, otherwise the best keyword match or 'Other'.
+    model = _get_category_model()
+    if model is not None:
+        predicted = model.predict([description])[0]
+        if predicted in categories_dict:
+            return predicted
+    return keyword_category(description, categories_dict)
+
+def keyword_category(description: str, categories_dict: dict) -> str:
+    # Category whose example keywords occur most often in the description, or 'Other'.
+    if categories_dict == _CATEGORIES:
+        return _category_from_hits(_keyword_hits(description), _CATEGORIES, _CATEGORY_KEYWORDS)
+    # Other category sets get their own matcher, compiled once per distinct set
+    key = tuple(categories_dict.items())
+    if key not in _category_matchers:
+        category_keywords = _category_keywords(categories_dict)
+        _category_matchers[key] = (KeywordMatcher(category_keywords), category_keywords)
+    matcher, category_keywords = _category_matchers[key]
+    return _category_from_hits(matcher.find_all(description or ""), categories_dict, category_keywords)
+
+def suggest_categories(descriptions) -> list:
+    # Batch version of suggest_category for the configured categories (one model call for all).
+    descriptions = list(descriptions)
+    return _suggest_categories(descriptions, [_keyword_hits(d) for d in descriptions])
+
+def _suggest_categories(descriptions, hits_per_description):
+    model = _get_category_model()
+    predicted = model.predict(descriptions) if model is not None else [None] * len(descriptions)
+    return [
+        p if p in _CATEGORIES else _category_from_hits(hits, _CATEGORIES, _CATEGORY_KEYWORDS)
+        for p, hits in zip(predicted, hits_per_description)
+    ]
+
+# Complaint Enrichment
+def enrich_complaint(description: str) -> dict:
+    # Run every NLP step once for a complaint description.
+    # Returns the values stored alongside the complaint in the database.
+    return enrich_complaints([description])[0]
+
+def enrich_complaints(descriptions, workers: int = 1) -> list:
+    # Batch version of enrich_complaint (sentiment is scored for the whole batch at once).
+    # Priority and the keyword fallback for the category come from one keyword scan per description.
+    descriptions = list(descriptions)
+    sentiments = get_sentiment_labels(descriptions, workers=workers)
+    hits = [_keyword_hits(description) for description in descriptions]
+    categories = _suggest_categories(descriptions, hits)
+    return [
+        {
+            "sentiment": sentiment,
+            "priority": _priority_from_hits(description_hits),
+            "keywords": extract_keywords(description),
+            "suggested_category": category,
+        }
+        for description, sentiment, description_hits, category in zip(descriptions, sentiments, hits, categories)
+    ]
+
+# Instrumentation: every public function above is timed (see backend/metrics.py)
+metrics.instrument(globals(), "nlp")
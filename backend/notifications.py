@@ -0,0 +1,37 @@
+# backend/notifications.py
+# New-complaint alerts: a JSON POST to a webhook (a Slack/Teams incoming webhook, a helpdesk, or any
+# HTTP endpoint) set with CAMPUS_BUDDY_NOTIFY_URL. Sent by the background worker (backend/worker.py),
+# never from a page, so a slow or failing endpoint only delays the alert and is retried.
+
+import json
+import os
+import urllib.request
+
+NOTIFY_URL = os.getenv("CAMPUS_BUDDY_NOTIFY_URL") or None
+ENABLED = NOTIFY_URL is not None
+TIMEOUT = 10  # seconds
+
+
+def complaint_message(complaint):
+    # Webhook payload for a new complaint (a database.Complaint); no student details for anonymous ones.
+    priority = complaint.priority or "unknown"
+    return {
+        "event": "complaint.created",
+        "id": complaint.id,
+        "type": complaint.type,
+        "category": complaint.category,
+        "priority": complaint.priority,
+        "email": None if complaint.is_anonymous else complaint.email,
+        "created_ts": complaint.created_ts,
+        "text": f"New complaint #{complaint.id}: {complaint.category or 'no category'}, priority {priority}",
+    }
+
+
+def notify_new_complaint(complaint, url=None):
+    # POST the complaint's message to the webhook; raises on network errors and non-2xx responses.
+    request = urllib.request.Request(
+        url or NOTIFY_URL, data=json.dumps(complaint_message(complaint)).encode("utf-8"),
+        headers={"Content-Type": "application/json"}, method="POST",
+    )
+    with urllib.request.urlopen(request, timeout=TIMEOUT) as response:
+        response.read()
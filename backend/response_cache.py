@@ -0,0 +1,148 @@
+# backend/response_cache.py
+# Cache for chatbot answers: an in-process LRU in front of a SQLite table on disk.
+# Prompts are normalised (case, punctuation, whitespace), so "Exam schedule?" and
+# "exam schedule" share one entry.
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from backend.database import connection, transaction
+
+CACHE_DB_PATH = "chat_cache.db"
+DEFAULT_TTL = 7 * 24 * 3600      # seconds
+DEFAULT_MAX_ENTRIES = 10_000     # rows kept on disk
+DEFAULT_MEMORY_ENTRIES = 512     # entries kept in the in-process LRU
+EVICT_EVERY = 100                # puts between size checks of the disk table
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt):
+    # Canonical form of a prompt used for the cache key.
+    text = _NON_WORD.sub(" ", (prompt or "").lower())
+    return _SPACES.sub(" ", text).strip()
+
+
+class ResponseCache:
+    # get/put are thread-safe. `namespace` partitions entries (e.g. by FAQ content version);
+    # entries from other namespaces are never returned and are dropped by invalidate().
+
+    def __init__(self, path=CACHE_DB_PATH, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES,
+                 memory_entries=DEFAULT_MEMORY_ENTRIES, namespace=""):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.namespace = namespace
+        self._memory = OrderedDict()  # key -> (response, expires_at)
+        self._lock = threading.Lock()
+        self._puts = 0
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "puts": 0, "evictions": 0}
+        with transaction(self.path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    key TEXT PRIMARY KEY,
+                    namespace TEXT NOT NULL,
+                    prompt TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at INTEGER NOT NULL,
+                    expires_at INTEGER NOT NULL,
+                    last_hit INTEGER NOT NULL
+                )
+            ''')
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_response_cache_last_hit ON response_cache(last_hit)")
+
+    def _key(self, prompt):
+        return hashlib.sha256(f"{self.namespace}\0{normalize_prompt(prompt)}".encode()).hexdigest()
+
+    def get(self, prompt):
+        # Cached response for the prompt, or None.
+        key = self._key(prompt)
+        now = time.time()
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit and hit[1] > now:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return hit[0]
+            self._memory.pop(key, None)
+        with connection(self.path) as conn:
+            row = conn.execute(
+                "SELECT response, expires_at FROM response_cache WHERE key=? AND expires_at>?", (key, int(now))
+            ).fetchone()
+        with self._lock:
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["disk_hits"] += 1
+            self._remember(key, row[0], row[1])
+        with transaction(self.path) as conn:
+            conn.execute("UPDATE response_cache SET last_hit=? WHERE key=?", (int(now), key))
+        return row[0]
+
+    def put(self, prompt, response):
+        # Store a response for the prompt.
+        key = self._key(prompt)
+        now = int(time.time())
+        expires_at = now + self.ttl
+        with self._lock:
+            self._remember(key, response, expires_at)
+            self._stats["puts"] += 1
+            self._puts += 1
+            check_size = self._puts % EVICT_EVERY == 0
+        with transaction(self.path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, namespace, prompt, response, created_at, expires_at, last_hit) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, self.namespace, normalize_prompt(prompt), response, now, expires_at, now),
+            )
+        if check_size:
+            self.evict()
+
+    def _remember(self, key, response, expires_at):
+        # Caller holds self._lock.
+        self._memory[key] = (response, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def evict(self):
+        # Drop expired rows, then the least recently used rows above max_entries. Returns rows removed.
+        with transaction(self.path) as conn:
+            removed = conn.execute("DELETE FROM response_cache WHERE expires_at<=?", (int(time.time()),)).rowcount
+            excess = conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0] - self.max_entries
+            if excess > 0:
+                removed += conn.execute(
+                    "DELETE FROM response_cache WHERE key IN "
+                    "(SELECT key FROM response_cache ORDER BY last_hit LIMIT ?)", (excess,),
+                ).rowcount
+        with self._lock:
+            self._stats["evictions"] += removed
+        return removed
+
+    def invalidate(self, namespace=None):
+        # Switch to a new namespace (if given) and delete every entry outside it.
+        # With no namespace, clears the whole cache.
+        with self._lock:
+            if namespace is not None:
+                self.namespace = namespace
+            self._memory.clear()
+        with transaction(self.path) as conn:
+            if namespace is None:
+                conn.execute("DELETE FROM response_cache")
+            else:
+                conn.execute("DELETE FROM response_cache WHERE namespace<>?", (namespace,))
+
+    def stats(self):
+        # Hit/miss counters since this cache object was created, plus current sizes.
+        with self._lock:
+            stats = dict(self._stats, memory_entries=len(self._memory))
+        with connection(self.path) as conn:
+            stats["disk_entries"] = conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
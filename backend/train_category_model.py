@@ -0,0 +1,79 @@
+# backend/train_category_model.py
+# Train the complaint category classifier from the complaints table.
+# Usage: python -m backend.train_category_model [--resolved-only] [--holdout 0.2] [--no-refresh]
+# Prints holdout accuracy (model vs keyword scorer) and prediction throughput, then trains on
+# every example, saves the model and recomputes the stored suggested categories.
+
+import argparse
+import random
+import time
+
+from backend import nlp_utils
+from backend.category_model import CategoryModel
+from backend.config import general_categories, critical_categories
+from backend.database import init_db, get_training_examples, refresh_suggested_categories
+
+
+def evaluate(examples, holdout=0.2, seed=0):
+    # Holdout accuracy of the model and of the keyword scorer, plus training and prediction speed.
+    examples = list(examples)
+    random.Random(seed).shuffle(examples)
+    split = int(len(examples) * (1 - holdout))
+    train, test = examples[:split], examples[split:]
+    texts, labels = [d for d, _ in test], [c for _, c in test]
+
+    start = time.perf_counter()
+    model = CategoryModel().fit([d for d, _ in train], [c for _, c in train])
+    train_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    predicted = model.predict(texts)
+    predict_seconds = time.perf_counter() - start
+
+    categories = {**general_categories, **critical_categories}
+    keyword = [nlp_utils.keyword_category(d, categories) for d in texts]
+    n = max(len(test), 1)
+    return {
+        "train": len(train),
+        "test": len(test),
+        "model_accuracy": sum(p == c for p, c in zip(predicted, labels)) / n,
+        "keyword_accuracy": sum(k == c for k, c in zip(keyword, labels)) / n,
+        "train_per_sec": len(train) / train_seconds if train_seconds else float("inf"),
+        "predict_per_sec": len(test) / predict_seconds if predict_seconds else float("inf"),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the complaint category classifier.")
+    parser.add_argument("--model", default=nlp_utils.CATEGORY_MODEL_PATH, help="model file to write")
+    parser.add_argument("--resolved-only", action="store_true", help="train on resolved complaints only")
+    parser.add_argument("--holdout", type=float, default=0.2, help="fraction held out for the accuracy report")
+    parser.add_argument("--no-refresh", action="store_true", help="do not recompute stored suggested categories")
+    args = parser.parse_args(argv)
+
+    init_db()
+    examples = get_training_examples(args.resolved_only)
+    if len(set(c for _, c in examples)) < 2:
+        print(f"Not enough training data ({len(examples)} complaints); the keyword scorer stays in use.")
+        return
+    if args.holdout > 0:
+        m = evaluate(examples, args.holdout)
+        print(f"Holdout: trained on {m['train']}, tested on {m['test']} complaints")
+        print(f"  model accuracy    {m['model_accuracy']:.1%}")
+        print(f"  keyword accuracy  {m['keyword_accuracy']:.1%}")
+        print(f"  training          {m['train_per_sec']:,.0f} complaints/s")
+        print(f"  prediction        {m['predict_per_sec']:,.0f} complaints/s")
+
+    model = CategoryModel().fit([d for d, _ in examples], [c for _, c in examples])
+    with nlp_utils.model_file_lock(args.model):
+        model.save(args.model)
+    print(f"Saved model ({len(examples)} complaints, {len(model.categories)} categories) to {args.model}")
+
+    if not args.no_refresh and args.model == nlp_utils.CATEGORY_MODEL_PATH:
+        def progress(done):
+            print(f"  refreshed {done} suggested categories", flush=True)
+        refresh_suggested_categories(progress=progress)
+
+
+if __name__ == "__main__":
+    main()
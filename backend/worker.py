@@ -0,0 +1,172 @@
+# backend/worker.py
+# Background worker for the job queue in backend/database.py (JOB QUEUE): NLP enrichment of new
+# complaints and new-complaint notifications, so submitting a complaint never waits for them, and
+# category model updates from resolved complaints, so resolving one never does either.
+# Usage: python -m backend.worker [--processes 2] [--batch-size 50] [--once]
+#        python -m backend.worker --stats | --retry-dead
+# Each process leases a batch of due jobs, runs them (a whole batch of new complaints is enriched in
+# one call) and reports each job done or failed. Failed jobs are retried with backoff and end up
+# dead-lettered after JOB_MAX_ATTEMPTS; jobs of a worker that was killed are picked up again once
+# their lease expires. Each process also runs maintenance() every MAINTENANCE_INTERVAL.
+# Stopping (Ctrl-C or SIGTERM) lets every process finish its current batch.
+
+import argparse
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+from itertools import groupby
+
+from backend import database, notifications
+
+BATCH_SIZE = 50
+LEASE_SECONDS = 300     # longer than any batch takes; a job leased this long is presumed lost
+POLL_SECONDS = 1.0      # wait between queue checks while idle
+MAINTENANCE_INTERVAL = 3600  # seconds between maintenance() runs
+
+# Job kind -> handler(jobs) returning {job id: error message} for the jobs that failed (or raising,
+# which fails the whole batch)
+HANDLERS = {}
+
+
+def handler(kind):
+    def decorate(fn):
+        HANDLERS[kind] = fn
+        return fn
+    return decorate
+
+
+@handler(database.NEW_COMPLAINT_JOB)
+def handle_new_complaints(jobs):
+    ids = [job.payload["id"] for job in jobs]
+    database.enrich_complaints_by_id(ids)
+    if not notifications.ENABLED:
+        return {}
+    failures = {}
+    for job in jobs:
+        complaint = database.get_complaint(job.payload["id"])
+        if complaint is None:
+            continue  # deleted in the meantime
+        try:
+            notifications.notify_new_complaint(complaint)
+        except Exception as e:
+            failures[job.id] = f"notification failed: {e}"
+    return failures
+
+
+@handler(database.LEARN_CATEGORIES_JOB)
+def handle_learn_categories(jobs):
+    # One model update for the whole batch
+    database.learn_from_resolved([cid for job in jobs for cid in job.payload["ids"]])
+    return {}
+
+
+def maintenance():
+    # Periodic upkeep: finish a bulk import whose importer died, delete old finished jobs, index
+    # complaints the near-duplicate index missed (e.g. bulk imports) and drop the index entries of
+    # complaints too old to match.
+    database.finish_stale_bulk_ingest()
+    database.purge_finished_jobs()
+    database.index_near_duplicates()
+    database.prune_near_duplicate_index()
+
+
+def run_batch(owner, jobs):
+    # Run leased jobs through their handlers and record the outcome of each.
+    done = []
+    for kind, group in groupby(jobs, key=lambda job: job.kind):
+        group = list(group)
+        fn = HANDLERS.get(kind)
+        if fn is None:
+            for job in group:
+                database.fail_job(job.id, owner, f"no handler for job kind {kind!r}", retry=False)
+            continue
+        try:
+            failures = fn(group) or {}
+        except Exception as e:
+            failures = dict.fromkeys((job.id for job in group), f"{type(e).__name__}: {e}")
+        for job in group:
+            if job.id in failures:
+                database.fail_job(job.id, owner, failures[job.id])
+            else:
+                done.append(job.id)
+    if done:
+        database.complete_jobs(done, owner)
+
+
+def run_worker(owner, kinds=None, batch_size=BATCH_SIZE, lease_s=LEASE_SECONDS, poll_s=POLL_SECONDS,
+               once=False, stop=None):
+    # Work through the queue until stop is set (or, with once, until nothing is due). Returns jobs run.
+    stop = stop or threading.Event()
+    database.init_db()
+    processed, maintained_at = 0, 0.0
+    while not stop.is_set():
+        if time.monotonic() - maintained_at > MAINTENANCE_INTERVAL:
+            maintenance()
+            maintained_at = time.monotonic()
+        jobs = database.lease_jobs(owner, kinds, batch_size, lease_s)
+        if not jobs:
+            if once:
+                break
+            stop.wait(poll_s)
+            continue
+        # Same-kind jobs are adjacent, so each handler gets them as one batch
+        run_batch(owner, sorted(jobs, key=lambda job: (job.kind, job.id)))
+        processed += len(jobs)
+    return processed
+
+
+def _process_main(index, kinds, batch_size, lease_s, poll_s, once):
+    stop = threading.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: stop.set())
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    processed = run_worker(owner, kinds, batch_size, lease_s, poll_s, once, stop)
+    print(f"worker {index} ({owner}) stopped after {processed} jobs", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run background jobs (complaint enrichment, notifications, category learning).")
+    parser.add_argument("--processes", type=int, default=1, help="worker processes")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="jobs leased at a time per process")
+    parser.add_argument("--lease", type=int, default=LEASE_SECONDS, help="seconds before a leased job is retried")
+    parser.add_argument("--poll", type=float, default=POLL_SECONDS, help="seconds between checks while idle")
+    parser.add_argument("--kinds", help="comma-separated job kinds to run (default: all)")
+    parser.add_argument("--once", action="store_true", help="exit when no job is due")
+    parser.add_argument("--stats", action="store_true", help="print job counts per state and exit")
+    parser.add_argument("--retry-dead", action="store_true", help="requeue dead-lettered jobs and exit")
+    parser.add_argument("--db", help=f"database file (default: {database.DB_PATH})")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        database.DB_PATH = args.db
+    if args.stats or args.retry_dead:
+        database.init_db()
+        if args.retry_dead:
+            print(f"{database.retry_dead_jobs()} dead jobs queued again.")
+        for state, count in database.get_job_counts().items():
+            print(f"  {state:8} {count:,}")
+        return
+
+    kinds = args.kinds.split(",") if args.kinds else None
+    options = (kinds, args.batch_size, args.lease, args.poll, args.once)
+    if args.processes <= 1:
+        _process_main(0, *options)
+        return
+    # Children open their own connections; the parent never touches the database
+    processes = [multiprocessing.Process(target=_process_main, args=(i, *options)) for i in range(args.processes)]
+    for process in processes:
+        process.start()
+    signal.signal(signal.SIGTERM, lambda *_: [p.terminate() for p in processes if p.is_alive()])
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:  # they got the Ctrl-C too and are finishing their batch
+            process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+# benchmarks/__init__.py
+# Micro-benchmarks for Campus Buddy. Run from the project root, e.g.
+#   python -m benchmarks.bench_connections
@@ -0,0 +1,171 @@
+# benchmarks/bench_api.py
+# Load test of the JSON API (backend/api.py): concurrent keep-alive clients send a mix of listing,
+# lookup, submission, status-update and chatbot requests for a fixed time; reports requests/sec and
+# latency percentiles per request kind. By default it starts the API in a separate process on a
+# synthetic database; --url points it at a running server instead (using the demo logins).
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import quote, urlsplit
+
+from backend import database
+from backend.auth import ADMIN_EMAIL, ADMIN_PASSWORD, STUDENT_EMAIL, STUDENT_PASSWORD
+from backend.config import general_categories
+from benchmarks.common import STATUSES, report, temp_database
+from benchmarks.synthetic import fill_database, parse_size
+
+# (kind, share of requests)
+MIX = (("list", 0.55), ("get", 0.15), ("submit", 0.10), ("update", 0.10), ("chat", 0.10))
+
+
+def _basic(email, password):
+    return "Basic " + base64.b64encode(f"{email}:{password}".encode()).decode()
+
+
+STUDENT_AUTH = _basic(STUDENT_EMAIL, STUDENT_PASSWORD)
+ADMIN_AUTH = _basic(ADMIN_EMAIL, ADMIN_PASSWORD)
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] * 1000 if values else 0.0
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(db_path, port):
+    # The API in a child process (so the load generator does not share its GIL); waits until it answers.
+    process = subprocess.Popen(
+        [sys.executable, "-m", "backend.api", "--port", str(port), "--db", db_path],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        env={**os.environ, "CAMPUS_BUDDY_CHAT_CACHE": "0"},
+    )
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return process
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError("API server exited during startup")
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("API server did not start")
+
+
+async def _request(reader, writer, method, target, auth, body=None):
+    # One request on a keep-alive connection; returns the status code.
+    data = json.dumps(body).encode() if body is not None else b""
+    writer.write(
+        f"{method} {target} HTTP/1.1\r\nHost: bench\r\nAuthorization: {auth}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data
+    )
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    length = 0
+    for line in header_lines:
+        name, _, value = line.partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return int(status_line.split(" ")[1])
+
+
+def _next_request(rng, kind, max_id, questions):
+    if kind == "list":
+        return "GET", f"/complaints?limit=20&status={quote(rng.choice(STATUSES))}", ADMIN_AUTH, None
+    if kind == "get":
+        return "GET", f"/complaints/{rng.randint(1, max_id)}", ADMIN_AUTH, None
+    if kind == "submit":
+        category = rng.choice(list(general_categories))
+        return "POST", "/complaints", STUDENT_AUTH, {
+            "type": "General", "category": category,
+            "description": f"The {category.lower()} issue near block {rng.randint(1, 20)} is still not fixed.",
+        }
+    if kind == "update":
+        return "PATCH", f"/complaints/{rng.randint(1, max_id)}", ADMIN_AUTH, {"status": rng.choice(STATUSES)}
+    return "POST", "/chat", STUDENT_AUTH, {"message": rng.choice(questions)}
+
+
+async def _client(n, host, port, deadline, max_id, questions, latencies, errors):
+    rng = random.Random(n)
+    kinds, weights = zip(*MIX)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            kind = rng.choices(kinds, weights)[0]
+            start = time.perf_counter()
+            status = await _request(reader, writer, *_next_request(rng, kind, max_id, questions))
+            latencies[kind].append(time.perf_counter() - start)
+            if status >= 400 and status != 404:
+                errors[kind] += 1
+    finally:
+        writer.close()
+
+
+async def load(host, port, connections, duration, max_id, questions):
+    latencies = {kind: [] for kind, _ in MIX}
+    errors = dict.fromkeys(latencies, 0)
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _client(n, host, port, deadline, max_id, questions, latencies, errors) for n in range(connections)
+    ))
+    return latencies, errors, time.perf_counter() - start
+
+
+def run(url, rows, connection_counts, duration):
+    from backend import chatbot
+    questions = [q for q, _, _ in chatbot._all_faqs()]
+
+    def measure(host, port, max_id):
+        for connections in connection_counts:
+            latencies, errors, wall = asyncio.run(load(host, port, connections, duration, max_id, questions))
+            total = sum(len(v) for v in latencies.values())
+            results = {"throughput (req/s)": total / wall,
+                       "latency p50, all (ms)": _percentile([x for v in latencies.values() for x in v], 0.5),
+                       "latency p95, all (ms)": _percentile([x for v in latencies.values() for x in v], 0.95)}
+            for kind, values in latencies.items():
+                results[f"{kind} p50 (ms)"] = _percentile(values, 0.5)
+                results[f"{kind} p95 (ms)"] = _percentile(values, 0.95)
+            results["failed requests"] = sum(errors.values())
+            report(f"API, {connections} keep-alive connections for {duration}s", results)
+
+    if url:
+        parts = urlsplit(url)
+        measure(parts.hostname, parts.port or 80, rows)
+        return
+    with temp_database() as db_path:
+        fill_database(rows)
+        database.close_connections()
+        port = _free_port()
+        server = start_server(db_path, port)
+        try:
+            measure("127.0.0.1", port, rows)
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JSON API load test")
+    parser.add_argument("--rows", type=parse_size, default="10k",
+                        help="synthetic complaints to start with (with --url: highest complaint id to touch)")
+    parser.add_argument("--connections", default="1,16,64", help="comma-separated concurrent connection counts")
+    parser.add_argument("--duration", type=float, default=10, help="seconds per run")
+    parser.add_argument("--url", help="test a running server instead, e.g. http://127.0.0.1:8000")
+    args = parser.parse_args()
+    run(args.url, args.rows, [int(c) for c in args.connections.split(",")], args.duration)
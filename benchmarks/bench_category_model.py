@@ -0,0 +1,109 @@
+# benchmarks/bench_category_model.py
+# Category classifier vs the keyword scorer: holdout accuracy, training and prediction throughput,
+# on synthetic complaints worded the way students write them rather than like backend/config.py.
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from backend import nlp_utils
+from backend.category_model import CategoryModel
+from backend.config import general_categories, critical_categories
+from benchmarks.common import report
+
+_PHRASES = {
+    "Academics and Faculty": ("professor never shows up", "exam marks are wrong", "lecture timetable clash",
+                              "grading is unfair", "faculty unavailable for doubts", "assignment deadline moved"),
+    "Administration and Services": ("fee payment portal failed", "id card not issued", "certificate delayed",
+                                    "office staff rude at the counter", "refund still pending", "bonafide letter"),
+    "Infrastructure and Facilities": ("projector broken in class", "ac not cooling", "lights flicker in lab",
+                                      "benches are damaged", "no drinking water", "ceiling fan making noise"),
+    "Hostel and Transportation": ("mess food is stale", "room door lock broken", "college van late every day",
+                                  "no parking space", "hostel warden unresponsive", "bus route changed"),
+    "Connectivity and Hygiene": ("wifi keeps disconnecting", "internet too slow", "washrooms are dirty",
+                                 "garbage not cleared", "no soap in toilets", "network down in block b"),
+    "Sports and Activities": ("gym equipment broken", "football ground locked", "club budget not approved",
+                              "no coach for cricket", "sports kit missing", "event cancelled"),
+    "Library": ("books not available", "study room always full", "library closes early",
+                "cannot access e-journals", "fine charged wrongly", "reading hall too noisy"),
+    "Bullying and Harassment": ("seniors ragging juniors", "being harassed online", "classmates mock me daily",
+                                "threatened by a group", "verbal abuse in hostel", "physical bullying"),
+    "Mental Health": ("feeling very stressed", "anxiety before exams", "need counseling support",
+                      "cannot sleep due to pressure", "feeling lonely and low", "panic attacks"),
+    "Discrimination": ("treated differently because of my caste", "gender bias in marks", "religious remarks",
+                       "excluded because of my accent", "unfair treatment of women", "ethnic slurs"),
+    "Safety": ("someone is stalking me", "unsafe road near gate", "no guard at night",
+               "strangers entering campus", "broken cctv cameras", "felt threatened walking back"),
+}
+_FILLER = ("please help", "this has happened again", "since last week", "nobody is responding",
+           "kindly look into it", "it is very frustrating", "in the morning", "for many students")
+
+
+def synthetic_examples(n, noise=0.05, seed=1):
+    rng = random.Random(seed)
+    categories = list(_PHRASES)
+    examples = []
+    for _ in range(n):
+        category = rng.choice(categories)
+        text = " ".join(rng.sample(_PHRASES[category], 2) + rng.sample(_FILLER, 2))
+        label = rng.choice(categories) if rng.random() < noise else category
+        examples.append((text, label))
+    return examples
+
+
+def run(n):
+    examples = synthetic_examples(n)
+    split = int(n * 0.8)
+    train, test = examples[:split], examples[split:]
+    texts, labels = [t for t, _ in test], [c for _, c in test]
+
+    start = time.perf_counter()
+    model = CategoryModel().fit([t for t, _ in train], [c for _, c in train])
+    train_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    predicted = model.predict(texts)
+    batch_s = time.perf_counter() - start
+    single = texts[:500]
+    start = time.perf_counter()
+    for text in single:
+        model.predict([text])
+    single_s = time.perf_counter() - start
+
+    categories = {**general_categories, **critical_categories}
+    start = time.perf_counter()
+    keyword = [nlp_utils.keyword_category(t, categories) for t in texts]
+    keyword_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model.partial_fit(texts[:1], labels[:1])
+    partial_ms = (time.perf_counter() - start) * 1000
+    path = os.path.join(tempfile.mkdtemp(prefix="campus_buddy_bench_"), "category_model.npz")
+    start = time.perf_counter()
+    model.save(path)
+    save_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    CategoryModel.load(path)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    report(f"Category classifier, {len(train):,} training / {len(test):,} test complaints", {
+        "model accuracy (%)": 100 * sum(p == c for p, c in zip(predicted, labels)) / len(test),
+        "keyword accuracy (%)": 100 * sum(k == c for k, c in zip(keyword, labels)) / len(test),
+        "training (complaints/s)": len(train) / train_s,
+        "batch predict (complaints/s)": len(test) / batch_s,
+        "one-by-one predict (complaints/s)": len(single) / single_s,
+        "keyword scorer (complaints/s)": len(test) / keyword_s,
+        "partial_fit, one complaint (ms)": partial_ms,
+        "save (ms)": save_ms,
+        "load (ms)": load_ms,
+        "model file (KB)": os.path.getsize(path) / 1024,
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Category classifier benchmark")
+    parser.add_argument("-n", type=int, default=20_000, help="synthetic complaints (80% train, 20% test)")
+    args = parser.parse_args()
+    run(args.n)
@@ -0,0 +1,68 @@
+# benchmarks/bench_connections.py
+# Ops/sec of the database functions: one connection per call (old) vs the pooled WAL manager.
+
+import argparse
+import sqlite3
+from datetime import datetime
+
+from backend import database
+from benchmarks.common import ops_per_sec, report, temp_database
+
+
+# OLD IMPLEMENTATION (connect, execute, commit, close on every call)
+def _old_add(i):
+    conn = sqlite3.connect(database.DB_PATH)
+    conn.execute('''
+        INSERT INTO complaints
+        (type, category, subcategory, description, is_anonymous, file_path, email, status, assigned_to, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, 'Pending', NULL, ?)
+    ''', ("General", "Library", None, f"Complaint {i}", 0, None, f"s{i % 50}@college.edu",
+          datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+    conn.commit()
+    conn.close()
+
+def _old_by_email(i):
+    conn = sqlite3.connect(database.DB_PATH)
+    conn.execute("SELECT * FROM complaints WHERE email=? ORDER BY created_at DESC", (f"s{i % 50}@college.edu",)).fetchall()
+    conn.close()
+
+def _old_update(i):
+    conn = sqlite3.connect(database.DB_PATH)
+    conn.execute("UPDATE complaints SET status=? WHERE id=?", ("In Progress", i % 500 + 1))
+    conn.commit()
+    conn.close()
+
+
+# NEW IMPLEMENTATION (backend.database)
+def _new_add(i):
+    database.add_complaint("General", "Library", None, f"Complaint {i}", False, None, f"s{i % 50}@college.edu")
+
+def _new_by_email(i):
+    database.get_complaints_by_email(f"s{i % 50}@college.edu")
+
+def _new_update(i):
+    database.update_complaint_status(i % 500 + 1, "In Progress")
+
+
+def run(n):
+    results = {}
+    with temp_database():
+        # The old code ran in the default rollback-journal mode.
+        with database.connection() as conn:
+            conn.execute("PRAGMA journal_mode=DELETE")
+        database.close_connections()
+        results["old add_complaint"] = ops_per_sec(_old_add, n)
+        results["old get_complaints_by_email"] = ops_per_sec(_old_by_email, n)
+        results["old update_complaint_status"] = ops_per_sec(_old_update, n)
+    with temp_database():
+        results["new add_complaint"] = ops_per_sec(_new_add, n)
+        results["new get_complaints_by_email"] = ops_per_sec(_new_by_email, n)
+        results["new update_complaint_status"] = ops_per_sec(_new_update, n)
+    report(f"Database ops/sec ({n} calls each)", results)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Database connection benchmark")
+    parser.add_argument("-n", type=int, default=1000, help="calls per operation")
+    run(parser.parse_args().n)
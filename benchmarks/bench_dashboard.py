@@ -0,0 +1,67 @@
+# benchmarks/bench_dashboard.py
+# Dashboard summary: old path (full table into pandas, boolean masks, value_counts per chart) vs
+# get_dashboard_stats (trigger-maintained counters), plus what the counter triggers cost per insert.
+
+import argparse
+
+import pandas as pd
+
+from backend import database
+from benchmarks.common import report, seed_complaints, temp_database, timed
+
+
+def _pandas_summary():
+    # The Dashboard before this change.
+    df = pd.DataFrame(database.get_all_complaints(), columns=database.COMPLAINT_COLUMNS)
+    return {
+        "total": len(df),
+        "Pending": len(df[df["status"] == "Pending"]),
+        "In Progress": len(df[df["status"] == "In Progress"]),
+        "Resolved": len(df[df["status"] == "Resolved"]),
+        "status": df["status"].value_counts().to_dict(),
+        "category": df["category"].value_counts().to_dict(),
+        "sentiment": df["sentiment"].value_counts().to_dict(),
+    }
+
+
+def _insert_batch(n):
+    seed_complaints(n, seed=n)
+
+
+def _without_counter_triggers(fn):
+    # Run fn with the counter triggers dropped, then restore them (and the counts) via the migration.
+    with database.transaction() as conn:
+        for name in ("insert", "delete", "update"):
+            conn.execute(f"DROP TRIGGER complaints_count_{name}")
+    try:
+        return fn()
+    finally:
+        with database.transaction() as conn:
+            conn.execute("DELETE FROM complaint_counts")
+            database._migration_dashboard_counters(conn)
+
+
+def run(n, inserts=20_000):
+    with temp_database():
+        seed_complaints(n)
+        stats = database.get_dashboard_stats()
+        expected = _pandas_summary()
+        assert stats["total"] == expected["total"] and stats["status"] == expected["status"], "counters disagree"
+        assert stats["category"] == expected["category"], "counters disagree"
+        results = {
+            "pandas summary (ms)": timed(_pandas_summary, repeat=3),
+            "get_dashboard_stats (ms)": timed(database.get_dashboard_stats, repeat=50),
+            "check_dashboard_counters (ms)": timed(database.check_dashboard_counters, repeat=3),
+            f"insert {inserts:,} with counters (ms)": timed(lambda: _insert_batch(inserts), repeat=1),
+            f"insert {inserts:,} without (ms)": _without_counter_triggers(
+                lambda: timed(lambda: _insert_batch(inserts), repeat=1)),
+        }
+        assert not database.check_dashboard_counters(), "counters drifted"
+    report(f"Dashboard summary over {n:,} complaints", results)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dashboard counters benchmark")
+    parser.add_argument("-n", type=int, default=100_000, help="rows to seed")
+    run(parser.parse_args().n)
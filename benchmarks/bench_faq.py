@@ -0,0 +1,74 @@
+# benchmarks/bench_faq.py
+# FAQ retrieval: the FAQ index vs the old flatten + difflib.get_close_matches lookup, at 10k FAQs.
+
+import argparse
+import difflib
+import random
+import time
+
+from backend.faq_index import FAQIndex
+from benchmarks.common import report
+
+_SUBJECTS = ("ID card", "library card", "hostel room", "Wi-Fi", "timetable", "exam schedule", "fee receipt",
+             "sports kit", "lab access", "van pass", "scholarship", "transcript", "parking permit", "mess menu")
+_ASKS = ("How do I renew my {}?", "Where can I get a new {}?", "Who handles {} problems?",
+         "What is the deadline for the {}?", "Can I change my {} online?", "Why is my {} not working?")
+
+
+def synthetic_faqs(n, seed=3):
+    rng = random.Random(seed)
+    faqs = []
+    for i in range(n):
+        subject = f"{rng.choice(_SUBJECTS)} {rng.choice(('block', 'form', 'office', 'desk'))} {i}"
+        faqs.append((rng.choice(_ASKS).format(subject), f"Answer {i}", None))
+    return faqs
+
+
+def _difflib_lookup(faqs, msg):
+    # The rule-based lookup before the index: rebuild the lists and fuzzy-match on every message.
+    all_questions = [q for q, _, _ in faqs]
+    all_answers = [a for _, a, _ in faqs]
+    match = difflib.get_close_matches(msg, all_questions, n=1, cutoff=0.6)
+    return all_answers[all_questions.index(match[0])] if match else None
+
+
+def run(n, queries):
+    faqs = synthetic_faqs(n)
+    rng = random.Random(11)
+    # Queries: lower-cased, lightly edited versions of real questions
+    sample = [rng.choice(faqs) for _ in range(queries)]
+    asked = [q.lower().replace("how do i", "how to").rstrip("?") for q, _, _ in sample]
+
+    start = time.perf_counter()
+    index = FAQIndex(faqs)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    latencies, hits = [], 0
+    for msg, (_, answer, _) in zip(asked, sample):
+        start = time.perf_counter()
+        top = index.search(msg, k=3)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += bool(top) and top[0].answer == answer
+    latencies.sort()
+
+    difflib_runs = min(3, queries)
+    start = time.perf_counter()
+    for msg in asked[:difflib_runs]:
+        _difflib_lookup(faqs, msg)
+    difflib_ms = (time.perf_counter() - start) * 1000 / difflib_runs
+
+    report(f"FAQ retrieval over {n:,} entries ({queries} queries)", {
+        "index build (ms)": build_ms,
+        "search p50 (ms)": latencies[len(latencies) // 2],
+        "search p99 (ms)": latencies[int(len(latencies) * 0.99) - 1],
+        "top-1 accuracy (%)": 100 * hits / queries,
+        "difflib lookup (ms/query)": difflib_ms,
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FAQ retrieval benchmark")
+    parser.add_argument("-n", type=int, default=10_000, help="number of FAQ entries")
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+    run(args.n, args.queries)
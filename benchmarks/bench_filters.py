@@ -0,0 +1,50 @@
+# benchmarks/bench_filters.py
+# "Filters - Assign" page: old pandas path vs get_complaints_filtered (SQL, index-backed).
+
+import argparse
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+from backend import database
+from benchmarks.common import report, seed_complaints, temp_database, timed
+
+
+def _pandas_filter(category, status, date_from, date_to):
+    # The page before this change: load everything, parse dates per row, filter in pandas.
+    df = pd.DataFrame(database.get_all_complaints(), columns=database.COMPLAINT_COLUMNS)
+    filtered = df.copy()
+    filtered["created_at_dt"] = filtered["created_at"].apply(
+        lambda x: datetime.strptime(x, "%Y-%m-%d %H:%M:%S") if isinstance(x, str) else x
+    )
+    filtered = filtered[filtered["category"] == category]
+    filtered = filtered[filtered["status"] == status]
+    filtered = filtered[filtered["created_at_dt"].dt.date >= date_from]
+    filtered = filtered[filtered["created_at_dt"].dt.date <= date_to]
+    return filtered.head(database.DEFAULT_PAGE_SIZE)
+
+
+def _sql_filter(category, status, date_from, date_to):
+    rows, _ = database.get_complaints_filtered(category, status, date_from, date_to)
+    return rows
+
+
+def run(n):
+    with temp_database():
+        seed_complaints(n)
+        args = ("Library", "Pending", date.today() - timedelta(days=90), date.today())
+        expected = _pandas_filter(*args)["id"].tolist()
+        assert [r[0] for r in _sql_filter(*args)] == expected, "SQL and pandas filters disagree"
+        results = {
+            "pandas path (ms)": timed(lambda: _pandas_filter(*args), repeat=3),
+            "get_complaints_filtered (ms)": timed(lambda: _sql_filter(*args), repeat=20),
+            "status summary (ms)": timed(lambda: database.count_complaints_by_status(*args), repeat=20),
+        }
+    report(f"Filter one page out of {n:,} complaints", results)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Filter query benchmark")
+    parser.add_argument("-n", type=int, default=100_000, help="rows to seed")
+    run(parser.parse_args().n)
@@ -0,0 +1,76 @@
+# benchmarks/bench_gemini.py
+# Time-to-first-token and latency percentiles of the Gemini client against a local fake server.
+
+import argparse
+import threading
+import time
+
+from backend.gemini_client import GeminiClient, RestTransport
+from benchmarks.common import report
+from benchmarks.fake_gemini import start_fake_gemini
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] * 1000
+
+
+def _run_sessions(client, sessions, requests, streaming):
+    # `sessions` threads (like Streamlit sessions) each send `requests` questions.
+    ttft, latency, errors = [], [], []
+    lock = threading.Lock()
+
+    def session(n):
+        for i in range(requests):
+            start = time.perf_counter()
+            first = None
+            try:
+                if streaming:
+                    for _ in client.stream(f"question {n}-{i}"):
+                        first = first or time.perf_counter()
+                else:
+                    client.generate(f"question {n}-{i}")
+                end = time.perf_counter()
+                with lock:
+                    latency.append(end - start)
+                    ttft.append((first or end) - start)
+            except Exception as error:
+                with lock:
+                    errors.append(error)
+
+    threads = [threading.Thread(target=session, args=(n,)) for n in range(sessions)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return ttft, latency, errors, time.perf_counter() - start
+
+
+def run(sessions, requests, concurrency, failure_rate):
+    server, url = start_fake_gemini(first_token_delay=0.15, token_delay=0.01, tokens=40, failure_rate=failure_rate)
+    try:
+        for streaming in (False, True):
+            client = GeminiClient(RestTransport(url), timeout=10, max_concurrency=concurrency, queue_timeout=60)
+            ttft, latency, errors, wall = _run_sessions(client, sessions, requests, streaming)
+            mode = "streaming" if streaming else "blocking"
+            report(f"Gemini client, {mode}: {sessions} sessions x {requests} requests, concurrency {concurrency}", {
+                "time to first token p50 (ms)": _percentile(ttft, 0.5),
+                "time to first token p95 (ms)": _percentile(ttft, 0.95),
+                "latency p50 (ms)": _percentile(latency, 0.5),
+                "latency p95 (ms)": _percentile(latency, 0.95),
+                "throughput (req/s)": len(latency) / wall,
+                "failed requests": len(errors),
+            })
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gemini client latency benchmark")
+    parser.add_argument("--sessions", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--failure-rate", type=float, default=0.05, help="fraction of fake 503 responses")
+    args = parser.parse_args()
+    run(args.sessions, args.requests, args.concurrency, args.failure_rate)
@@ -0,0 +1,68 @@
+# benchmarks/bench_ingest.py
+# Bulk ingest throughput: add_complaints_bulk (deferred index/trigger upkeep, and with it kept live)
+# vs one add_complaint call per row, plus NLP enrichment throughput for the importer's --workers.
+
+import argparse
+import random
+import time
+
+from backend import database
+from backend.config import general_categories
+from benchmarks.common import STATUSES, report, seed_complaints, temp_database
+
+
+def archive_records(n, seed=42):
+    # Synthetic legacy records as the importer reads them (dicts of strings and ints).
+    rng = random.Random(seed)
+    categories = list(general_categories.items())
+    now = int(time.time())
+    for i in range(n):
+        category, examples = rng.choice(categories)
+        topic = rng.choice(examples.split(",")).strip().lower()
+        yield {
+            "type": "General", "category": category, "description": f"Complaint {i} about {topic}, please look into it.",
+            "is_anonymous": "1" if rng.random() < 0.2 else "0", "email": f"student{rng.randrange(2000)}@college.edu",
+            "status": rng.choice(STATUSES), "created_ts": now - rng.randrange(5 * 365 * 86400),
+        }
+
+
+def _rate(fn, n):
+    start = time.perf_counter()
+    fn()
+    return n / (time.perf_counter() - start)
+
+
+def run(n, existing, loop_rows=2000, enrich_rows=5000, workers=4):
+    results = {}
+    with temp_database():
+        seed_complaints(existing)
+        records = list(archive_records(n))
+        results["bulk, deferred upkeep (rows/s)"] = _rate(lambda: database.add_complaints_bulk(records, enrich=False), n)
+        assert not database.check_dashboard_counters(), "counters drifted"
+    with temp_database():
+        seed_complaints(existing)
+        results["bulk, live upkeep (rows/s)"] = _rate(
+            lambda: database.add_complaints_bulk(records, enrich=False, defer_maintenance=False), n)
+    with temp_database():
+        seed_complaints(existing)
+        sample = records[:loop_rows]
+
+        def loop():
+            for r in sample:
+                database.add_complaint(r["type"], r["category"], None, r["description"], 0, None, r["email"])
+        results["add_complaint loop (rows/s)"] = _rate(loop, loop_rows)
+    for w in (1, workers):
+        with temp_database():
+            results[f"bulk + enrichment, {w} worker(s) (rows/s)"] = _rate(
+                lambda: database.add_complaints_bulk(records[:enrich_rows], 1000, enrich=True, workers=w), enrich_rows)
+    report(f"Import {n:,} complaints into a table of {existing:,}", results)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk ingest benchmark")
+    parser.add_argument("-n", type=int, default=500_000, help="records to import")
+    parser.add_argument("--existing", type=int, default=0, help="rows already in the table")
+    parser.add_argument("--workers", type=int, default=4, help="process pool size for the enrichment run")
+    args = parser.parse_args()
+    run(args.n, args.existing, workers=args.workers)
@@ -0,0 +1,86 @@
+# benchmarks/bench_keywords.py
+# Keyword matching: one KeywordMatcher scan vs the old per-keyword `in` / str.count loops,
+# on short and long complaint descriptions and on a large keyword vocabulary.
+
+import argparse
+import random
+import time
+
+from backend import nlp_utils
+from backend.keyword_matcher import KeywordMatcher
+from benchmarks.common import report
+
+_FILLER = ("the", "projector", "in", "room", "was", "broken", "again", "during", "morning", "lecture",
+           "and", "nobody", "came", "to", "fix", "it", "students", "reported", "hostel", "wifi", "lab", "help")
+
+
+def _description(rng, chars):
+    return " ".join(rng.choice(_FILLER) for _ in range(chars // 4))[:chars]
+
+
+def _old_keyword_steps(text):
+    # priority, category and fallback sentiment as they were computed before: one loop per keyword list
+    t = text.lower()
+    urgent = any(kw in t for kw in nlp_utils.URGENT_WORDS)
+    scores = {
+        cat: sum(t.count(word.strip().lower()) for word in keywords.split(","))
+        for cat, keywords in nlp_utils._CATEGORIES.items()
+    }
+    sentiment = sum(w in t for w in nlp_utils.POSITIVE_WORDS) - sum(w in t for w in nlp_utils.NEGATIVE_WORDS)
+    return urgent, scores, sentiment
+
+
+def _new_keyword_steps(text):
+    hits = nlp_utils._keyword_hits(text)
+    found = {hit.keyword for hit in hits}
+    sentiment = sum(w in found for w in nlp_utils.POSITIVE_WORDS) - sum(w in found for w in nlp_utils.NEGATIVE_WORDS)
+    return (nlp_utils._priority_from_hits(hits),
+            nlp_utils._category_from_hits(hits, nlp_utils._CATEGORIES, nlp_utils._CATEGORY_KEYWORDS), sentiment)
+
+
+def _per_call_us(fn, items, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, time.perf_counter() - start)
+    return best / len(items) * 1e6
+
+
+def run(texts, vocabulary):
+    rng = random.Random(7)
+    for chars in (300, 1000, 5000):
+        docs = [_description(rng, chars) for _ in range(texts)]
+        for doc in docs:
+            assert nlp_utils.detect_priority(doc) == ("Urgent" if _old_keyword_steps(doc)[0] else "Standard")
+        report(f"Enrichment keyword steps, {texts} descriptions of {chars:,} chars", {
+            "per-keyword loops (us/text)": _per_call_us(_old_keyword_steps, docs),
+            "one matcher scan (us/text)": _per_call_us(_new_keyword_steps, docs),
+        })
+
+    words = list(dict.fromkeys(
+        "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(4, 10)))
+        for _ in range(vocabulary)
+    ))
+    start = time.perf_counter()
+    matcher = KeywordMatcher(words)
+    build_ms = (time.perf_counter() - start) * 1000
+    for chars in (300, 1000, 5000):
+        docs = [_description(rng, chars) + " " + " ".join(rng.sample(words, 5)) for _ in range(max(10, texts // 10))]
+        for doc in docs[:5]:
+            expected = {w: n for w in words if (n := doc.count(w))}
+            assert dict(matcher.counts(doc)) == expected, "matcher counts differ from str.count"
+        report(f"{len(words):,}-keyword vocabulary, {len(docs)} texts of ~{chars:,} chars", {
+            "matcher build (ms)": build_ms,
+            "str.count per keyword (us/text)": _per_call_us(lambda d: [d.count(w) for w in words], docs, 1),
+            "matcher counts (us/text)": _per_call_us(matcher.counts, docs),
+        })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keyword matching benchmark")
+    parser.add_argument("-n", type=int, default=1000, help="texts per length")
+    parser.add_argument("--vocabulary", type=int, default=5000, help="keywords in the large vocabulary")
+    args = parser.parse_args()
+    run(args.n, args.vocabulary)
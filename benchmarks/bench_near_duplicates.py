@@ -0,0 +1,152 @@
+# benchmarks/bench_near_duplicates.py
+# Near-duplicate detection (backend/near_duplicates.py): candidate-pair recall vs lookup time for
+# several LSH band layouts, against comparing every signature, at up to a million complaints.
+# The corpus is the synthetic description pool with each complaint a lightly edited copy of one pool
+# description (dropped or added words, typos). For a sample of complaints, the true near duplicates are
+# the copies of the same description whose exact 4-gram Jaccard similarity reaches the threshold.
+# Recall counts the true pairs the LSH lookup returns as candidates ("candidates") and the pairs
+# left after the signature check ("verified").
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from backend import near_duplicates as nd
+from benchmarks.common import report
+from benchmarks.synthetic import description_pool, parse_size, size_label
+
+_FILLERS = ("please", "again", "urgent", "still", "today", "sir", "kindly", "now")
+
+
+def _edit(rng, text):
+    # A lightly edited copy of a description: 0 to 3 of drop a word, add a word, swap two letters.
+    words = text.split()
+    for _ in range(rng.choice((0, 0, 1, 1, 2, 3))):
+        op = rng.randrange(3)
+        if op == 0 and len(words) > 4:
+            del words[rng.randrange(len(words))]
+        elif op == 1:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(_FILLERS))
+        else:
+            i = rng.randrange(len(words))
+            w = words[i]
+            if len(w) > 3:
+                j = rng.randrange(len(w) - 1)
+                words[i] = w[:j] + w[j + 1] + w[j] + w[j + 2:]
+    return " ".join(words)
+
+
+def corpus(n, seed=7):
+    # (texts, index of the pool description each text was edited from); about 50 copies per description.
+    rng = random.Random(seed)
+    pool = [description for _, _, description in description_pool(max(2000, n // 50), seed)]
+    groups = [rng.randrange(len(pool)) for _ in range(n)]
+    return [_edit(rng, pool[g]) for g in groups], np.array(groups)
+
+
+def _shingles(text):
+    data = nd.normalize(text).encode("utf-8").ljust(4)
+    return {data[i:i + 4] for i in range(len(data) - 3)}
+
+
+def true_duplicates(texts, groups, queries):
+    # For each query, the other texts of its group with exact Jaccard similarity >= the threshold.
+    members = {}
+    for i, g in enumerate(groups.tolist()):
+        members.setdefault(g, []).append(i)
+    cache = {}
+
+    def shingles(i):
+        if texts[i] not in cache:
+            cache[texts[i]] = _shingles(texts[i])
+        return cache[texts[i]]
+
+    truth = []
+    for q in queries:
+        a = shingles(q)
+        truth.append({i for i in members[groups[q]] if i != q
+                      and len(a & shingles(i)) / len(a | shingles(i)) >= nd.SIMILARITY_THRESHOLD})
+    return truth
+
+
+class BandIndex:
+    # In-memory LSH index: per band, the keys sorted, so a lookup is a binary search per band.
+
+    def __init__(self, sigs, bands):
+        keys = nd.band_keys(sigs, bands)
+        self.orders, self.columns = [], []
+        for band in range(bands):
+            order = np.argsort(keys[:, band]).astype(np.int32)
+            self.orders.append(order)
+            self.columns.append(keys[order, band])
+        self.bands = bands
+
+    def candidates(self, sig):
+        found = []
+        for key, column, order in zip(nd.band_keys(sig[None], self.bands)[0], self.columns, self.orders):
+            lo, hi = np.searchsorted(column, key, "left"), np.searchsorted(column, key, "right")
+            found.append(order[lo:hi])
+        return np.unique(np.concatenate(found))
+
+
+def _recall(found, truth):
+    # Share of the true pairs among the found ids (an array per query).
+    total = sum(len(t) for t in truth)
+    hits = sum(int(np.isin(f, list(t)).sum()) for f, t in zip(found, truth) if t)
+    return hits / total if total else 1.0
+
+
+def run(n, queries=300, band_layouts=(32, 16, 8), brute_queries=20, seed=7):
+    start = time.perf_counter()
+    texts, groups = corpus(n, seed)
+    sigs = nd.signatures(texts)
+    sig_s = time.perf_counter() - start
+    sample = random.Random(seed).sample(range(n), min(queries, n))
+    truth = true_duplicates(texts, groups, sample)
+    results = {
+        "corpus + signatures (s)": sig_s,
+        "true near duplicates per query": sum(len(t) for t in truth) / len(truth),
+    }
+
+    for bands in band_layouts:
+        start = time.perf_counter()
+        index = BandIndex(sigs, bands)
+        build_s = time.perf_counter() - start
+        found, verified, sizes = [], [], []
+        start = time.perf_counter()
+        for q in sample:
+            candidates = index.candidates(sigs[q])
+            similar = nd.similarity(sigs[q], sigs[candidates]) >= nd.SIMILARITY_THRESHOLD
+            found.append(candidates)
+            verified.append(candidates[similar])
+            sizes.append(len(candidates))
+        lookup_ms = (time.perf_counter() - start) / len(sample) * 1000
+        label = f"{bands}x{nd.NUM_PERM // bands}"
+        results[f"{label}: index build (s)"] = build_s
+        results[f"{label}: lookup + check (ms)"] = lookup_ms
+        results[f"{label}: candidates per lookup"] = sum(sizes) / len(sizes)
+        results[f"{label}: recall, candidates"] = _recall(found, truth)
+        results[f"{label}: recall, verified"] = _recall(verified, truth)
+        del index
+
+    # Every signature compared with the query
+    sample_brute = sample[:brute_queries]
+    start = time.perf_counter()
+    verified = [np.flatnonzero(nd.similarity(sigs[q], sigs) >= nd.SIMILARITY_THRESHOLD) for q in sample_brute]
+    results["all signatures: lookup (ms)"] = (time.perf_counter() - start) / len(sample_brute) * 1000
+    results["all signatures: recall"] = _recall(verified, truth[:brute_queries])
+    report(f"Near-duplicate lookup, {size_label(n)} complaints, {len(sample)} queries "
+           f"(stored layout: {nd.BANDS}x{nd.ROWS})", results)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Near-duplicate detection: recall vs time")
+    parser.add_argument("--sizes", default="100k,1m", help="comma-separated corpus sizes, e.g. 10k,100k,1m")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--bands", default="32,16,8", help="band layouts to compare (bands dividing 64)")
+    args = parser.parse_args()
+    for size in args.sizes.split(","):
+        run(parse_size(size), args.queries, tuple(int(b) for b in args.bands.split(",")))
@@ -0,0 +1,85 @@
+# benchmarks/bench_search.py
+# Full-text search latency (search_complaints) at a million complaints, for rare, medium and very
+# common terms, with filters and on a later page, vs a LIKE scan. Queries matching more than
+# database.SEARCH_RANK_LIMIT rows rank only their newest matches; "matches" shows which ones do.
+
+import argparse
+import random
+import time
+from datetime import datetime
+
+from backend import database
+from benchmarks.bench_category_model import _FILLER, _PHRASES
+from benchmarks.common import STATUSES, report, temp_database
+
+
+def seed_searchable(n, seed=5):
+    # n complaints worded like real ones, with lab/room numbers so some phrases are rare.
+    rng = random.Random(seed)
+    categories = list(_PHRASES)
+    now = int(time.time())
+
+    def rows():
+        for _ in range(n):
+            category = rng.choice(categories)
+            text = (f"{rng.choice(_PHRASES[category])} in {rng.choice(('lab', 'room', 'block'))} {rng.randrange(300)}, "
+                    f"{rng.choice(_FILLER)}")
+            ts = now - rng.randrange(365 * 86400)
+            yield ("General", category, text, 0, "student@college.edu", rng.choice(STATUSES),
+                   datetime.fromtimestamp(ts).strftime(database.TIMESTAMP_FORMAT), ts)
+
+    with database.transaction() as conn:
+        conn.executemany('''
+            INSERT INTO complaints (type, category, description, is_anonymous, email, status, created_at, created_ts)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows())
+
+
+def _median_ms(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2] * 1000
+
+
+def run(n, repeat):
+    with temp_database():
+        start = time.perf_counter()
+        seed_searchable(n)
+        insert_s = time.perf_counter() - start
+
+        def second_page(query):
+            _, cursor = database.search_complaints(query)
+            return lambda: database.search_complaints(query, cursor=cursor)
+
+        def like_scan():
+            with database.connection() as conn:
+                conn.execute("SELECT id FROM complaints WHERE description LIKE ? ORDER BY created_ts DESC LIMIT 21",
+                             ("%projector in lab 3,%",)).fetchall()
+
+        results = {"insert with FTS triggers (rows/s)": n / insert_s}
+        for label, query, filters in (
+            ("rare phrase 'projector in lab 3'", "projector in lab 3", None),
+            ("medium term 'stalking'", "stalking", None),
+            ("common term 'please help'", "please help", None),
+            ("common term + category/status filter", "please help", {"category": "Safety", "status": "Pending"}),
+        ):
+            results[f"{label} (ms)"] = _median_ms(lambda: database.search_complaints(query, filters), repeat)
+        with database.connection() as conn:
+            for query in ("stalking", "please help"):
+                match = database._fts_query(query)
+                results[f"'{query}' matches"] = conn.execute(
+                    "SELECT COUNT(*) FROM complaints_fts WHERE complaints_fts MATCH ?", (match,)).fetchone()[0]
+        results["common term, second page (ms)"] = _median_ms(second_page("please help"), repeat)
+        results["LIKE '%projector in lab 3,%' scan (ms)"] = _median_ms(like_scan, 3)
+        report(f"Full-text search over {n:,} complaints (median of {repeat})", results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Full-text search benchmark")
+    parser.add_argument("-n", type=int, default=1_000_000, help="number of complaints")
+    parser.add_argument("--repeat", type=int, default=15)
+    args = parser.parse_args()
+    run(args.n, args.repeat)
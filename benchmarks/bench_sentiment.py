@@ -0,0 +1,89 @@
+# benchmarks/bench_sentiment.py
+# get_sentiment_label per text vs the batched get_sentiment_labels, plus a golden-set equivalence check.
+
+import argparse
+import random
+import time
+
+from backend import nlp_utils
+from benchmarks.common import report
+
+# Golden set: the batch API must label these exactly like get_sentiment_label.
+GOLDEN_TEXTS = [
+    "", "   ", None,
+    "The wifi in the hostel is not working and I am frustrated.",
+    "Great library staff, very happy with the service!",
+    "The projector in lab 3 is broken.",
+    "Nothing has been resolved yet, this is a bad experience.",
+    "I hate that the mess food is so poor.",
+    "Excellent sports facilities, satisfied overall.",
+    "Please fix the AC in room 204.",
+    "The issue was resolved quickly, good job.",
+    "Timetable clash between two lectures on Monday.",
+    "I am upset and angry about the grading error, never again.",
+    "NOT HAPPY with the van schedule",
+    "notice board is outdated",
+    "The canteen isn't clean :( and the staff don't care.",
+    "Wi-Fi is well-known to drop every evening (!)",
+    "Lab 3 projector works now :) thanks",
+    "The f*cking bench is broken again!!!",
+    "Complaint 12 about books, please look into it.",
+]
+
+
+def _synthetic_texts(n, seed=7):
+    rng = random.Random(seed)
+    words = ("wifi hostel lab projector library books mess food van timetable faculty grading fee "
+             "broken slow dirty clean good great bad poor happy angry not never issue problem resolved "
+             "please fix urgent room block").split()
+    return [" ".join(rng.choice(words) for _ in range(rng.randint(8, 40))) for _ in range(n)]
+
+
+def check_golden():
+    texts = GOLDEN_TEXTS + _synthetic_texts(2000, seed=1)
+    expected = [nlp_utils.get_sentiment_label(t) for t in texts]
+    assert nlp_utils.get_sentiment_labels(texts) == expected, "batch labels differ from get_sentiment_label"
+    # Same check for the keyword fallback used when TextBlob is not installed
+    textblob = nlp_utils._get_textblob()
+    nlp_utils._textblob = None
+    try:
+        expected = [nlp_utils.get_sentiment_label(t) for t in texts]
+        assert nlp_utils.get_sentiment_labels(texts) == expected, "fallback batch labels differ"
+    finally:
+        nlp_utils._textblob = textblob
+
+
+def run(n, workers):
+    check_golden()
+    texts = _synthetic_texts(n)
+    results = {}
+
+    start = time.perf_counter()
+    [nlp_utils.get_sentiment_label(t) for t in texts]
+    results["get_sentiment_label loop (texts/s)"] = n / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    nlp_utils.get_sentiment_labels(texts)
+    results["get_sentiment_labels (texts/s)"] = n / (time.perf_counter() - start)
+
+    if workers > 1:
+        start = time.perf_counter()
+        nlp_utils.get_sentiment_labels(texts, workers=workers)
+        results[f"get_sentiment_labels x{workers} processes (texts/s)"] = n / (time.perf_counter() - start)
+
+    # Dashboard-shaped batch: many complaints repeat the same wording
+    repeated = [texts[i % (n // 10 or 1)] for i in range(n)]
+    start = time.perf_counter()
+    nlp_utils.get_sentiment_labels(repeated)
+    results["get_sentiment_labels, 10% unique (texts/s)"] = n / (time.perf_counter() - start)
+
+    report(f"Sentiment throughput ({n:,} texts, TextBlob={'on' if nlp_utils._get_textblob() else 'off'})", results)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sentiment scoring benchmark")
+    parser.add_argument("-n", type=int, default=50_000, help="texts to score")
+    parser.add_argument("--workers", type=int, default=4, help="process pool size for the parallel run")
+    args = parser.parse_args()
+    run(args.n, args.workers)
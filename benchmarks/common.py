@@ -0,0 +1,90 @@
+# benchmarks/common.py
+# Shared helpers for the benchmark scripts.
+
+import os
+import random
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from backend import database
+from backend.config import general_categories, critical_categories
+
+STATUSES = ("Pending", "In Progress", "Resolved")
+
+
+@contextmanager
+def temp_database():
+    # Point backend.database at a fresh database file for the duration of a benchmark.
+    tmp_dir = tempfile.mkdtemp(prefix="campus_buddy_bench_")
+    old_path = database.DB_PATH
+    database.close_connections()
+    database.DB_PATH = os.path.join(tmp_dir, "complaints.db")
+    try:
+        database.init_db()
+        yield database.DB_PATH
+    finally:
+        database.close_connections()
+        database.DB_PATH = old_path
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def seed_complaints(n, days=365, seed=42):
+    # Insert n synthetic complaints spread over the last `days` days in one transaction.
+    rng = random.Random(seed)
+    categories = [("General", c, examples) for c, examples in general_categories.items()]
+    categories += [("Critical", c, examples) for c, examples in critical_categories.items()]
+    now = int(time.time())
+
+    def rows():
+        for i in range(n):
+            ctype, category, examples = rng.choice(categories)
+            topic = rng.choice(examples.split(",")).strip().lower()
+            ts = now - rng.randrange(days * 86400)
+            yield (
+                ctype, category, None, f"Complaint {i} about {topic}, please look into it.",
+                rng.random() < 0.2, None, f"student{rng.randrange(2000)}@college.edu",
+                rng.choice(STATUSES), None,
+                datetime.fromtimestamp(ts).strftime(database.TIMESTAMP_FORMAT), ts,
+            )
+
+    with database.transaction() as conn:
+        conn.executemany('''
+            INSERT INTO complaints
+            (type, category, subcategory, description, is_anonymous, file_path, email, status, assigned_to, created_at, created_ts)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows())
+
+
+def timings(fn, repeat=5):
+    # Wall time of each of `repeat` calls of fn(), in milliseconds.
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def timed(fn, repeat=5):
+    # Best-of-`repeat` wall time of fn() in milliseconds.
+    return min(timings(fn, repeat))
+
+
+def ops_per_sec(fn, n):
+    # Call fn(i) n times and return the achieved rate.
+    start = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    elapsed = time.perf_counter() - start
+    return n / elapsed if elapsed else float("inf")
+
+
+def report(title, results):
+    # Print "name: value" lines under a heading.
+    print(f"\n{title}")
+    width = max(len(name) for name in results)
+    for name, value in results.items():
+        print(f"  {name.ljust(width)}  {value:>14,.2f}")
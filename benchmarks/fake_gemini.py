@@ -0,0 +1,85 @@
+# benchmarks/fake_gemini.py
+# Local stand-in for the Gemini REST API (generateContent and streamGenerateContent?alt=sse)
+# with configurable latency and failure rate. Run standalone with
+#   python -m benchmarks.fake_gemini --port 8765
+# and point the app at it with GEMINI_API_BASE=http://127.0.0.1:8765
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeGeminiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Overridden per server in start_fake_gemini()
+    first_token_delay = 0.2
+    token_delay = 0.02
+    tokens = 40
+    failure_rate = 0.0
+
+    def log_message(self, *args):
+        pass
+
+    @staticmethod
+    def _payload(text):
+        return {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        prompt = json.loads(self.rfile.read(length))["contents"][0]["parts"][0]["text"]
+        if random.random() < self.failure_rate:
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        words = [f"word{i}" for i in range(self.tokens)]
+        time.sleep(self.first_token_delay)
+        if ":streamGenerateContent" in self.path:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for i, word in enumerate(words):
+                if i:
+                    time.sleep(self.token_delay)
+                self.wfile.write(f"data: {json.dumps(self._payload(word + ' '))}\r\n\r\n".encode())
+                self.wfile.flush()
+            self.close_connection = True
+        else:
+            time.sleep(self.token_delay * (len(words) - 1))
+            body = json.dumps(self._payload(" ".join(words) + f" ({len(prompt)} chars)")).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+
+def start_fake_gemini(port=0, first_token_delay=0.2, token_delay=0.02, tokens=40, failure_rate=0.0):
+    # Start the server in a daemon thread; returns (server, base_url). Call server.shutdown() to stop.
+    handler = type("Handler", (FakeGeminiHandler,), {
+        "first_token_delay": first_token_delay, "token_delay": token_delay,
+        "tokens": tokens, "failure_rate": failure_rate,
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Gemini REST server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--first-token-delay", type=float, default=0.2)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    server, url = start_fake_gemini(args.port, args.first_token_delay, args.token_delay, failure_rate=args.failure_rate)
+    print(f"Fake Gemini listening on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,79 @@
+# benchmarks/startup_report.py
+# Cold-start import cost of each portal, broken down per module (python -X importtime),
+# plus how long the lazily loaded NLP models take to warm up.
+
+import argparse
+import ast
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+PORTALS = {
+    "student portal (frontend/app.py)": os.path.join(ROOT, "frontend", "app.py"),
+    "admin portal (frontend/admin_app.py)": os.path.join(ROOT, "frontend", "admin_app.py"),
+}
+# Dependencies that should only be imported after login, on first use
+HEAVY = ("pandas", "plotly", "numpy", "textblob", "spacy", "google.generativeai")
+
+
+def top_level_imports(path):
+    # Module names imported at the top level of a script (what runs before the login page renders).
+    tree = ast.parse(open(path, encoding="utf-8").read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def import_times(modules):
+    # Run a fresh interpreter and return [(module, self_us, cumulative_us, depth)] from -X importtime.
+    code = "".join(f"import {m}\n" for m in modules)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, env={**os.environ, "PYTHONPATH": ROOT},
+    )
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def model_warm_up_ms():
+    # Wall time of nlp_utils.warm_up() in a fresh interpreter.
+    code = (
+        "import time; from backend import nlp_utils; t = time.perf_counter(); "
+        "nlp_utils.warm_up(background=False); print((time.perf_counter() - t) * 1000)"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    return float(proc.stdout.strip() or "nan")
+
+
+def run(top):
+    for portal, path in PORTALS.items():
+        modules = top_level_imports(path)
+        start = time.perf_counter()
+        entries = import_times(modules)
+        wall = (time.perf_counter() - start) * 1000
+        total = sum(cum for _, _, cum, depth in entries if depth == 0)
+        print(f"\n{portal}: {total / 1000:,.1f} ms of imports before the login page ({wall:,.0f} ms incl. interpreter)")
+        for name, _, cum, depth in sorted((e for e in entries if e[3] == 0), key=lambda e: -e[2])[:top]:
+            print(f"  {cum / 1000:>9,.1f} ms  {name}")
+        loaded = {name: cum for name, _, cum, _ in entries}
+        eager = [f"{h} ({loaded[h] / 1000:,.1f} ms)" for h in HEAVY if h in loaded]
+        print(f"  heavy dependencies imported before login: {', '.join(eager) if eager else 'none'}")
+    print(f"\nNLP model warm-up (nlp_utils.warm_up): {model_warm_up_ms():,.0f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Startup import-time report")
+    parser.add_argument("--top", type=int, default=15, help="modules to list per portal")
+    run(parser.parse_args().top)
@@ -0,0 +1,251 @@
+# benchmarks/suite.py
+# Benchmark suite: database queries at several table sizes (filled by benchmarks.synthetic), the NLP
+# functions, the rule-based chatbot and the dashboard chart helpers, written to a JSON file that a later
+# run can be compared against.
+# Usage: python -m benchmarks.suite [--sizes 10k,100k,1m] [--groups database,charts,nlp,chatbot]
+#                                   [--out results.json] [--compare baseline.json]
+#        python -m benchmarks.suite --compare baseline.json results.json   (compare two saved runs)
+# With --compare the exit status is 1 when any benchmark got slower than the threshold allows.
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+from datetime import date, datetime, timedelta
+
+from backend import database, nlp_utils
+from benchmarks.common import temp_database, timings
+from benchmarks.synthetic import description_pool, fill_database, parse_size, size_label
+
+GROUPS = ("database", "charts", "nlp", "chatbot")
+DEFAULT_SIZES = "10k,100k,1m"
+DEFAULT_THRESHOLD = 0.20  # slower by more than 20% (median) is a regression...
+MIN_DELTA_MS = 0.05       # ...unless it is only a few microseconds
+NLP_TEXTS = 1000
+
+
+def database_cases(n):
+    # (name, fn, repeat multiplier) for the database.py queries against a table of n complaints.
+    rng = random.Random(n)
+    _, cursor = database.get_complaints_page(page_size=20 * database.DEFAULT_PAGE_SIZE)
+    today = date.today()
+    ids = [rng.randrange(1, n + 1) for _ in range(1000)]
+    statuses = iter(rng.choice(("Pending", "In Progress", "Resolved")) for _ in range(10**6))
+
+    def scan():
+        for _ in database.iter_complaint_chunks(["id", "status", "category", "created_ts"]):
+            pass
+
+    return [
+        ("get_complaints_page[first]", lambda: database.get_complaints_page(), 10),
+        ("get_complaints_page[page 21]", lambda: database.get_complaints_page(cursor=cursor), 10),
+        ("get_complaints_page[student]", lambda: database.get_complaints_page(email="student42@college.edu"), 10),
+        ("get_complaints_filtered[category+status+30d]", lambda: database.get_complaints_filtered(
+            "Library", "Pending", today - timedelta(days=30), today), 10),
+        ("count_complaints_by_status[category]", lambda: database.count_complaints_by_status("Library"), 1),
+        ("get_filter_options", database.get_filter_options, 1),
+        ("get_dashboard_stats", database.get_dashboard_stats, 10),
+        ("get_complaint_trends[day, 7 days]", lambda: database.get_complaint_trends(
+            "day", today - timedelta(days=6), today), 10),
+        ("get_complaint_trends[day, 1 year]", lambda: database.get_complaint_trends(
+            "day", today - timedelta(days=364), today), 2),
+        ("get_complaint_trends[month, 1 year]", lambda: database.get_complaint_trends(
+            "month", today - timedelta(days=364), today), 2),
+        ("search_complaints[common]", lambda: database.search_complaints("broken"), 2),
+        ("search_complaints[rare]", lambda: database.search_complaints("counseling stalking"), 10),
+        ("iter_complaint_chunks[4 columns]", scan, 1),
+        ("add_complaint", lambda: database.add_complaint(
+            "General", "Library", None, "The study room lights are broken again.", False, None,
+            "bench@college.edu"), 4),
+        ("update_complaint_status", lambda: database.update_complaint_status(rng.choice(ids), next(statuses)), 4),
+    ]
+
+
+def chart_cases():
+    # The dashboard charts from get_dashboard_stats() counts (figure built and serialised; nothing is shown).
+    from streamlit import config
+    from streamlit.logger import set_log_level
+    from frontend.helpers import charts
+
+    # Outside `streamlit run` every st.* call warns about the missing script context. Parsing the
+    # config resets the log level, so parse it first.
+    config.get_config_options()
+    set_log_level("error")
+    stats = database.get_dashboard_stats()
+    rows, _ = database.get_complaints_page(page_size=500)
+    today = date.today()
+    week = database.get_complaint_trends("day", today - timedelta(days=6), today)
+    year = database.get_complaint_trends("day", today - timedelta(days=364), today)
+    return [
+        ("show_status_pie_chart", lambda: charts.show_status_pie_chart(stats["status"]), 1),
+        ("show_category_pie_chart", lambda: charts.show_category_pie_chart(stats["category"]), 1),
+        ("show_sentiment_bar_chart", lambda: charts.show_sentiment_bar_chart(stats["sentiment"]), 1),
+        ("show_volume_trend_chart[day, 7 days]", lambda: charts.show_volume_trend_chart(week), 1),
+        ("show_volume_trend_chart[day, 1 year]", lambda: charts.show_volume_trend_chart(year), 1),
+        ("show_resolution_trend_chart[day, 1 year]", lambda: charts.show_resolution_trend_chart(year), 1),
+        ("complaints_df_from_rows[500]", lambda: charts.complaints_df_from_rows(rows), 2),
+    ]
+
+
+def nlp_cases():
+    # nlp_utils over NLP_TEXTS distinct synthetic descriptions; per-text functions are called in a loop.
+    texts = [description for _, _, description in description_pool(NLP_TEXTS, seed=7)]
+    nlp_utils.warm_up(background=False)
+    return [
+        (f"get_sentiment_labels[{NLP_TEXTS}]", lambda: nlp_utils.get_sentiment_labels(texts), 1),
+        ("get_sentiment_label[x100]", lambda: [nlp_utils.get_sentiment_label(t) for t in texts[:100]], 1),
+        (f"detect_priority[x{NLP_TEXTS}]", lambda: [nlp_utils.detect_priority(t) for t in texts], 1),
+        (f"extract_keywords[x{NLP_TEXTS}]", lambda: [nlp_utils.extract_keywords(t) for t in texts], 1),
+        (f"suggest_categories[{NLP_TEXTS}]", lambda: nlp_utils.suggest_categories(texts), 1),
+        (f"enrich_complaints[{NLP_TEXTS}]", lambda: nlp_utils.enrich_complaints(texts), 1),
+    ]
+
+
+def chatbot_cases():
+    # get_rule_based_response for FAQ questions as students type them, greetings, and misses.
+    from backend import chatbot
+
+    questions = [q for q, _, _ in chatbot._all_faqs()]
+    typed = [q.lower().rstrip("?").replace("how do i", "how to") for q in questions]
+    misses = ["can you explain quantum entanglement for my physics project", "what should i cook tonight",
+              "my roommate keeps borrowing my charger without asking", "suggest a good laptop under budget"]
+    greetings = ["hi", "hello there", "good morning buddy"]
+    queries = (typed + misses * 5 + greetings * 5)[:200]
+    chatbot.get_faq_index()
+    return [
+        ("get_rule_based_response[faq]", lambda: [chatbot.get_rule_based_response(q) for q in typed], 1),
+        (f"get_rule_based_response[mixed x{len(queries)}]",
+         lambda: [chatbot.get_rule_based_response(q) for q in queries], 1),
+    ]
+
+
+def _measure(group, cases, repeat, rows=None):
+    results = {}
+    for case, fn, multiplier in cases:
+        fn()  # warm-up: imports, caches, prepared statements
+        samples = timings(fn, repeat * multiplier)
+        name = f"{group}.{case}" + (f"@{size_label(rows)}" if rows is not None else "")
+        results[name] = {
+            "group": group, "rows": rows, "median_ms": statistics.median(samples), "best_ms": min(samples),
+            "repeat": len(samples),
+        }
+        print(f"  {name:<60} {results[name]['median_ms']:>12,.3f} ms", flush=True)
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run(sizes, groups=GROUPS, repeat=5, seed=42):
+    # Run the selected groups; database and chart benchmarks once per table size. Returns the JSON document.
+    results = {}
+    for n in sizes if {"database", "charts"} & set(groups) else ():
+        with temp_database():
+            print(f"\nFilling a database with {n:,} synthetic complaints...", flush=True)
+            fill_database(n, seed)
+            if "database" in groups:
+                results.update(_measure("database", database_cases(n), repeat, n))
+            if "charts" in groups:
+                results.update(_measure("charts", chart_cases(), repeat, n))
+    if "nlp" in groups:
+        print("\nNLP", flush=True)
+        results.update(_measure("nlp", nlp_cases(), repeat))
+    if "chatbot" in groups:
+        print("\nChatbot", flush=True)
+        results.update(_measure("chatbot", chatbot_cases(), repeat))
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"), "commit": _git_commit(),
+            "python": platform.python_version(), "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(), "cpus": os.cpu_count(), "sizes": list(sizes), "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD, min_delta_ms=MIN_DELTA_MS):
+    # Compare median times of the benchmarks both runs have.
+    # Returns [(name, baseline_ms, current_ms, ratio, verdict)], verdict "regression", "faster" or "ok".
+    rows = []
+    old, new = baseline["results"], current["results"]
+    for name in sorted(old.keys() & new.keys()):
+        before, after = old[name]["median_ms"], new[name]["median_ms"]
+        ratio = after / before if before else float("inf")
+        if ratio > 1 + threshold and after - before > min_delta_ms:
+            verdict = "regression"
+        elif ratio < 1 / (1 + threshold) and before - after > min_delta_ms:
+            verdict = "faster"
+        else:
+            verdict = "ok"
+        rows.append((name, before, after, ratio, verdict))
+    return rows
+
+
+def print_comparison(baseline, current, rows):
+    print(f"\nBaseline {baseline['meta'].get('commit') or '?'} ({baseline['meta'].get('created')}) vs "
+          f"{current['meta'].get('commit') or '?'} ({current['meta'].get('created')})")
+    for name, before, after, ratio, verdict in rows:
+        flag = {"regression": "  << REGRESSION", "faster": "  faster"}.get(verdict, "")
+        print(f"  {name:<60} {before:>12,.3f} -> {after:>12,.3f} ms  x{ratio:5.2f}{flag}")
+    only_old = sorted(baseline["results"].keys() - current["results"].keys())
+    only_new = sorted(current["results"].keys() - baseline["results"].keys())
+    if only_old:
+        print(f"  not in this run: {', '.join(only_old)}")
+    if only_new:
+        print(f"  new in this run: {', '.join(only_new)}")
+    regressions = sum(verdict == "regression" for *_, verdict in rows)
+    print(f"{regressions} regression(s) out of {len(rows)} benchmarks compared.")
+    return regressions
+
+
+def _load(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Campus Buddy benchmark suite")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"table sizes (default: {DEFAULT_SIZES})")
+    parser.add_argument("--groups", default=",".join(GROUPS), help=f"subset of {','.join(GROUPS)}")
+    parser.add_argument("--repeat", type=int, default=5, help="timed calls per benchmark (quick queries: x10)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="write results to this JSON file")
+    parser.add_argument("--compare", nargs="+", metavar="JSON",
+                        help="baseline results to compare this run with; or two files to compare without running")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative slowdown counted as a regression (default: 0.20)")
+    args = parser.parse_args(argv)
+
+    if args.compare and len(args.compare) > 2:
+        parser.error("--compare takes one or two files")
+    if args.compare and len(args.compare) == 2:
+        baseline, current = _load(args.compare[0]), _load(args.compare[1])
+    else:
+        groups = [g.strip() for g in args.groups.split(",") if g.strip()]
+        unknown = set(groups) - set(GROUPS)
+        if unknown:
+            parser.error(f"unknown group(s): {', '.join(sorted(unknown))}")
+        baseline = _load(args.compare[0]) if args.compare else None
+        current = run([parse_size(s) for s in args.sizes.split(",")], groups, args.repeat, args.seed)
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as f:
+                json.dump(current, f, indent=2)
+            print(f"\nResults written to {args.out}.")
+    if args.compare:
+        regressions = print_comparison(baseline, current, compare(baseline, current, args.threshold))
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# benchmarks/synthetic.py
+# Seeded synthetic complaints for benchmarks and load testing: categories and topics from
+# backend/config.py, a pool of distinct descriptions reused the way real complaints repeat,
+# NLP enrichment computed once per distinct description, and bulk loading through add_complaints_bulk.
+# Usage: python -m benchmarks.synthetic 100k [--db complaints.db] [--seed 42] [--no-enrich]
+
+import argparse
+import random
+import time
+
+from backend import database
+from backend.config import general_categories, critical_categories
+from benchmarks.common import STATUSES
+
+DEFAULT_POOL_SIZE = 2000
+STAFF = ("Maintenance Dept", "IT Support", "Hostel Office", "Library Desk", "Accounts Office",
+         "Dean of Students", "Counselling Cell", "Security Office", "Sports Committee")
+
+_OPENERS = ("", "", "", "Urgent: ", "Please help, ", "Reporting again: ", "Not sure who to ask, but ")
+_PROBLEMS = (
+    "the {} has not been fixed for two weeks", "the {} is broken again", "there is a problem with the {}",
+    "nobody has responded about the {}", "the {} stopped working yesterday", "the {} is always late",
+    "the {} situation in our block is getting worse", "the {} issue from last month is still open",
+)
+_CLOSERS = (
+    "", "", "This is really frustrating.", "It is unsafe and needs immediate attention.",
+    "Thanks for the quick help last time.", "Several students are affected.", "Kindly look into it.",
+    "It is affecting our exam preparation.",
+)
+# Share of complaints per complaint type; critical complaints are rarer
+_CRITICAL_SHARE = 0.15
+
+
+def parse_size(text):
+    # "10k", "100K", "1m" or a plain number of rows.
+    text = text.strip().lower().replace("_", "").replace(",", "")
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+def size_label(n):
+    # Inverse of parse_size for round sizes: 10000 -> "10k", 1000000 -> "1m".
+    for suffix, scale in (("m", 1_000_000), ("k", 1_000)):
+        if n >= scale and n % scale == 0:
+            return f"{n // scale}{suffix}"
+    return str(n)
+
+
+def _topics(categories):
+    return [(category, [t.strip().lower() for t in examples.split(",") if t.strip()])
+            for category, examples in categories.items()]
+
+
+def description_pool(size=DEFAULT_POOL_SIZE, seed=42):
+    # `size` distinct (type, category, description) triples; descriptions mention a topic of their category.
+    rng = random.Random(seed)
+    general, critical = _topics(general_categories), _topics(critical_categories)
+    pool, seen = [], set()
+    attempts = 0
+    while len(pool) < size and attempts < size * 20:
+        attempts += 1
+        ctype, topics = ("Critical", critical) if rng.random() < _CRITICAL_SHARE else ("General", general)
+        category, examples = rng.choice(topics)
+        text = rng.choice(_OPENERS) + rng.choice(_PROBLEMS).format(rng.choice(examples))
+        closer = rng.choice(_CLOSERS)
+        text = (text[0].upper() + text[1:] + "." + (" " + closer if closer else "")).strip()
+        if text not in seen:
+            seen.add(text)
+            pool.append((ctype, category, text))
+    return pool
+
+
+def synthetic_records(n, seed=42, days=365, pool=None):
+    # n complaint records (dicts for add_complaints_bulk) spread over the last `days` days.
+    # Status follows age: old complaints are mostly resolved, recent ones mostly pending.
+    rng = random.Random(seed)
+    pool = pool or description_pool(seed=seed)
+    now = int(time.time())
+    for _ in range(n):
+        ctype, category, description = rng.choice(pool)
+        age = rng.randrange(days * 86400)
+        resolved_share = min(age / (days * 86400) * 1.5, 0.9)
+        roll = rng.random()
+        status = STATUSES[2] if roll < resolved_share else STATUSES[1] if roll < resolved_share + 0.1 else STATUSES[0]
+        # Resolution takes from an hour to a few weeks, critical complaints less
+        hours = rng.lognormvariate(3.0 if ctype == "General" else 2.0, 1.0)
+        resolved_ts = min(now - age + int(hours * 3600), now) if status == STATUSES[2] else None
+        yield {
+            "type": ctype, "category": category, "description": description,
+            "is_anonymous": int(rng.random() < (0.5 if ctype == "Critical" else 0.15)),
+            "email": f"student{rng.randrange(5000)}@college.edu", "status": status,
+            "assigned_to": rng.choice(STAFF) if status != STATUSES[0] else None,
+            "created_ts": now - age, "resolved_ts": resolved_ts,
+        }
+
+
+def _apply_enrichment(pool):
+    # Store the enrichment of every pool description on the rows that use it (one set-based update).
+    descriptions = [description for _, _, description in pool]
+    values = database._enrichment_values(descriptions)
+    with database.transaction() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DROP TABLE IF EXISTS temp.synthetic_enrichment")
+        conn.execute('''
+            CREATE TEMP TABLE synthetic_enrichment
+            (description TEXT PRIMARY KEY, sentiment, priority, keywords, suggested_category, nlp_version)
+        ''')
+        conn.executemany("INSERT INTO synthetic_enrichment VALUES (?, ?, ?, ?, ?, ?)",
+                         [(d, *v) for d, v in zip(descriptions, values)])
+        conn.execute('''
+            UPDATE complaints
+            SET sentiment = e.sentiment, priority = e.priority, keywords = e.keywords,
+                suggested_category = e.suggested_category, nlp_version = e.nlp_version
+            FROM synthetic_enrichment AS e
+            WHERE complaints.description = e.description AND complaints.nlp_version IS NULL
+        ''')
+        conn.execute("DROP TABLE synthetic_enrichment")
+
+
+def fill_database(n, seed=42, enrich=True, pool_size=DEFAULT_POOL_SIZE, progress=None):
+    # Add n synthetic complaints to the current database (database.DB_PATH). Returns rows inserted.
+    database.init_db()
+    pool = description_pool(pool_size, seed)
+    inserted, _ = database.add_complaints_bulk(synthetic_records(n, seed, pool=pool), enrich=False, progress=progress)
+    if enrich:
+        _apply_enrichment(pool)
+    return inserted
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fill a database with seeded synthetic complaints.")
+    parser.add_argument("rows", type=parse_size, help="number of complaints, e.g. 10k, 100k, 1m")
+    parser.add_argument("--db", help=f"database file (default: {database.DB_PATH})")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--pool-size", type=int, default=DEFAULT_POOL_SIZE, help="distinct descriptions")
+    parser.add_argument("--no-enrich", action="store_true", help="leave the NLP columns empty")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        database.DB_PATH = args.db
+    start = time.perf_counter()
+
+    def progress(done, _):
+        if done % 100_000 < database.BULK_BATCH_SIZE:
+            print(f"  inserted {done:,} complaints", flush=True)
+
+    inserted = fill_database(args.rows, args.seed, not args.no_enrich, args.pool_size, progress)
+    print(f"Done: {inserted:,} complaints added to {database.DB_PATH} in {time.perf_counter() - start:.1f}s.")
+
+
+if __name__ == "__main__":
+    main()
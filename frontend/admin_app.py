@@ -2,20 +2,48 @@
 # Campus Buddy Admin Portal
 
 import streamlit as st
-import pandas as pd
-import sys, os, time
-from datetime import datetime, date  # for date filtering
+import html
+import sys, os, tempfile
+from datetime import date, datetime, timedelta
 
 # Fix Python path so backend imports work
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 # Imports
-from backend.database import get_all_complaints, update_complaint_status, assign_complaint, init_db
+from backend.database import (
+    get_dashboard_stats, get_complaints_page, get_complaints_filtered, count_complaints_by_status, get_filter_options,
+    update_complaint_status, assign_complaint, apply_complaint_changes, init_db, ensure_enriched, parse_keywords, Complaint,
+    search_complaints, search_is_capped, SEARCH_RANK_LIMIT, SearchResult, get_export_watermark, set_export_watermark,
+    COMPLAINT_COLUMNS, get_attachments, get_complaint_trends, get_job_counts, get_dead_jobs, retry_dead_jobs,
+    DEAD_JOB_COLUMNS, get_duplicate_clusters, get_cluster_complaints, apply_cluster_changes, DUPLICATE_WINDOW_DAYS,
+)
+from backend import metrics
+from backend.attachments import describe, open_attachment
+from backend.export import export_complaints, is_filtered
 from backend.auth import validate_admin_login
-from backend.nlp_utils import get_sentiment_label, extract_keywords, suggest_category
-from backend.config import general_categories, critical_categories
-from frontend.helpers.charts import show_status_pie_chart, show_category_pie_chart
+from backend.nlp_utils import warm_up
+from frontend.helpers.charts import (
+    show_status_pie_chart, show_category_pie_chart, show_volume_trend_chart, show_resolution_trend_chart,
+)
 from frontend.helpers.styles import load_custom_css, render_navbar
+from frontend.helpers.pagination import paginate, reset_pagination
+from frontend.helpers.cache import versioned
+
+# Reads are served from the rerun cache until the database changes
+get_dashboard_stats = versioned(get_dashboard_stats)
+get_complaints_page = versioned(get_complaints_page)
+get_complaints_filtered = versioned(get_complaints_filtered)
+count_complaints_by_status = versioned(count_complaints_by_status)
+get_filter_options = versioned(get_filter_options)
+search_complaints = versioned(search_complaints)
+search_is_capped = versioned(search_is_capped)
+get_export_watermark = versioned(get_export_watermark)
+get_attachments = versioned(get_attachments)
+get_complaint_trends = versioned(get_complaint_trends)
+get_job_counts = versioned(get_job_counts)
+get_dead_jobs = versioned(get_dead_jobs)
+get_duplicate_clusters = versioned(get_duplicate_clusters)
+get_cluster_complaints = versioned(get_cluster_complaints)
 
 # PAGE CONFIG AND STYLE
 st.set_page_config(page_title="Campus Buddy Admin", layout="wide", page_icon="🛠️")
@@ -36,6 +64,9 @@ if not st.session_state.admin_logged_in:
         if st.form_submit_button("Login"):
             if validate_admin_login(email, password):
                 st.session_state.admin_logged_in = True
+                # Opt-in: load the NLP models in the background once logged in (never during login)
+                if os.getenv("CAMPUS_BUDDY_WARM_UP") == "1":
+                    warm_up(background=True)
                 st.rerun()
             else:
                 st.error("Invalid credentials.")
@@ -43,29 +74,111 @@ if not st.session_state.admin_logged_in:
 
 # SIDEBAR NAVIGATION
 st.sidebar.title("Admin Panel")
-page = st.sidebar.radio("Navigate", ["Dashboard", "All Complaints", "Filters - Assign", "Export"])
+page = st.sidebar.radio(
+    "Navigate", ["Dashboard", "All Complaints", "Filters - Assign", "Duplicates", "Export", "Performance"]
+)
+# Every backend call made while rendering the page is recorded as a span of this trace
+page_trace = metrics.begin_trace(f"admin.{page}")
 if st.sidebar.button("Logout"):
     st.session_state.admin_logged_in = False
     st.rerun()
 
-# LOAD DATA
-rows = get_all_complaints()
-df = pd.DataFrame(rows, columns=[
-    "id", "type", "category", "subcategory", "description", "is_anonymous",
-    "file_path", "email", "status", "assigned_to", "created_at"
-])
+# Dashboard trend periods: days back from today (None: everything)
+TREND_PERIODS = {"Last 30 days": 30, "Last 3 months": 91, "Last 12 months": 365, "All time": None}
+
+# Snippet markers for matched words, swapped for <mark> tags after the snippet is HTML-escaped
+SEARCH_HIGHLIGHT = ("\x02", "\x03")
+
+def highlighted_snippet(snippet):
+    return html.escape(snippet).replace(SEARCH_HIGHLIGHT[0], "<mark>").replace(SEARCH_HIGHLIGHT[1], "</mark>")
+
+def attachment_text(r, attachments):
+    # Attachment name and size (file_path for complaints from before the attachment store), or None.
+    attachment = attachments.get(r.attachment_id)
+    return html.escape(describe(attachment)) if attachment else r.file_path
+
+# BULK ACTIONS
+STATUSES = ["Pending", "In Progress", "Resolved"]
+KEEP_STATUS = "(unchanged)"
+
+def notify(message, kind="success"):
+    # Message for the top of the page; the button callbacks below run before the page is drawn.
+    st.session_state.admin_notice = (kind, message)
+
+def show_notice():
+    notice = st.session_state.pop("admin_notice", None)
+    if notice:
+        getattr(st, notice[0])(notice[1])
+
+def set_status(cid, new_status):
+    if update_complaint_status(cid, new_status):
+        notify(f"Updated status of complaint {cid} to {new_status}")
+
+def assign_one(cid, staff_key):
+    staff = st.session_state[staff_key].strip()
+    if not staff:
+        return notify("Please enter a staff or department name before assigning.", "warning")
+    assign_complaint(cid, staff)
+    notify(f"Complaint {cid} successfully assigned to {staff}.")
+
+def _apply_bulk(key, page_ids):
+    state = st.session_state
+    ids = page_ids if state[f"{key}_all"] else state[f"{key}_ids"]
+    status, staff = state[f"{key}_status"], state[f"{key}_staff"].strip()
+    if not ids:
+        return notify("Select at least one complaint.", "warning")
+    if status == KEEP_STATUS and not staff:
+        return notify("Choose a status or a staff member to assign.", "warning")
+    changed, assigned = apply_complaint_changes(
+        statuses=dict.fromkeys(ids, status) if status != KEEP_STATUS else None,
+        assignments=dict.fromkeys(ids, staff) if staff else None,
+    )
+    done = [f"{changed} set to {status}"] if status != KEEP_STATUS else []
+    done += [f"{assigned} assigned to {staff}"] if staff else []
+    notify(f"{len(ids)} complaints selected: " + ", ".join(done) + ".")
+    state[f"{key}_ids"] = []
+
+def _apply_cluster(cluster_id, key):
+    state = st.session_state
+    status, staff = state[f"{key}_status"], state[f"{key}_staff"].strip()
+    if status == KEEP_STATUS and not staff:
+        return notify("Choose a status or a staff member to assign.", "warning")
+    changed, assigned = apply_cluster_changes(cluster_id, status if status != KEEP_STATUS else None, staff or None)
+    done = [f"{changed} set to {status}"] if status != KEEP_STATUS else []
+    done += [f"{assigned} assigned to {staff}"] if staff else []
+    notify(f"Cluster #{cluster_id}: " + ", ".join(done) + ".")
+
+def bulk_actions(key, rows):
+    # Status change and/or assignment for many complaints of the current page, applied in one transaction.
+    page_ids = [r.id for r in rows]
+    labels = {r.id: f"#{r.id} — {r.category} ({r.status})" for r in rows}
+    # Drop selections from other pages (Streamlit rejects values that are not among the options)
+    st.session_state[f"{key}_ids"] = [cid for cid in st.session_state.get(f"{key}_ids", []) if cid in labels]
+    with st.form(key):
+        st.markdown("**Bulk actions**")
+        c1, c2 = st.columns([3, 1])
+        c1.multiselect("Complaints", page_ids, format_func=labels.get, key=f"{key}_ids")
+        c2.checkbox("All on this page", key=f"{key}_all")
+        c3, c4 = st.columns(2)
+        c3.selectbox("Set status", [KEEP_STATUS] + STATUSES, key=f"{key}_status")
+        c4.text_input("Assign to (staff/department)", key=f"{key}_staff")
+        st.form_submit_button("Apply to selected", on_click=_apply_bulk, args=(key, page_ids))
+
+show_notice()
 
 # DASHBOARD
 if page == "Dashboard":
     render_navbar("Dashboard — Complaint Summary")
+    # Counts come from the trigger-maintained counters, not from the complaints themselves
+    stats = get_dashboard_stats()
 
-    if df.empty:
+    if not stats["total"]:
         st.info("No complaints yet.")
     else:
-        total = len(df)
-        pending = len(df[df['status'] == 'Pending'])
-        in_progress = len(df[df['status'] == 'In Progress'])
-        resolved = len(df[df['status'] == 'Resolved'])
+        total = stats["total"]
+        pending = stats["status"].get("Pending", 0)
+        in_progress = stats["status"].get("In Progress", 0)
+        resolved = stats["status"].get("Resolved", 0)
 
         st.markdown("### Overview")
         c1, c2, c3, c4 = st.columns(4)
@@ -78,24 +191,57 @@ if page == "Dashboard":
 
         # Charts Section 
         st.markdown("### Complaints Breakdown")
-        show_status_pie_chart(rows)
-        show_category_pie_chart(rows)
+        show_status_pie_chart(stats["status"])
+        show_category_pie_chart(stats["category"])
 
         # Sentiment Analysis Chart
         st.markdown("### Complaint Sentiment")
-        df["Sentiment"] = df["description"].apply(get_sentiment_label)
-        sentiment_counts = df["Sentiment"].value_counts().reset_index()
-        sentiment_counts.columns = ["Sentiment", "Count"]
-        st.bar_chart(sentiment_counts.set_index("Sentiment"))
+        sentiment = {label: n for label, n in stats["sentiment"].items() if label}
+        st.bar_chart({"Sentiment": list(sentiment), "Count": list(sentiment.values())}, x="Sentiment", y="Count")
+        not_scored = stats["sentiment"].get(None, 0)
+        if not_scored:
+            st.caption(f"{not_scored} complaints not analysed yet (python -m backend.backfill).")
+
+        # Trends come from per-day aggregates, so a year costs about as much as a week
+        st.markdown("### Trends")
+        t1, t2, t3 = st.columns(3)
+        bucket = t1.radio("Group by", ["Day", "Week", "Month"], index=1, horizontal=True, key="trend_bucket")
+        period = t2.selectbox("Period", list(TREND_PERIODS), index=2, key="trend_period")
+        trend_categories = t3.multiselect("Categories", [c for c in stats["category"] if c], key="trend_categories")
+        days = TREND_PERIODS[period]
+        points = get_complaint_trends(
+            bucket.lower(), date.today() - timedelta(days=days - 1) if days else None, None,
+            tuple(trend_categories) or None,
+        )
+        show_volume_trend_chart(points)
+        show_resolution_trend_chart(points)
 
 # ALL COMPLAINTS
 elif page == "All Complaints":
     render_navbar("All Complaints")
 
-    if df.empty:
-        st.info("No complaints available.")
+    page_key = "all_complaints_page"
+    search = st.text_input(
+        "Search descriptions", placeholder="e.g. projector in lab 3",
+        on_change=reset_pagination, args=(page_key,),
+    ).strip()
+    if search:
+        page_rows = paginate(page_key, lambda cursor: search_complaints(search, cursor=cursor, highlight=SEARCH_HIGHLIGHT))
+        make_row = SearchResult._make
+        if search_is_capped(search):
+            st.caption(f"Very common search: these are the best matches among the {SEARCH_RANK_LIMIT:,} most recent "
+                       "complaints that match. Add more words to search all of them.")
+    else:
+        page_rows = paginate(page_key, lambda cursor: get_complaints_page(cursor=cursor))
+        make_row = Complaint._make
+    page_rows = ensure_enriched(page_rows)
+    if not page_rows:
+        st.info("No complaints match your search." if search else "No complaints available.")
     else:
-        for _, r in df.iterrows():
+        page_rows = [make_row(r) for r in page_rows]
+        attachments = get_attachments(tuple(r.attachment_id for r in page_rows))
+        bulk_actions("all_complaints_bulk", page_rows)
+        for r in page_rows:
             # Subtle color indicator based on status
             if r.status == "Resolved":
                 border_color = "#28a745"  # green
@@ -120,119 +266,273 @@ elif page == "All Complaints":
                     <strong>Category:</strong> {r.category}<br>
                     <strong>Status:</strong> 
                         <span style='color:{border_color}; font-weight:600;'>{r.status}</span><br>
-                    <strong>Description:</strong> {r.description}<br>
+                    <strong>Description:</strong> {highlighted_snippet(r.snippet) if search else r.description}<br>
             """
 
-            if r.file_path:
-                html_content += f"<strong>Attachment:</strong> {r.file_path}<br>"
+            if attachment_text(r, attachments):
+                html_content += f"<strong>Attachment:</strong> {attachment_text(r, attachments)}<br>"
             html_content += f"<strong>Assigned to:</strong> {assigned_display}</div>"
 
             st.markdown(html_content, unsafe_allow_html=True)
 
-            # Show extracted keywords and suggested category
-            keywords = extract_keywords(r.description)
+            # Show keywords, priority and suggested category (computed when the complaint was stored)
+            keywords = parse_keywords(r.keywords)
             st.caption(f"**Keywords:** {', '.join(keywords) if keywords else 'N/A'}")
-            suggested_cat = suggest_category(r.description, {**general_categories, **critical_categories})
-            st.caption(f"**Suggested Category:** {suggested_cat}")
+            st.caption(f"**Priority:** {r.priority} | **Suggested Category:** {r.suggested_category}")
 
             # Update status
+            # (the stored status is part of the key, so the box follows changes made elsewhere)
             new_status = st.selectbox(
                 f"Update status for ID {r.id}",
-                ["Pending", "In Progress", "Resolved"],
-                index=["Pending", "In Progress", "Resolved"].index(r.status),
-                key=f"status_{r.id}",
+                STATUSES,
+                index=STATUSES.index(r.status),
+                key=f"status_{r.id}_{r.status}",
             )
-            if st.button(f"Set status {r.id} ➜ {new_status}", key=f"update_{r.id}"):
-                update_complaint_status(r.id, new_status)
-                st.success(f"Updated status to {new_status}")
-                time.sleep(1)
-                st.rerun()
+            st.button(f"Set status {r.id} ➜ {new_status}", key=f"update_{r.id}", on_click=set_status, args=(r.id, new_status))
 
 # FILTERS - ASSIGN
 elif page == "Filters - Assign":
     render_navbar("Filter - Assign")
+    categories, statuses = get_filter_options()
 
-    if df.empty:
+    if not categories:
         st.info("No complaints available.")
     else:
-        cats = ["All"] + sorted(df['category'].unique().tolist())
-        statuses = ["All"] + sorted(df['status'].unique().tolist())
+        cats = ["All"] + categories
+        statuses = ["All"] + statuses
 
+        # Changing any filter starts again from the first page
+        page_key = "filter_assign_page"
         c1, c2, c3, c4 = st.columns(4)
         with c1:
-            selected_cat = st.selectbox("Filter by category", cats)
+            selected_cat = st.selectbox("Filter by category", cats, on_change=reset_pagination, args=(page_key,))
         with c2:
-            selected_status = st.selectbox("Filter by status", statuses)
+            selected_status = st.selectbox("Filter by status", statuses, on_change=reset_pagination, args=(page_key,))
         with c3:
-            date_from = st.date_input("From")
+            date_from = st.date_input("From", on_change=reset_pagination, args=(page_key,))
         with c4:
-            date_to = st.date_input("To")
-
-        # Convert created_at to Python datetime safely
-        filtered = df.copy()
-        filtered["created_at_dt"] = filtered["created_at"].apply(
-            lambda x: datetime.strptime(x, "%Y-%m-%d %H:%M:%S") if isinstance(x, str) else x
+            date_to = st.date_input("To", on_change=reset_pagination, args=(page_key,))
+
+        # Filtering runs in SQL against the indexed columns
+        filters = dict(
+            category=None if selected_cat == "All" else selected_cat,
+            status=None if selected_status == "All" else selected_status,
+            date_from=date_from,
+            date_to=date_to,
         )
-
-        # Apply filters
-        if selected_cat != "All":
-            filtered = filtered[filtered["category"] == selected_cat]
-        if selected_status != "All":
-            filtered = filtered[filtered["status"] == selected_status]
-        if date_from:
-            filtered = filtered[filtered["created_at_dt"].dt.date >= date_from]
-        if date_to:
-            filtered = filtered[filtered["created_at_dt"].dt.date <= date_to]
-
-        if not filtered.empty:
-            summary = filtered["status"].value_counts().to_dict()
+        summary = count_complaints_by_status(**filters)
+        if summary:
             st.caption(
                 f"Summary — Pending: {summary.get('Pending', 0)} | "
                 f"In Progress: {summary.get('In Progress', 0)} | "
                 f"Resolved: {summary.get('Resolved', 0)}"
             )
 
+        filtered = paginate(page_key, lambda cursor: get_complaints_filtered(**filters, cursor=cursor))
+
         st.divider()
 
-        for _, r in filtered.iterrows():
+        filtered = [Complaint._make(r) for r in filtered]
+        attachments = get_attachments(tuple(r.attachment_id for r in filtered))
+        if filtered:
+            bulk_actions("filter_assign_bulk", filtered)
+
+        for r in filtered:
             with st.expander(f"{r.id} — {r.type} / {r.category} — {r.status}"):
 
                 st.markdown(f"<strong>Description:</strong> {r.description}", unsafe_allow_html=True)
 
-                if r.file_path:
-                    st.markdown(f"<strong>Attachment:</strong> {r.file_path}", unsafe_allow_html=True)
+                if attachment_text(r, attachments):
+                    st.markdown(f"<strong>Attachment:</strong> {attachment_text(r, attachments)}", unsafe_allow_html=True)
+                attachment = attachments.get(r.attachment_id)
+                # The file is only read from disk once asked for
+                if attachment and st.checkbox("Show attachment", key=f"show_attachment_{r.id}"):
+                    with open_attachment(attachment) as f:
+                        data = f.read()
+                    if (attachment.content_type or "").startswith("image/"):
+                        try:
+                            st.image(data)
+                        except Exception:  # the type comes from the browser; the content may not be an image
+                            st.caption("Preview not available.")
+                    st.download_button("Download attachment", data, file_name=attachment.original_name or "attachment",
+                                       mime=attachment.content_type, key=f"download_attachment_{r.id}")
 
                 assigned_display = r.assigned_to if r.assigned_to else "Not yet assigned"
                 st.markdown(f"<strong>Assigned to:</strong> {assigned_display}", unsafe_allow_html=True)
 
-                staff = st.text_input(
+                staff_key = f"assign_{r.id}_{r.assigned_to}"
+                st.text_input(
                     f"Assign to (staff/department) for complaint {r.id}",
                     value=r.assigned_to or "",
-                    key=f"assign_{r.id}"
+                    key=staff_key
                 )
-
-                if st.button(f"Assign Complaint #{r.id}", key=f"assign_btn_{r.id}"):
-                    if staff.strip() == "":
-                        st.warning("Please enter a staff or department name before assigning.")
-                    else:
-                        assign_complaint(r.id, staff)
-                        st.success(f"Complaint {r.id} successfully assigned to {staff}.")
-                        time.sleep(1.5)
-                        st.rerun()
+                st.button(f"Assign Complaint #{r.id}", key=f"assign_btn_{r.id}", on_click=assign_one, args=(r.id, staff_key))
+
+# NEAR-DUPLICATE CLUSTERS
+elif page == "Duplicates":
+    render_navbar("Near-Duplicate Complaints")
+    # Clusters are built as complaints arrive (backend/near_duplicates.py); only open complaints are listed
+    st.caption(f"Open complaints that closely repeat another one filed within {DUPLICATE_WINDOW_DAYS} days, "
+               "grouped so the whole group can be updated at once.")
+    clusters = get_duplicate_clusters()
+    if not clusters:
+        st.info("No open near-duplicate complaints.")
+    for c in clusters:
+        first, last = datetime.fromtimestamp(c.first_ts), datetime.fromtimestamp(c.last_ts)
+        summary = (c.description or "")[:90] + ("…" if len(c.description or "") > 90 else "")
+        with st.expander(f"{c.open_count} open — {c.category}: {summary}"):
+            st.caption(f"Reported between {first:%Y-%m-%d %H:%M} and {last:%Y-%m-%d %H:%M}")
+            members = [Complaint._make(r) for r in get_cluster_complaints(c.cluster_id)]
+            st.dataframe(
+                [{"id": r.id, "status": r.status, "assigned to": r.assigned_to or "", "filed": r.created_at,
+                  "description": r.description} for r in members],
+                use_container_width=True, hide_index=True,
+            )
+            key = f"cluster_{c.cluster_id}"
+            with st.form(key):
+                c1, c2 = st.columns(2)
+                c1.selectbox("Set status", [KEEP_STATUS] + STATUSES, key=f"{key}_status")
+                c2.text_input("Assign to (staff/department)", key=f"{key}_staff")
+                st.form_submit_button(f"Apply to all {c.open_count} complaints", on_click=_apply_cluster,
+                                      args=(c.cluster_id, key))
 
 # EXPORT DATA
 elif page == "Export":
     render_navbar("Export Complaints")
+    categories, statuses = get_filter_options()
 
-    if df.empty:
+    if not categories:
         st.info("No complaints to export.")
     else:
-        csv = df.to_csv(index=False).encode("utf-8")
-        st.download_button(
-            "Download All Complaints",
-            data=csv,
-            file_name="campus_buddy_complaints.csv",
-            mime="text/csv",
-        )
+        # The export is streamed from the database into a temporary file, never into a DataFrame
+        watermark_name = "admin_export"
+        last_seq, last_exported = get_export_watermark(watermark_name)
+
+        c1, c2 = st.columns(2)
+        with c1:
+            fmt = st.radio("Format", ["CSV", "Parquet"], horizontal=True)
+            columns = st.multiselect("Columns", COMPLAINT_COLUMNS, default=list(COMPLAINT_COLUMNS))
+            changes_only = st.checkbox(
+                "Only complaints added or changed since the last export",
+                disabled=last_exported is None,
+                help="Last export: " + (datetime.fromtimestamp(last_exported).strftime("%Y-%m-%d %H:%M")
+                                        if last_exported else "never"),
+            )
+        with c2:
+            category = st.selectbox("Category", ["All"] + categories, key="export_category")
+            status = st.selectbox("Status", ["All"] + statuses, key="export_status")
+            date_range = st.date_input("Submitted between", value=(), key="export_dates")
+
+        if st.button("Prepare export", disabled=not columns):
+            date_from, date_to = (tuple(date_range) + (None, None))[:2]
+            filters = {
+                "category": None if category == "All" else category,
+                "status": None if status == "All" else status,
+                "date_from": date_from,
+                "date_to": date_to or date_from,
+            }
+            # Replace this session's previous export file
+            previous = st.session_state.pop("export_file", None)
+            if previous and os.path.exists(previous["path"]):
+                os.remove(previous["path"])
+            suffix = ".csv" if fmt == "CSV" else ".parquet"
+            with tempfile.NamedTemporaryFile(prefix="campus_buddy_export_", suffix=suffix, delete=False) as out:
+                with st.spinner("Exporting..."):
+                    written, seq = export_complaints(
+                        out, fmt.lower(), columns, filters,
+                        since=watermark_name if changes_only else None, update_watermark=False,
+                    )
+            st.session_state.export_file = {
+                "path": out.name, "rows": written, "seq": seq, "suffix": suffix,
+                # Only an unfiltered "changes only" export covers every change up to seq
+                "moves_watermark": changes_only and not is_filtered(filters),
+            }
+
+        export_file = st.session_state.get("export_file")
+        if export_file:
+            st.caption(f"{export_file['rows']} complaints ready."
+                       + ("" if export_file.get("moves_watermark") else
+                          " This export does not change what counts as \"since the last export\"."))
+            # The watermark only moves once the file is actually downloaded
+            on_click = dict(on_click=set_export_watermark, args=(watermark_name, max(export_file["seq"], last_seq))) \
+                if export_file.get("moves_watermark") else {}
+            with open(export_file["path"], "rb") as data:
+                st.download_button(
+                    "Download Complaints",
+                    data=data,
+                    file_name="campus_buddy_complaints" + export_file["suffix"],
+                    mime="text/csv" if export_file["suffix"] == ".csv" else "application/vnd.apache.parquet",
+                    **on_click,
+                )
+
         st.markdown("### Data Preview")
-        st.dataframe(df.head(50))
+        preview, _ = get_complaints_page(page_size=50)
+        st.dataframe([dict(zip(COMPLAINT_COLUMNS, r)) for r in preview])
+
+# PERFORMANCE
+elif page == "Performance":
+    render_navbar("Performance")
+    if not metrics.ENABLED:
+        st.info("Instrumentation is off (CAMPUS_BUDDY_METRICS=0).")
+    else:
+        # Timings are kept in memory by this server process (the student portal has its own)
+        st.caption("Calls timed by this admin portal process since it started or since the last reset.")
+        stats = metrics.stats()
+        groups = sorted({s.name.split(".", 1)[0] for s in stats})
+        group = st.selectbox("Show", ["All"] + groups, key="perf_group")
+        shown = [s for s in stats if group == "All" or s.name.startswith(group + ".")]
+        if shown:
+            st.dataframe(
+                [{
+                    "call": s.name, "calls": s.calls, "errors": s.errors, "total (s)": round(s.total_s, 3),
+                    "mean (ms)": round(s.mean_ms, 2), "p50 (ms)": round(s.p50_ms, 2),
+                    "p95 (ms)": round(s.p95_ms, 2), "max (ms)": round(s.max_ms, 2),
+                } for s in shown],
+                use_container_width=True, hide_index=True,
+            )
+            st.caption("p50/p95 are histogram bucket bounds, so they are approximate.")
+        else:
+            st.info("Nothing recorded yet.")
+
+        st.markdown("### Recent page reruns")
+        traces = metrics.recent_traces()
+        if traces:
+            labels = [f"{datetime.fromtimestamp(t.started_at):%H:%M:%S}  {t.name}  ({t.duration * 1000:.0f} ms)"
+                      for t in traces]
+            chosen = traces[st.selectbox("Rerun", range(len(traces)), format_func=labels.__getitem__)]
+            if chosen.spans:
+                st.dataframe(
+                    [{
+                        "call": " " * s.depth + s.name, "start (ms)": round(s.start * 1000, 2),
+                        "duration (ms)": round(s.duration * 1000, 2), "error": s.error,
+                    } for s in chosen.spans],
+                    use_container_width=True, hide_index=True,
+                )
+            else:
+                st.caption("No instrumented calls in this rerun (everything came from the cache).")
+            if chosen.dropped:
+                st.caption(f"{chosen.dropped} more calls were not kept.")
+        else:
+            st.info("No page reruns recorded yet.")
+
+        c1, c2 = st.columns(2)
+        c1.download_button("Download Prometheus metrics", metrics.render_prometheus(),
+                           file_name="campus_buddy_admin.prom", mime="text/plain")
+        c2.button("Reset metrics", on_click=metrics.reset)
+
+    # The worker (python -m backend.worker) runs in its own processes; its queue lives in the database
+    st.markdown("### Background jobs")
+    counts = get_job_counts()
+    for col, (state, count) in zip(st.columns(len(counts)), counts.items()):
+        col.metric(state.capitalize(), f"{count:,}")
+    dead = get_dead_jobs(20)
+    if dead:
+        st.dataframe(
+            [{**dict(zip(DEAD_JOB_COLUMNS, row)), "finished_ts": datetime.fromtimestamp(row[-1])} for row in dead],
+            use_container_width=True, hide_index=True,
+        )
+        st.button("Retry dead jobs", on_click=retry_dead_jobs)
+    elif counts["queued"]:
+        st.caption("Jobs are waiting: is `python -m backend.worker` running?")
+
+metrics.end_trace(page_trace)
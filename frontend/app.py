@@ -1,17 +1,26 @@
 # frontend/app.py
 # Campus Buddy Student Portal
 import streamlit as st
+import html
 import os, sys
-from datetime import datetime
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # Imports
-from backend.database import init_db, add_complaint, get_complaints_by_email
+from backend import metrics
+from backend.database import init_db, add_complaint, get_complaints_page, get_attachments, Complaint
+from backend.attachments import save_attachment, describe, AttachmentTooLarge, MAX_ATTACHMENT_BYTES
 from backend.auth import validate_student_login
+from backend.nlp_utils import warm_up
 from backend.config import general_categories, critical_categories
-from backend.chatbot import get_chatbot_response
+from backend.chatbot import stream_chatbot_response
 from frontend.helpers.styles import load_custom_css
+from frontend.helpers.pagination import paginate
+from frontend.helpers.cache import versioned
+
+# Reads are served from the rerun cache until the database changes
+get_complaints_page = versioned(get_complaints_page)
+get_attachments = versioned(get_attachments)
 
 # PAGE CONFIG 
 st.set_page_config(page_title="Campus Buddy - Student", layout="wide", page_icon="🎓")
@@ -42,6 +51,10 @@ if not st.session_state.logged_in:
         if validate_student_login(email, password):
             st.session_state.logged_in = True
             st.session_state.email = email
+            # Opt-in: load the NLP models in the background once logged in, so the first inline
+            # analysis (CAMPUS_BUDDY_ASYNC_ENRICHMENT=0) is not slowed down; never during login
+            if os.getenv("CAMPUS_BUDDY_WARM_UP") == "1":
+                warm_up(background=True)
             st.success("Login successful! Redirecting...")
             st.rerun()
         else:
@@ -51,6 +64,8 @@ if not st.session_state.logged_in:
 # SIDEBAR
 st.sidebar.title("Campus Buddy")
 page = st.sidebar.radio("Navigate", ["Home", "Register Complaint", "My Complaints", "Chatbot"])
+# Every backend call made while rendering the page is recorded as a span of this trace
+page_trace = metrics.begin_trace(f"student.{page}")
 if st.sidebar.button("Logout"):
     st.session_state.logged_in = False
     st.session_state.email = None
@@ -89,19 +104,23 @@ elif page == "Register Complaint":
     file_upload = st.file_uploader("Attach a file (optional)", type=["jpg","png","pdf","jpeg"])
 
     if st.button("Submit Complaint"):
-        file_path = None
-        if file_upload:
-            uploads_dir = "uploads"
-            os.makedirs(uploads_dir, exist_ok=True)
-            file_path = os.path.join(uploads_dir, file_upload.name)
-            with open(file_path, "wb") as f:
-                f.write(file_upload.getbuffer())
-
         if not description:
             st.warning("Please enter a description for your complaint.")
+        elif file_upload and file_upload.size > MAX_ATTACHMENT_BYTES:
+            st.warning(f"Attachments are limited to {MAX_ATTACHMENT_BYTES // (1024 * 1024)} MB.")
         else:
-            add_complaint(complaint_type, category, None, description, is_anonymous, file_path, st.session_state.email)
-            st.success("Complaint submitted successfully!")
+            try:
+                attachment_id = None
+                if file_upload:
+                    # Stored once per distinct content; the complaint keeps the attachment id
+                    file_upload.seek(0)
+                    attachment_id = save_attachment(file_upload, file_upload.name, file_upload.type)
+            except AttachmentTooLarge as e:
+                st.warning(f"Attachment not accepted: {e}.")
+            else:
+                add_complaint(complaint_type, category, None, description, is_anonymous, None,
+                              st.session_state.email, attachment_id=attachment_id)
+                st.success("Complaint submitted successfully!")
 
 # MY COMPLAINTS
 elif page == "My Complaints":
@@ -109,15 +128,15 @@ elif page == "My Complaints":
     email = st.session_state.email
     st.markdown(f"### Logged in as: {email}")
 
-    complaints = get_complaints_by_email(email)
+    complaints = paginate("my_complaints_page", lambda cursor: get_complaints_page(email=email, cursor=cursor))
     if not complaints:
         st.info("No complaints found for this email.")
     else:
-        for row in complaints:
-            (
-                cid, ctype, cat, _, desc, anon, file_path,
-                email, status, assigned, created
-            ) = row
+        complaints = [Complaint._make(row) for row in complaints]
+        attachments = get_attachments(tuple(c.attachment_id for c in complaints))
+        for c in complaints:
+            cid, ctype, cat, desc, anon = c.id, c.type, c.category, c.description, c.is_anonymous
+            file_path, status, assigned, created = c.file_path, c.status, c.assigned_to, c.created_at
 
             # Background color based on status
             bg_color = "#d4edda" if status == "Resolved" else "#fff3cd" if status == "In Progress" else "#f8d7da"
@@ -142,8 +161,10 @@ elif page == "My Complaints":
                     <strong>Assigned to:</strong> {assigned_text}<br>
             """
 
-            if file_path:
-                html_content += f"<strong>Attachment:</strong> {file_path}<br>"
+            # (file_path: complaints from before the attachment store)
+            attachment = attachments.get(c.attachment_id)
+            if attachment or file_path:
+                html_content += f"<strong>Attachment:</strong> {html.escape(describe(attachment)) if attachment else file_path}<br>"
 
             if anon:
                 html_content += "<em>Submitted anonymously</em><br>"
@@ -169,9 +190,10 @@ elif page == "Chatbot":
     if user_input := st.chat_input("Ask Campus Buddy..."):
         # Add user message
         st.session_state.chat_history.append(("user", user_input))
+        st.chat_message("user").markdown(f"**You:** {user_input}")
 
-        # Get response and source type
-        reply_text, reply_type = get_chatbot_response(user_input)
+        # Get response stream and source type
+        reply_stream, reply_type = stream_chatbot_response(user_input)
 
         # Label based on source
         if reply_type == "rule":
@@ -181,7 +203,10 @@ elif page == "Chatbot":
         else:
             label = "(Campus Buddy)"
 
-        # Display assistant message with label
+        # Render the reply as it streams in, then keep it in the history with its label
+        with st.chat_message("assistant"):
+            reply_text = st.write_stream(reply_stream)
+            st.markdown(f"*{label}*")
         st.session_state.chat_history.append(("assistant", f"{reply_text}\n\n*{label}*"))
 
-        st.rerun()
+metrics.end_trace(page_trace)
@@ -0,0 +1,26 @@
+# frontend/helpers/cache.py
+# Rerun cache for database reads: results are kept across reruns and sessions and looked up by the
+# database's data version, so a rerun without writes in between is served from memory and any
+# committed write (from either portal, a CLI or another process) makes the next read go to SQLite.
+
+import functools
+
+import streamlit as st
+from backend import database
+
+_READS = {}
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _cached_read(name, db_path, version, args, kwargs):
+    # db_path and version are only part of the cache key
+    return _READS[name](*args, **kwargs)
+
+def versioned(read):
+    # Wrap a backend.database read function (arguments and result must be picklable).
+    name = f"{read.__module__}.{read.__qualname__}"
+    _READS[name] = read
+
+    @functools.wraps(read)
+    def wrapper(*args, **kwargs):
+        return _cached_read(name, database.DB_PATH, database.data_version(), args, kwargs)
+    return wrapper
@@ -1,30 +1,26 @@
 # frontend/helpers/charts.py
 # Chart utilities for CampusBuddy Admin Dashboard
 
-import pandas as pd
+# pandas and plotly are imported inside the functions so that importing this module
+# (and rendering the login page) does not pay for them.
 import streamlit as st
-import plotly.express as px
-from backend.nlp_utils import get_sentiment_label  # updated NLP
-
-COMPLAINT_COLUMNS = [
-    "id", "type", "category", "subcategory", "description", "is_anonymous",
-    "file_path", "email", "status", "assigned_to", "created_at"
-]
+from backend import metrics
+from backend.database import COMPLAINT_COLUMNS
 
 def complaints_df_from_rows(rows):
     # Convert raw DB rows to DataFrame using shared schema
+    import pandas as pd
     return pd.DataFrame(rows, columns=COMPLAINT_COLUMNS)
 
-def show_status_pie_chart(rows):
-    # Display a pie chart of complaints by status
-    df = complaints_df_from_rows(rows)
-    if df.empty:
+def show_status_pie_chart(counts):
+    # Display a pie chart of complaints by status, from {status: count} (e.g. get_dashboard_stats()["status"])
+    if not counts:
         return st.info("No complaints to display.")
-    counts = df["status"].value_counts()
+    import plotly.express as px
     fig = px.pie(
-        names=counts.index,
-        values=counts.values,
-        color=counts.index,
+        names=list(counts),
+        values=list(counts.values()),
+        color=list(counts),
         color_discrete_map={"Pending":"#FFB703","In Progress":"#219EBC","Resolved":"#8AC926"},
         title="Complaints by Status"
     )
@@ -32,33 +28,77 @@ def show_status_pie_chart(rows):
     fig.update_layout(showlegend=True, template="plotly_white")
     st.plotly_chart(fig, use_container_width=True)
 
-def show_category_pie_chart(rows):
-    # Display a pie chart of complaints by category
-    df = complaints_df_from_rows(rows)
-    if df.empty:
+def show_category_pie_chart(counts):
+    # Display a pie chart of complaints by category, from {category: count}
+    if not counts:
         return st.info("No complaints to display.")
-    counts = df["category"].value_counts()
-    fig = px.pie(names=counts.index, values=counts.values, title="Complaints by Category")
+    import plotly.express as px
+    fig = px.pie(names=list(counts), values=list(counts.values()), title="Complaints by Category")
     fig.update_traces(textposition="inside", textinfo="percent+label")
     fig.update_layout(showlegend=True, template="plotly_white")
     st.plotly_chart(fig, use_container_width=True)
 
-def show_sentiment_bar_chart(rows):
-    # Display a bar chart of complaints by sentiment (Positive/Neutral/Negative)
-    df = complaints_df_from_rows(rows)
-    if df.empty:
+def show_sentiment_bar_chart(counts):
+    # Display a bar chart of complaints by sentiment (Positive/Neutral/Negative), from {sentiment: count}.
+    # Complaints not analysed yet (sentiment None) are left out; backend.backfill scores them.
+    import plotly.express as px
+    counts = {label: n for label, n in counts.items() if label}
+    if not counts:
         return st.info("No complaints to display.")
-    
-    # Apply sentiment detection to all descriptions
-    df["Sentiment"] = df["description"].apply(get_sentiment_label)
-    sentiment_counts = df["Sentiment"].value_counts().reset_index()
-    sentiment_counts.columns = ["Sentiment", "Count"]
     fig = px.bar(
-        sentiment_counts,
-        x="Sentiment",
-        y="Count",
-        color="Sentiment",
+        x=list(counts),
+        y=list(counts.values()),
+        color=list(counts),
+        labels={"x": "Sentiment", "y": "Count", "color": "Sentiment"},
         color_discrete_map={"Positive":"#4CAF50","Neutral":"#FFC107","Negative":"#F44336"},
         title="Complaint Sentiment"
     )
     st.plotly_chart(fig, use_container_width=True)
+
+def show_volume_trend_chart(points):
+    # Line chart of complaints opened per bucket and category, from get_complaint_trends() points
+    # (bucket, category, opened, resolved, resolution_s); the cost depends on the number of points only.
+    points = [p for p in points if p[2]]
+    if not points:
+        return st.info("No complaints in this period.")
+    import plotly.express as px
+    fig = px.line(
+        x=[p[0] for p in points],
+        y=[p[2] for p in points],
+        color=[p[1] or "Uncategorized" for p in points],
+        markers=True,
+        labels={"x": "Period", "y": "Complaints", "color": "Category"},
+        title="Complaints Opened"
+    )
+    fig.update_layout(template="plotly_white", hovermode="x unified")
+    st.plotly_chart(fig, use_container_width=True)
+
+def show_resolution_trend_chart(points):
+    # Opened vs resolved per bucket (all categories together) and the mean time to resolve, in hours,
+    # of the complaints resolved in each bucket, from get_complaint_trends() points.
+    totals = {}
+    for bucket, _, opened, resolved, resolution_s in points:
+        total = totals.setdefault(bucket, [0, 0, 0])
+        total[0] += opened
+        total[1] += resolved
+        total[2] += resolution_s
+    if not totals:
+        return st.info("No complaints in this period.")
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    buckets = sorted(totals)
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    fig.add_trace(go.Scatter(x=buckets, y=[totals[b][0] for b in buckets], name="Opened",
+                             mode="lines+markers", line={"color": "#FFB703"}))
+    fig.add_trace(go.Scatter(x=buckets, y=[totals[b][1] for b in buckets], name="Resolved",
+                             mode="lines+markers", line={"color": "#8AC926"}))
+    fig.add_trace(go.Bar(x=buckets, y=[totals[b][2] / totals[b][1] / 3600 if totals[b][1] else None for b in buckets],
+                         name="Mean hours to resolve", marker={"color": "#219EBC"}, opacity=0.35),
+                  secondary_y=True)
+    fig.update_layout(title="Resolution Trend", template="plotly_white", hovermode="x unified")
+    fig.update_yaxes(title_text="Complaints", secondary_y=False)
+    fig.update_yaxes(title_text="Hours to resolve", secondary_y=True, showgrid=False)
+    st.plotly_chart(fig, use_container_width=True)
+
+# Chart building and rendering is timed like the backend calls (see backend/metrics.py)
+metrics.instrument(globals(), "charts")
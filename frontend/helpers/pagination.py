@@ -0,0 +1,33 @@
+# frontend/helpers/pagination.py
+# Previous/Next controls for keyset-paginated complaint lists
+
+import streamlit as st
+
+def paginate(key, fetch_page):
+    # Render page controls and return the rows of the current page.
+    # fetch_page(cursor) must return (rows, next_cursor) like backend.database.get_complaints_page.
+    # The cursors of the pages visited so far are kept in st.session_state[key].
+    cursors = st.session_state.setdefault(key, [None])
+    rows, next_cursor = fetch_page(cursors[-1])
+
+    # Rows on the current page were deleted/filtered away; step back instead of showing a blank page
+    while not rows and len(cursors) > 1:
+        cursors.pop()
+        rows, next_cursor = fetch_page(cursors[-1])
+
+    def _previous():
+        cursors.pop()
+
+    def _next():
+        cursors.append(next_cursor)
+
+    if len(cursors) > 1 or next_cursor is not None:
+        c1, c2, c3 = st.columns([1, 3, 1])
+        c1.button("← Previous", key=f"{key}_prev", disabled=len(cursors) == 1, on_click=_previous)
+        c2.caption(f"Page {len(cursors)}")
+        c3.button("Next →", key=f"{key}_next", disabled=next_cursor is None, on_click=_next)
+    return rows
+
+def reset_pagination(key):
+    # Go back to the first page (e.g. after the filters change).
+    st.session_state[key] = [None]